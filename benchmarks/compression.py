@@ -0,0 +1,50 @@
+"""
+Size and cost of compressing a GET /form-data/ page in each available coding
+(utils/compression.py), and of a hit in the compressed cache. Uses a private in-memory
+SQLite database; run from the repository root:
+
+    python -m benchmarks.compression [--forms 50] [--number 200]
+"""
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from database.connection import Base, SessionLocal, engine
+from services.form_service import FormService
+from services.document_cache import DocumentCache
+from services.repositories.form_data_repository import FormDataRepository
+from utils.compression import CODECS
+from utils.response_helpers import paginated_response
+from benchmarks.serialization import sample_form
+
+MESSAGE = "Fetch all successful"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--forms", type=int, default=50, help="documents on the page")
+    parser.add_argument("--number", type=int, default=200, help="pages compressed per timing run")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    FormDataRepository(session).bulk_create([sample_form(5) for _ in range(args.forms)])
+    body = paginated_response(FormService(session).get_form_data_page(args.forms), MESSAGE).body
+    cache = DocumentCache(10, len(body) * 10, 60)
+
+    print(f"{len(body)} byte page of {args.forms} documents")
+    for name, codec in CODECS.items():
+        compressed = codec.compress(body)
+        cache.set(name, compressed, cache.generation())
+        best = min(timeit.repeat(lambda: codec.compress(body), number=args.number, repeat=5))
+        print(f"  {name:5} {len(compressed):9} bytes ({len(compressed) / len(body):6.1%})"
+              f" {best / args.number * 1e3:8.2f} ms/page")
+    best = min(timeit.repeat(lambda: cache.get("gzip"), number=args.number, repeat=5))
+    print(f"  cache hit {best / args.number * 1e6:8.2f} µs/page")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Per-document cost of serializing a GET /form-data/{id} response, before and after the
+single-pass fast path in utils/response_helpers.py. Uses a private in-memory SQLite
+database; run from the repository root:
+
+    python -m benchmarks.serialization [--children 5] [--number 2000]
+"""
+import argparse
+import json
+import os
+import timeit
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from database.connection import Base, SessionLocal, engine
+from models.schemas import FormData
+from services.repositories.form_data_repository import FormDataRepository
+from services.mappers.form_data_mapper import FormDataMapper
+from utils.response_helpers import success_response, serialized_success_response
+
+MESSAGE = "Fetch successful"
+
+
+def sample_form(children: int) -> FormData:
+    """A form with `children` entries in every child collection."""
+    dates = {"start_date": "2020-01-01", "end_date": "2023-12-31"}
+    return FormData(
+        first_name="Jürgen", last_name="Doe", email="jurgen.doe@example.com", mobile_number="+1234567890",
+        date_of_birth="1990-01-01", street_address="123 Main St", city="Anytown", state="NY",
+        postal_code="12345", country="USA", title="Mr", marital_status="Single",
+        professional_summary="Backend engineer working on APIs and data pipelines. " * 5,
+        educations=[{"id": "", "university_name": f"University {i}", "course_name": "Computer Science"}
+                    for i in range(children)],
+        job_experiences=[{"id": "", "job_title": "Developer", "company_name": f"Company {i}",
+                          "description": "Built and ran services.", **dates} for i in range(children)],
+        skills=[{"id": "", "name": f"Skill {i}", "level": "Expert", "category": "Programming"}
+                for i in range(children)],
+        certifications=[{"id": "", "name": f"Certificate {i}", "issuer": "Issuer",
+                         "date_obtained": "2021-01-01", "expiry_date": "2024-01-01"} for i in range(children)],
+        languages=[{"id": "", "name": f"Language {i}", "proficiency": "Fluent"} for i in range(children)],
+        projects=[{"id": "", "title": f"Project {i}", "technologies": "Python", **dates} for i in range(children)],
+        references=[{"id": "", "name": f"Reference {i}", "position": "Lead", "company": "Company",
+                     "email": "ref@example.com", "phone": "+1987654321"} for i in range(children)],
+    )
+
+
+def legacy_response_body(document) -> bytes:
+    """The previous path: model_dump() to dicts, then json.dumps as JSONResponse renders them."""
+    payload = {"success": True, "message": MESSAGE, "data": document.model_dump()}
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--children", type=int, default=5, help="entries per child collection")
+    parser.add_argument("--number", type=int, default=2000, help="documents serialized per timing run")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    repository = FormDataRepository(session)
+    repository.create(sample_form(args.children))
+    session.expire_all()
+    db_form_data = repository.get_page(1)[0]
+    mapper = FormDataMapper()
+    document = mapper.db_to_response_model(db_form_data)
+    cached = document.model_dump_json().encode()
+    assert json.loads(legacy_response_body(document)) == json.loads(success_response(document, MESSAGE).body)
+
+    cases = {
+        "mapper: ORM row to FormDataResponse": lambda: mapper.db_to_response_model(db_form_data),
+        "before: model_dump() + json.dumps": lambda: legacy_response_body(document),
+        "after: to_json of the envelope": lambda: success_response(document, MESSAGE),
+        "cache hit: envelope around stored bytes": lambda: serialized_success_response(cached, MESSAGE),
+    }
+    print(f"{len(cached)} byte document, {args.children} entries per collection")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=args.number, repeat=5))
+        print(f"  {name:42} {best / args.number * 1e6:8.1f} µs/document")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
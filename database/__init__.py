@@ -9,6 +9,7 @@ from .models import (
     ProjectModel,
     ReferenceModel
 )
+from . import search_indexes  # registers full-text index DDL on form_data
 
 def create_tables():
     """Create all database tables."""
@@ -0,0 +1,46 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+import os
+from dotenv import load_dotenv
+from database.connection import DATABASE_URL, enable_sqlite_foreign_keys
+
+load_dotenv()
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(database_url: str) -> URL:
+    """Swap the sync driver in DATABASE_URL for its asyncio counterpart."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'. Set ASYNC_DATABASE_URL explicitly.")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+if make_url(ASYNC_DATABASE_URL).get_backend_name() == "sqlite":
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    event.listen(async_engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+# expire_on_commit=False: results are mapped inside the session call, never lazily afterwards.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    Used by the form-data routes when DB_EXECUTION_MODE=async.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
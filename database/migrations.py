@@ -0,0 +1,312 @@
+"""
+Versioned schema migrations, applied on startup in place of create_all().
+
+Each migration runs once and is recorded in schema_migrations. Migrations that build
+indexes or rewrite rows run outside a transaction, so on PostgreSQL indexes are built
+with CREATE INDEX CONCURRENTLY and backfills commit in batches, without blocking writes
+to a live table. Every migration is idempotent: one interrupted before it was recorded
+is simply re-run. Add schema changes by appending to MIGRATIONS; never edit an applied one.
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, List, NamedTuple, Set
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, bindparam, func, inspect, insert, select, text, update
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex, Index
+from sqlalchemy.sql import visitors
+from database.connection import Base
+from database.models import FormDataModel, TableCounterModel, FORM_DATA_COUNTER, FORM_DATA_VERSION, CHILD_MODELS
+from database import search_indexes
+
+BACKFILL_BATCH_SIZE = 1000
+# Arbitrary pg_advisory_lock key, so app instances starting together migrate one at a time.
+MIGRATION_LOCK_ID = 7201
+
+# Kept out of Base.metadata so drop_all() never touches the migration history.
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+    # False runs the migration in autocommit mode, as CREATE INDEX CONCURRENTLY requires.
+    transactional: bool = True
+
+
+def online_ddl(connection: Connection, ddl: str) -> str:
+    """Rewrite CREATE INDEX as CREATE INDEX CONCURRENTLY on PostgreSQL."""
+    if connection.dialect.name != "postgresql":
+        return ddl
+    return re.sub(r"^\s*CREATE (UNIQUE )?INDEX", r"CREATE \1INDEX CONCURRENTLY", ddl, count=1)
+
+
+def create_index(connection: Connection, index: Index) -> None:
+    """Create one model index if it does not exist, concurrently on PostgreSQL."""
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect))
+    connection.exec_driver_sql(online_ddl(connection, ddl))
+
+
+def drop_invalid_indexes(connection: Connection) -> None:
+    """Drop indexes left INVALID by an interrupted concurrent build, so they are rebuilt."""
+    if connection.dialect.name != "postgresql":
+        return
+    invalid = connection.execute(text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+    )).scalars().all()
+    for name in invalid:
+        connection.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+def create_tables(connection: Connection) -> None:
+    """Create missing tables; on a new database this also builds every index."""
+    Base.metadata.create_all(connection)
+
+
+def add_search_document(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("form_data")}
+    if "search_document" not in columns:
+        connection.exec_driver_sql("ALTER TABLE form_data ADD COLUMN search_document TEXT DEFAULT ''")
+
+
+def backfill_search_documents(connection: Connection) -> None:
+    """Rebuild search_document for every row, one committed batch of ids at a time."""
+    last_id = None
+    while True:
+        query = select(FormDataModel.id).order_by(FormDataModel.id).limit(BACKFILL_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(FormDataModel.id > last_id)
+        form_ids = connection.execute(query).scalars().all()
+        if not form_ids:
+            return
+        connection.execute(
+            update(FormDataModel)
+            .where(FormDataModel.id.in_(form_ids))
+            .values(
+                search_document=search_indexes.search_document_expression(),
+                updated_at=FormDataModel.updated_at
+            )
+        )
+        last_id = form_ids[-1]
+
+
+def backfill_search_vectors(connection: Connection) -> None:
+    """Fill the PostgreSQL search_vector of every row, one committed batch of ids at a time."""
+    fill = text(
+        f"UPDATE form_data SET {search_indexes.SEARCH_VECTOR_COLUMN} = {search_indexes.SEARCH_VECTOR_SQL} "
+        "WHERE id IN :form_ids"
+    ).bindparams(bindparam("form_ids", expanding=True, type_=FormDataModel.id.type))
+    last_id = None
+    while True:
+        query = select(FormDataModel.id).order_by(FormDataModel.id).limit(BACKFILL_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(FormDataModel.id > last_id)
+        form_ids = connection.execute(query).scalars().all()
+        if not form_ids:
+            return
+        connection.execute(fill, {"form_ids": form_ids})
+        last_id = form_ids[-1]
+
+
+def add_content_hash(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("form_data")}
+    if "content_hash" not in columns:
+        # Existing rows keep NULL: they are written normally until their next full submission.
+        connection.exec_driver_sql("ALTER TABLE form_data ADD COLUMN content_hash VARCHAR(129)")
+
+
+def add_dedup_hash(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("form_data")}
+    if "dedup_hash" not in columns:
+        # Existing rows keep NULL: only forms created with dedup from now on claim their hash.
+        connection.exec_driver_sql("ALTER TABLE form_data ADD COLUMN dedup_hash VARCHAR(129)")
+
+
+def create_table_counters(connection: Connection) -> None:
+    """Create table_counters (seeded at 0) and set the form_data counter from a one-time count."""
+    Base.metadata.create_all(connection, tables=[TableCounterModel.__table__])
+    connection.execute(
+        update(TableCounterModel)
+        .where(TableCounterModel.name == FORM_DATA_COUNTER)
+        .values(value=select(func.count()).select_from(FormDataModel).scalar_subquery())
+    )
+
+
+def add_version_counter(connection: Connection) -> None:
+    """Rename table_counters.row_count to value, now that it also holds a version, and seed the version."""
+    columns = {column["name"] for column in inspect(connection).get_columns("table_counters")}
+    if "row_count" in columns:
+        connection.exec_driver_sql("ALTER TABLE table_counters RENAME COLUMN row_count TO value")
+    seeded = connection.execute(
+        select(TableCounterModel.name).where(TableCounterModel.name == FORM_DATA_VERSION)
+    ).first()
+    if seeded is None:
+        connection.execute(insert(TableCounterModel).values(name=FORM_DATA_VERSION, value=0))
+
+
+def create_model_indexes(connection: Connection) -> None:
+    """
+    Create every index declared on the models that the database does not have yet.
+    Indexes on columns a later migration adds are skipped; that migration re-runs this.
+    """
+    drop_invalid_indexes(connection)
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if _index_column_names(index) <= existing_columns:
+                create_index(connection, index)
+
+
+def _index_column_names(index: Index) -> Set[str]:
+    return {
+        element.name
+        for expression in index.expressions
+        for element in visitors.iterate(expression)
+        if isinstance(element, Column)
+    }
+
+
+def create_search_indexes(connection: Connection) -> None:
+    """
+    Create the full-text and trigram indexes of database/search_indexes.py. On PostgreSQL
+    the tsvector column and its trigger come first, then existing rows are backfilled in
+    batches, and only then is the index built.
+    """
+    if connection.dialect.name == "postgresql":
+        drop_invalid_indexes(connection)
+        for statement in search_indexes.POSTGRES_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        backfill_search_vectors(connection)
+        for statement in search_indexes.POSTGRES_FTS_INDEX_DDL + search_indexes.POSTGRES_TRIGRAM_DDL:
+            connection.exec_driver_sql(online_ddl(connection, statement))
+    elif connection.dialect.name == "sqlite":
+        for statement in search_indexes.SQLITE_FTS_DDL + search_indexes.SQLITE_TRIGRAM_DDL:
+            connection.exec_driver_sql(statement)
+        search_indexes.rebuild_sqlite_fts(connection)
+
+
+def cascade_child_foreign_keys(connection: Connection) -> None:
+    """Recreate child foreign keys that predate ON DELETE CASCADE."""
+    inspector = inspect(connection)
+    for model in CHILD_MODELS.values():
+        table = model.__table__
+        for foreign_key in inspector.get_foreign_keys(table.name):
+            if foreign_key["referred_table"] != "form_data":
+                continue
+            if (foreign_key["options"].get("ondelete") or "").upper() == "CASCADE":
+                continue
+            if connection.dialect.name == "postgresql":
+                _cascade_postgres_foreign_key(connection, table, foreign_key["name"])
+            else:
+                _rebuild_sqlite_table(connection, table)
+
+
+def _cascade_postgres_foreign_key(connection: Connection, table: Table, constraint: str) -> None:
+    # NOT VALID makes the swap instant; VALIDATE then checks existing rows without blocking writes.
+    quote = connection.dialect.identifier_preparer.quote
+    connection.exec_driver_sql(
+        f"ALTER TABLE {quote(table.name)} DROP CONSTRAINT {quote(constraint)}, "
+        f"ADD CONSTRAINT {quote(constraint)} FOREIGN KEY (form_data_id) REFERENCES form_data (id) "
+        f"ON DELETE CASCADE NOT VALID"
+    )
+    connection.exec_driver_sql(f"ALTER TABLE {quote(table.name)} VALIDATE CONSTRAINT {quote(constraint)}")
+
+
+def _rebuild_sqlite_table(connection: Connection, table: Table) -> None:
+    # SQLite cannot alter a constraint: copy the rows into a table created from the model.
+    quote = connection.dialect.identifier_preparer.quote
+    old_name = f"{table.name}_old"
+    columns = ", ".join(quote(column.name) for column in table.columns)
+    connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    try:
+        connection.exec_driver_sql("BEGIN")
+        connection.exec_driver_sql(f"ALTER TABLE {quote(table.name)} RENAME TO {quote(old_name)}")
+        old_indexes = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (old_name,)
+        ).scalars().all()
+        for index_name in old_indexes:
+            connection.exec_driver_sql(f"DROP INDEX {quote(index_name)}")
+        table.create(connection)
+        # Foreign keys were not enforced before; orphaned children are dropped on the way.
+        connection.exec_driver_sql(
+            f"INSERT INTO {quote(table.name)} ({columns}) SELECT {columns} FROM {quote(old_name)} "
+            f"WHERE form_data_id IN (SELECT id FROM form_data)"
+        )
+        connection.exec_driver_sql(f"DROP TABLE {quote(old_name)}")
+        connection.exec_driver_sql("COMMIT")
+    except Exception:
+        connection.exec_driver_sql("ROLLBACK")
+        raise
+    finally:
+        connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create tables", create_tables),
+    Migration(2, "Add form_data.search_document", add_search_document),
+    Migration(3, "Backfill form_data.search_document", backfill_search_documents, transactional=False),
+    Migration(4, "Create model indexes", create_model_indexes, transactional=False),
+    Migration(5, "Create full-text and trigram search indexes", create_search_indexes, transactional=False),
+    Migration(6, "Cascade deletes from form_data to child tables", cascade_child_foreign_keys, transactional=False),
+    Migration(7, "Add form_data.content_hash", add_content_hash),
+    Migration(8, "Index form_data.content_hash", create_model_indexes, transactional=False),
+    Migration(9, "Maintain the form_data row count in table_counters", create_table_counters),
+    Migration(10, "Add the form_data version counter", add_version_counter),
+    Migration(11, "Add form_data.dedup_hash", add_dedup_hash),
+    Migration(12, "Uniquely index form_data.dedup_hash", create_model_indexes, transactional=False),
+]
+
+
+@contextmanager
+def migration_lock(engine: Engine) -> Iterator[None]:
+    """Serialize migration runs across processes (PostgreSQL only)."""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_ID})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_ID})
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in order and return the versions applied."""
+    migration_metadata.create_all(engine)
+    applied_now = []
+    with migration_lock(engine):
+        with engine.connect() as connection:
+            applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+        for migration in MIGRATIONS:
+            if migration.version in applied:
+                continue
+            if migration.transactional:
+                with engine.begin() as connection:
+                    migration.apply(connection)
+                    _record(connection, migration)
+            else:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                    migration.apply(connection)
+                    _record(connection, migration)
+            applied_now.append(migration.version)
+    return applied_now
+
+
+def _record(connection: Connection, migration: Migration) -> None:
+    connection.execute(
+        insert(schema_migrations).values(
+            version=migration.version, description=migration.description, applied_at=datetime.now()
+        )
+    )
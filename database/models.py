@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, String, Text, Boolean, DateTime, BigInteger, ForeignKey, Table, Index, DDL, event, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from database.connection import Base
@@ -6,6 +6,7 @@ import uuid
 from datetime import datetime, timezone
 
 CASCADE_DELETE = "all, delete-orphan"
+# Child rows are removed by the database (ON DELETE CASCADE), not loaded and deleted one by one.
 FORM_DATA_FK = "form_data.id"
 
 def utc_now():
@@ -17,6 +18,10 @@ class FormDataModel(Base):
     Maps to the FormData Pydantic schema.
     """
     __tablename__ = "form_data"
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id) in order.
+        Index("ix_form_data_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
 
@@ -50,23 +55,37 @@ class FormDataModel(Base):
     volunteer_work = Column(Text, default="")
     additional_notes = Column(Text, default="")
 
+    # Denormalized full-text source (summary, goals, skills, job experience),
+    # maintained by FormDataRepository and indexed by database/search_indexes.py.
+    search_document = Column(Text, default="")
+
+    # "<scalar sha256>:<children sha256>" of the last full submission (services/content_hash.py);
+    # child-only writes empty the children half, and a PATCH of scalar fields clears it.
+    content_hash = Column(String(129), nullable=True, index=True)
+    # content_hash of a form created with ?dedup=true, until its first write; the unique
+    # index makes concurrent identical dedup submissions insert only once.
+    dedup_hash = Column(String(129), nullable=True, index=True, unique=True)
+
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
 
-    educations = relationship("EducationModel", back_populates="form_data", cascade=CASCADE_DELETE)
-    job_experiences = relationship("JobExperienceModel", back_populates="form_data", cascade=CASCADE_DELETE)
-    skills = relationship("SkillModel", back_populates="form_data", cascade=CASCADE_DELETE)
-    certifications = relationship("CertificationModel", back_populates="form_data", cascade=CASCADE_DELETE)
-    languages = relationship("LanguageModel", back_populates="form_data", cascade=CASCADE_DELETE)
-    projects = relationship("ProjectModel", back_populates="form_data", cascade=CASCADE_DELETE)
-    references = relationship("ReferenceModel", back_populates="form_data", cascade=CASCADE_DELETE)
+    educations = relationship("EducationModel", back_populates="form_data", cascade=CASCADE_DELETE, passive_deletes=True)
+    job_experiences = relationship("JobExperienceModel", back_populates="form_data", cascade=CASCADE_DELETE, passive_deletes=True)
+    skills = relationship("SkillModel", back_populates="form_data", cascade=CASCADE_DELETE, passive_deletes=True)
+    certifications = relationship("CertificationModel", back_populates="form_data", cascade=CASCADE_DELETE, passive_deletes=True)
+    languages = relationship("LanguageModel", back_populates="form_data", cascade=CASCADE_DELETE, passive_deletes=True)
+    projects = relationship("ProjectModel", back_populates="form_data", cascade=CASCADE_DELETE, passive_deletes=True)
+    references = relationship("ReferenceModel", back_populates="form_data", cascade=CASCADE_DELETE, passive_deletes=True)
+
+    # Not a column: set on results of ranked full-text searches (lower ranks first).
+    search_rank = None
 
 class EducationModel(Base):
     """SQLAlchemy model for Education table."""
     __tablename__ = "educations"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK), nullable=False)
+    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK, ondelete="CASCADE"), nullable=False, index=True)
     university_name = Column(String(255), nullable=False)
     degree_type = Column(String(50), nullable=True)
     course_name = Column(String(255), nullable=False)
@@ -78,7 +97,7 @@ class JobExperienceModel(Base):
     __tablename__ = "job_experiences"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    form_data_id = Column(UUID(as_uuid=True), ForeignKey("form_data.id"), nullable=False)
+    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK, ondelete="CASCADE"), nullable=False)
     job_title = Column(String(255), nullable=False)
     company_name = Column(String(255), nullable=False)
     start_date = Column(String(10), nullable=False)
@@ -86,6 +105,12 @@ class JobExperienceModel(Base):
     is_present_job = Column(Boolean, default=False)
     description = Column(Text, default="")
 
+    # Leading form_data_id serves relationship loads and deletes; the lower() columns serve
+    # the case-insensitive child filters of FormDataRepository.search (services/child_filters.py).
+    __table_args__ = (
+        Index("ix_job_experiences_form_data_id_company_title", form_data_id, func.lower(company_name), func.lower(job_title)),
+    )
+
     form_data = relationship("FormDataModel", back_populates="job_experiences")
 
 class SkillModel(Base):
@@ -93,11 +118,13 @@ class SkillModel(Base):
     __tablename__ = "skills"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    form_data_id = Column(UUID(as_uuid=True), ForeignKey("form_data.id"), nullable=False)
+    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK, ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     level = Column(String(50), nullable=True)
     category = Column(String(255), nullable=False)
     
+    __table_args__ = (Index("ix_skills_form_data_id_name_level", form_data_id, func.lower(name), func.lower(level)),)
+
     form_data = relationship("FormDataModel", back_populates="skills")
 
 class CertificationModel(Base):
@@ -105,13 +132,15 @@ class CertificationModel(Base):
     __tablename__ = "certifications"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    form_data_id = Column(UUID(as_uuid=True), ForeignKey("form_data.id"), nullable=False)
+    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK, ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     issuer = Column(String(255), nullable=False)
     date_obtained = Column(String(10), nullable=False)
     expiry_date = Column(String(10), nullable=False)
     has_expiry = Column(Boolean, default=True)
     
+    __table_args__ = (Index("ix_certifications_form_data_id_name_issuer", form_data_id, func.lower(name), func.lower(issuer)),)
+
     form_data = relationship("FormDataModel", back_populates="certifications")
 
 class LanguageModel(Base):
@@ -119,10 +148,12 @@ class LanguageModel(Base):
     __tablename__ = "languages"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    form_data_id = Column(UUID(as_uuid=True), ForeignKey("form_data.id"), nullable=False)
+    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK, ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     proficiency = Column(String(50), nullable=True)
     
+    __table_args__ = (Index("ix_languages_form_data_id_name_proficiency", form_data_id, func.lower(name), func.lower(proficiency)),)
+
     form_data = relationship("FormDataModel", back_populates="languages")
 
 class ProjectModel(Base):
@@ -130,7 +161,7 @@ class ProjectModel(Base):
     __tablename__ = "projects"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    form_data_id = Column(UUID(as_uuid=True), ForeignKey("form_data.id"), nullable=False)
+    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK, ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, default="")
     technologies = Column(Text, default="")
@@ -146,7 +177,7 @@ class ReferenceModel(Base):
     __tablename__ = "references"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    form_data_id = Column(UUID(as_uuid=True), ForeignKey("form_data.id"), nullable=False)
+    form_data_id = Column(UUID(as_uuid=True), ForeignKey(FORM_DATA_FK, ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     position = Column(String(255), nullable=False)
     company = Column(String(255), nullable=False)
@@ -154,3 +185,37 @@ class ReferenceModel(Base):
     phone = Column(String(20), nullable=False)
 
     form_data = relationship("FormDataModel", back_populates="references")
+
+class TableCounterModel(Base):
+    """
+    Counters maintained by FormDataRepository in the same transaction as the writes they
+    count: the form_data row count, read in O(1) instead of by a full-table count(*),
+    and a version bumped by every write, behind the ETags of list and search responses.
+    """
+    __tablename__ = "table_counters"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+FORM_DATA_COUNTER = "form_data"
+FORM_DATA_VERSION = "form_data_version"
+# Seeded with the table, so the counters exist before the first write.
+for counter_name in (FORM_DATA_COUNTER, FORM_DATA_VERSION):
+    event.listen(
+        TableCounterModel.__table__,
+        "after_create",
+        DDL(f"INSERT INTO table_counters (name, value) VALUES ('{counter_name}', 0)")
+    )
+
+
+# Child collections of FormDataModel, keyed by relationship name.
+CHILD_MODELS = {
+    "educations": EducationModel,
+    "job_experiences": JobExperienceModel,
+    "skills": SkillModel,
+    "certifications": CertificationModel,
+    "languages": LanguageModel,
+    "projects": ProjectModel,
+    "references": ReferenceModel,
+}
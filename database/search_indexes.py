@@ -0,0 +1,166 @@
+"""
+Search indexes over form_data.
+
+Full-text search over search_document:
+PostgreSQL: a tsvector column with a GIN index, kept current by a BEFORE INSERT/UPDATE
+trigger. It is a plain nullable column rather than a generated one, which would rewrite
+the whole table under an exclusive lock when added; existing rows are filled by the
+migration in committed batches.
+SQLite: an external-content FTS5 table kept in sync by triggers.
+
+Substring (`%term%`) search over the TRIGRAM_COLUMNS:
+PostgreSQL: pg_trgm GIN indexes, which ILIKE uses directly for terms of 3+ characters.
+SQLite: an external-content FTS5 table with the trigram tokenizer, kept in sync by
+triggers and probed with a phrase query per column.
+
+The SQLite tables key rows by form_data's implicit rowid, which VACUUM may renumber;
+run rebuild_sqlite_fts() after a VACUUM.
+"""
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, DDL, Float, Integer, MetaData, Table, Text, event, func, literal, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import ColumnElement
+from database.models import FormDataModel, JobExperienceModel, SkillModel
+
+TEXT_SEARCH_CONFIG = "english"
+SEARCH_VECTOR_COLUMN = "search_vector"
+# Columns FormDataRepository.search filters on by substring.
+TRIGRAM_COLUMNS = ("first_name", "last_name", "email", "job")
+# Shorter terms have no trigram and fall back to a scan.
+MIN_TRIGRAM_TERM_LENGTH = 3
+# Inputs of search_document_expression(): a write that changes any of them must refresh it.
+SEARCH_DOCUMENT_FIELDS = ("professional_summary", "career_goals")
+SEARCH_DOCUMENT_COLLECTIONS = ("skills", "job_experiences")
+
+# Kept out of Base.metadata: created by the DDL below, never by create_all().
+fts_metadata = MetaData()
+form_data_fts = Table(
+    "form_data_fts",
+    fts_metadata,
+    Column("rowid", Integer),
+    Column("search_document", Text),
+    Column("rank", Float),
+)
+form_data_trigram = Table(
+    "form_data_trigram",
+    fts_metadata,
+    Column("rowid", Integer),
+    *(Column(name, Text) for name in TRIGRAM_COLUMNS),
+)
+
+SEARCH_VECTOR_SQL = f"to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(search_document, ''))"
+
+# Column and trigger; adding a nullable column without a default only changes the catalog.
+POSTGRES_FTS_DDL = [
+    f"ALTER TABLE form_data ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector",
+    f"""CREATE OR REPLACE FUNCTION form_data_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.{SEARCH_VECTOR_COLUMN} := to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(NEW.search_document, ''));
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    """DO $$ BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'form_data_search_vector' AND tgrelid = 'form_data'::regclass
+        ) THEN
+            CREATE TRIGGER form_data_search_vector BEFORE INSERT OR UPDATE OF search_document ON form_data
+            FOR EACH ROW EXECUTE FUNCTION form_data_search_vector();
+        END IF;
+    END $$""",
+]
+# Built after the backfill, concurrently when run by the migration.
+POSTGRES_FTS_INDEX_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_form_data_search_vector ON form_data USING gin ({SEARCH_VECTOR_COLUMN})",
+]
+
+POSTGRES_TRIGRAM_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_form_data_{name}_trgm ON form_data USING gin ({name} gin_trgm_ops)"
+    for name in TRIGRAM_COLUMNS
+]
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS form_data_fts USING fts5(
+        search_document, content='form_data', content_rowid='rowid', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS form_data_fts_insert AFTER INSERT ON form_data BEGIN
+        INSERT INTO form_data_fts(rowid, search_document) VALUES (new.rowid, new.search_document);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS form_data_fts_delete AFTER DELETE ON form_data BEGIN
+        INSERT INTO form_data_fts(form_data_fts, rowid, search_document)
+        VALUES ('delete', old.rowid, old.search_document);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS form_data_fts_update AFTER UPDATE OF search_document ON form_data BEGIN
+        INSERT INTO form_data_fts(form_data_fts, rowid, search_document)
+        VALUES ('delete', old.rowid, old.search_document);
+        INSERT INTO form_data_fts(rowid, search_document) VALUES (new.rowid, new.search_document);
+    END""",
+]
+
+_trigram_names = ", ".join(TRIGRAM_COLUMNS)
+_trigram_old = ", ".join(f"old.{name}" for name in TRIGRAM_COLUMNS)
+_trigram_new = ", ".join(f"new.{name}" for name in TRIGRAM_COLUMNS)
+
+SQLITE_TRIGRAM_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS form_data_trigram USING fts5(
+        {_trigram_names}, content='form_data', content_rowid='rowid', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS form_data_trigram_insert AFTER INSERT ON form_data BEGIN
+        INSERT INTO form_data_trigram(rowid, {_trigram_names}) VALUES (new.rowid, {_trigram_new});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS form_data_trigram_delete AFTER DELETE ON form_data BEGIN
+        INSERT INTO form_data_trigram(form_data_trigram, rowid, {_trigram_names})
+        VALUES ('delete', old.rowid, {_trigram_old});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS form_data_trigram_update AFTER UPDATE OF {_trigram_names} ON form_data BEGIN
+        INSERT INTO form_data_trigram(form_data_trigram, rowid, {_trigram_names})
+        VALUES ('delete', old.rowid, {_trigram_old});
+        INSERT INTO form_data_trigram(rowid, {_trigram_names}) VALUES (new.rowid, {_trigram_new});
+    END""",
+]
+
+def search_document_expression(values: Optional[Dict[str, Any]] = None) -> ColumnElement:
+    """
+    SQL expression rebuilding form_data.search_document from the row itself and its
+    skills and job experiences, so it can be refreshed in one UPDATE after any write.
+    An UPDATE's SET clause sees the old row, so pass the new scalar `values` when
+    the document is computed in the same statement that changes them.
+    """
+    def scalar(name: str) -> ColumnElement:
+        if values is not None and name in values:
+            return func.coalesce(literal(values[name], Text), "")
+        return func.coalesce(getattr(FormDataModel, name), "")
+
+    def aggregated(model, *columns) -> ColumnElement:
+        text_value = columns[0]
+        for column in columns[1:]:
+            text_value = text_value + " " + func.coalesce(column, "")
+        return func.coalesce(
+            select(func.aggregate_strings(text_value, " "))
+            .where(model.form_data_id == FormDataModel.id)
+            .scalar_subquery(),
+            ""
+        )
+
+    return (
+        scalar("professional_summary") + " "
+        + scalar("career_goals") + " "
+        + aggregated(SkillModel, SkillModel.name, SkillModel.category) + " "
+        + aggregated(JobExperienceModel, JobExperienceModel.job_title, JobExperienceModel.description)
+    )
+
+
+form_data_table = FormDataModel.__table__
+
+for statement in POSTGRES_FTS_DDL + POSTGRES_FTS_INDEX_DDL + POSTGRES_TRIGRAM_DDL:
+    event.listen(form_data_table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_FTS_DDL + SQLITE_TRIGRAM_DDL:
+    event.listen(form_data_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for table in (form_data_fts, form_data_trigram):
+    event.listen(form_data_table, "before_drop", DDL(f"DROP TABLE IF EXISTS {table.name}").execute_if(dialect="sqlite"))
+
+
+def rebuild_sqlite_fts(connection: Connection) -> None:
+    """Re-index every row of the SQLite FTS5 tables from form_data."""
+    for table in (form_data_fts, form_data_trigram):
+        connection.execute(text(f"INSERT INTO {table.name}({table.name}) VALUES ('rebuild')"))
@@ -2,11 +2,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routes.form_data_routes import router as form_data_router
-from database import create_tables
+from routes.dependencies import DB_EXECUTION_MODE
+from services.db_executor import get_db_executor, shutdown_db_executor
+from services.document_cache import get_document_cache, get_search_cache, get_compressed_cache, shutdown_caches
+from utils.compression import CompressionMiddleware
+from database.migrations import run_migrations
 import os
 from dotenv import load_dotenv
 from database.connection import engine
-from database.models import Base
 
 load_dotenv()
 
@@ -23,12 +26,18 @@ async def lifespan(app: FastAPI):
     
     print("🚀 Starting up the application...")
     
-    Base.metadata.create_all(bind=engine)
-    print("📊 Database tables created successfully!")
+    applied = run_migrations(engine)
+    print(f"📊 Database schema up to date ({len(applied)} migrations applied)")
     
     yield
     
     print("🛑 Shutting down the application...")
+    
+    if DB_EXECUTION_MODE == "async":
+        from database.async_connection import async_engine
+        await async_engine.dispose()
+    shutdown_db_executor()
+    shutdown_caches()
 
 app = FastAPI(
     title=API_TITLE, 
@@ -48,6 +57,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(form_data_router)
 
 @app.get("/")
@@ -63,6 +74,22 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/executor")
+def executor_stats():
+    """Queue depth and wait time of the database thread pool (threadpool mode)."""
+    if DB_EXECUTION_MODE != "threadpool":
+        return {"mode": DB_EXECUTION_MODE, "executor": None}
+    return {"mode": DB_EXECUTION_MODE, "executor": get_db_executor().stats()}
+
+@app.get("/health/cache")
+def cache_stats():
+    """Size and hit/miss/eviction counters of the document and search caches, per tier, and of compressed bodies."""
+    return {
+        "documents": get_document_cache().stats(),
+        "searches": get_search_cache().stats(),
+        "compressed": get_compressed_cache().stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
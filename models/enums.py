@@ -45,3 +45,9 @@ class WorkType(str, Enum):
     ONSITE = "On-site"
     HYBRID = "Hybrid"
     ANY = "Any"
+
+
+class CountMode(str, Enum):
+    COUNTER = "counter"
+    EXACT = "exact"
+    ESTIMATE = "estimate"
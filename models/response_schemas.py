@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field
-from typing import List, Optional, Generic, TypeVar, Any
+from typing import List, Optional, Generic, TypeVar, Any, Dict, Union
 from datetime import datetime
 from .enums import Title, MaritalStatus, DegreeType, SkillLevel, ProficiencyLevel, WorkType
 
@@ -11,11 +11,40 @@ class CreateResponse(BaseModel):
     
     id: str
 
+class BatchCreateResponse(BaseModel):
+    """Response model for batch creation operations"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    ids: List[str]
+
+class BulkDeleteResponse(BaseModel):
+    """Response model for bulk delete operations"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    deleted: int
+
+class ImportLineError(BaseModel):
+    """Validation errors for one rejected import record"""
+    line: int
+    errors: Dict[str, str]
+
+class ImportReportResponse(BaseModel):
+    """Response model for streaming import operations"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    accepted: int
+    rejected: int
+    duration_seconds: float
+    rows_per_second: float
+    errors: List[ImportLineError] = []
+    errors_truncated: bool = False
+
 class StorageInfoResponse(BaseModel):
     """Response model for storage information"""
     model_config = ConfigDict(from_attributes=True)
     
     total_entries: int
+    count_mode: str
     storage_type: str
     database_engine: str
 
@@ -50,6 +79,11 @@ class ApiResponse(BaseModel, Generic[T]):
             )
 
 
+class PaginatedApiResponse(ApiResponse[T], Generic[T]):
+    """Response envelope for keyset-paginated collections."""
+    next_cursor: Optional[str] = Field(default=None)
+
+
 class EducationResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -123,7 +157,25 @@ class ReferenceResponse(BaseModel):
     phone: str
 
 
-class FormDataResponse(BaseModel):
+# One entry of a child collection, as returned by the child sub-resources.
+ChildResponse = Union[
+    EducationResponse, JobExperienceResponse, SkillResponse, CertificationResponse,
+    LanguageResponse, ProjectResponse, ReferenceResponse
+]
+# Response models of the child sub-resources, keyed by child collection name.
+CHILD_RESPONSES = {
+    "educations": EducationResponse,
+    "job_experiences": JobExperienceResponse,
+    "skills": SkillResponse,
+    "certifications": CertificationResponse,
+    "languages": LanguageResponse,
+    "projects": ProjectResponse,
+    "references": ReferenceResponse,
+}
+
+
+class FormDataScalarResponse(BaseModel):
+    """The scalar fields of a form, as returned by a delete."""
     model_config = ConfigDict(from_attributes=True)
     
     id: str
@@ -155,6 +207,9 @@ class FormDataResponse(BaseModel):
     additional_notes: str = ""
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+
+
+class FormDataResponse(FormDataScalarResponse):
     educations: List[EducationResponse] = []
     job_experiences: List[JobExperienceResponse] = []
     skills: List[SkillResponse] = []
@@ -162,3 +217,14 @@ class FormDataResponse(BaseModel):
     languages: List[LanguageResponse] = []
     projects: List[ProjectResponse] = []
     references: List[ReferenceResponse] = []
+
+
+# A full response model, or a sparse dict when the client used fields=/include=.
+FormDataDocument = Union[FormDataResponse, Dict[str, Any]]
+
+
+class FormDataPage(BaseModel):
+    """One keyset page of form data; next_cursor is None on the last page."""
+    # Serialized by alias, a page is the data/next_cursor part of the response envelope.
+    items: List[FormDataDocument] = Field(default=[], serialization_alias="data")
+    next_cursor: Optional[str] = None
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field, validator, ConfigDict
+from pydantic import BaseModel, Field, validator, model_validator, ConfigDict, create_model
+import copy
 from typing import List, Optional
 from datetime import date
 from .enums import (
@@ -7,6 +8,7 @@ from .enums import (
 )
 
 DATE_FORMAT_DESC = "Date in YYYY-MM-DD format"
+MAX_BULK_DELETE_IDS = 10000
 
 
 class Education(BaseModel):
@@ -162,3 +164,67 @@ class FormData(BaseModel):
             }
         }
     )
+
+
+
+def _new_child_model(schema):
+    """The child schema without its id, which the server assigns."""
+    fields = {name: (field.annotation, field) for name, field in schema.model_fields.items() if name != "id"}
+    return create_model(f"New{schema.__name__}", __config__=ConfigDict(use_enum_values=True), **fields)
+
+
+# Request bodies of POST /{id}/<collection>, keyed by child collection name.
+NEW_CHILD_SCHEMAS = {
+    collection: _new_child_model(schema)
+    for collection, schema in (
+        ("educations", Education), ("job_experiences", JobExperience), ("skills", Skill),
+        ("certifications", Certification), ("languages", Language), ("projects", Project),
+        ("references", Reference),
+    )
+}
+
+
+def _optional_field(field):
+    """Same type and constraints, but omittable; an explicit null is still validated."""
+    patch_field = copy.copy(field)
+    patch_field.default = None
+    patch_field.default_factory = None
+    return field.annotation, patch_field
+
+
+# Partial FormData for PATCH: only fields present in the request (model_fields_set) are applied.
+FormDataPatch = create_model(
+    "FormDataPatch",
+    __config__=ConfigDict(use_enum_values=True),
+    __doc__="Partial form data; every field is optional.",
+    **{name: _optional_field(field) for name, field in FormData.model_fields.items()}
+)
+
+class SearchFilter(BaseModel):
+    """Criteria of GET /search, selecting the forms a bulk operation applies to."""
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    job_title: Optional[str] = None
+    q: Optional[str] = None
+    skill: List[str] = []
+    language: List[str] = []
+    certification: List[str] = []
+    experience: List[str] = []
+
+    def is_empty(self) -> bool:
+        return not any(self.model_dump().values())
+
+
+class BulkDeleteRequest(BaseModel):
+    """Forms to delete: explicit IDs, or every form matching a filter."""
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=MAX_BULK_DELETE_IDS)
+    filter: Optional[SearchFilter] = None
+
+    @model_validator(mode="after")
+    def check_selector(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either ids or filter")
+        if self.filter is not None and self.filter.is_empty():
+            raise ValueError("filter needs at least one criterion")
+        return self
@@ -0,0 +1,37 @@
+"""
+Service dependencies for the form-data routes.
+DB_EXECUTION_MODE selects how the synchronous service layer is driven:
+  sync       - on the event loop with a sync Session (default)
+  threadpool - on a bounded thread pool sized to the connection pool
+  async      - on an AsyncSession through the asyncio driver (aiosqlite/asyncpg)
+"""
+import os
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from database.connection import get_db
+from services.async_form_service import AwaitableFormService, InlineFormService, ThreadPoolFormService
+from services.db_executor import get_db_executor
+
+DB_EXECUTION_MODE = os.getenv("DB_EXECUTION_MODE", "sync").lower()
+
+def get_sync_form_service(db: Session = Depends(get_db)) -> AwaitableFormService:
+    return InlineFormService(db)
+
+def get_threadpool_form_service(db: Session = Depends(get_db)) -> AwaitableFormService:
+    return ThreadPoolFormService(db, get_db_executor())
+
+if DB_EXECUTION_MODE == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from database.async_connection import get_async_db
+    from services.async_form_service import AsyncFormService
+
+    def get_async_form_service(db: AsyncSession = Depends(get_async_db)) -> AwaitableFormService:
+        return AsyncFormService(db)
+
+    get_form_service = get_async_form_service
+elif DB_EXECUTION_MODE == "threadpool":
+    get_form_service = get_threadpool_form_service
+elif DB_EXECUTION_MODE == "sync":
+    get_form_service = get_sync_form_service
+else:
+    raise ValueError(f"Unknown DB_EXECUTION_MODE '{DB_EXECUTION_MODE}'. Expected 'sync', 'threadpool' or 'async'.")
@@ -1,93 +1,348 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Header, Depends, Body, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Union
-from sqlalchemy.orm import Session
-from models.schemas import FormData
-from models.response_schemas import ApiResponse, FormDataResponse, CreateResponse, StorageInfoResponse
-from services import FormService
-from database.connection import get_db
+from models.schemas import FormData, FormDataPatch, BulkDeleteRequest, NEW_CHILD_SCHEMAS
+from models.enums import CountMode
+from models.response_schemas import (
+    ApiResponse, PaginatedApiResponse, FormDataResponse, FormDataScalarResponse, CreateResponse, BatchCreateResponse,
+    BulkDeleteResponse, ImportReportResponse, StorageInfoResponse, CHILD_RESPONSES
+)
+from services.async_form_service import AwaitableFormService
+from services.field_selection import FieldSelection, InvalidFieldSelectionError
+from services.child_filters import ChildFilter, InvalidChildFilterError
+from services.form_data_import import FormDataImporter, ImportStreamError, IMPORT_FORMATS
+from services.form_data_export import EXPORT_MEDIA_TYPES
+from routes.dependencies import get_form_service
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_PAGE_THRESHOLD, InvalidCursorError
+from utils.etags import etag_matches
 from utils.response_helpers import (
     success_response, 
+    serialized_success_response,
+    serialized_paginated_response,
+    streaming_paginated_response,
+    paginated_response,
     created_response, 
+    child_created_response,
+    batch_created_response,
+    bulk_deleted_response,
+    import_report_response,
     storage_info_response, 
+    not_modified_response,
     error_response,
-    NOT_FOUND_MESSAGE
+    NOT_FOUND_MESSAGE,
+    INVALID_CURSOR_MESSAGE,
+    INVALID_FIELDS_MESSAGE,
+    INVALID_FILTER_MESSAGE
 )
 
 router = APIRouter(prefix="/api/v1/form-data", tags=["Form Data"])
 
+FIELDS_DESCRIPTION = "Comma-separated scalar fields to return, e.g. first_name,last_name,email (id is always returned)"
+INCLUDE_DESCRIPTION = "Comma-separated child collections to return, e.g. skills,languages; empty for none"
+MAX_BATCH_SIZE = 10000
+IMPORT_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
 @router.post("/", response_model=ApiResponse[CreateResponse])
-async def create_form_data(form_data: FormData, db: Session = Depends(get_db)):
+async def create_form_data(
+    form_data: FormData,
+    form_service: AwaitableFormService = Depends(get_form_service),
+    dedup: bool = Query(False, description="Return the ID of an identical existing submission instead of creating one")
+):
     try:
-        form_service = FormService(db)
-        result = form_service.create_form_data(form_data)
+        if dedup:
+            form_id, created = await form_service.create_deduplicated_form_data(form_data)
+            if not created:
+                return created_response(form_id, "Form data already exists", status_code=200)
+            return created_response(form_id)
+        result = await form_service.create_form_data(form_data)
         return created_response(result.id)
     except Exception as e:
         return error_response({"detail": str(e)}, "Error creating form data", 500)
 
 
-@router.get("/search", response_model=ApiResponse[List[FormDataResponse]])
+@router.post("/batch", response_model=ApiResponse[BatchCreateResponse])
+async def create_form_data_batch(
+    forms: List[FormData] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+    form_service: AwaitableFormService = Depends(get_form_service)
+):
+    try:
+        result = await form_service.bulk_create_form_data(forms)
+        return batch_created_response(result, f"Created {len(result)} form data entries")
+    except Exception as e:
+        return error_response({"detail": str(e)}, "Error creating form data batch", 500)
+
+
+@router.post("/batch/delete", response_model=ApiResponse[BulkDeleteResponse])
+async def delete_form_data_batch(
+    request: BulkDeleteRequest,
+    form_service: AwaitableFormService = Depends(get_form_service)
+):
+    try:
+        deleted = await form_service.bulk_delete_form_data(request)
+        return bulk_deleted_response(deleted, f"Deleted {deleted} form data entries")
+    except InvalidChildFilterError as e:
+        return error_response({"filter": str(e)}, INVALID_FILTER_MESSAGE, 400)
+    except Exception as e:
+        return error_response({"detail": str(e)}, "Error deleting form data batch", 500)
+
+
+@router.post("/import", response_model=ApiResponse[ImportReportResponse])
+async def import_form_data(
+    request: Request,
+    input_format: Optional[str] = Query(
+        None, alias="format", description="ndjson or csv; defaults to the request Content-Type"
+    ),
+    form_service: AwaitableFormService = Depends(get_form_service)
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    input_format = (input_format or IMPORT_CONTENT_TYPES.get(content_type, "")).lower()
+    if input_format not in IMPORT_FORMATS:
+        return error_response(
+            {"format": f"Use format=ndjson|csv or Content-Type {', '.join(IMPORT_CONTENT_TYPES)}"},
+            "Unsupported import format", 415
+        )
+    content_encoding = request.headers.get("content-encoding", "identity").lower()
+    if content_encoding not in ("identity", "gzip"):
+        return error_response({"content-encoding": content_encoding}, "Unsupported content encoding", 415)
+    
+    importer = FormDataImporter(form_service)
+    try:
+        report = await importer.run(request.stream(), input_format, gzipped=content_encoding == "gzip")
+    except ImportStreamError as e:
+        return error_response(
+            {"body": str(e), "accepted": str(importer.accepted)}, "Malformed import stream", 400
+        )
+    return import_report_response(
+        report, f"Imported {report['accepted']} form data entries, rejected {report['rejected']}"
+    )
+
+
+@router.get("/export")
+async def export_form_data(
+    output_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    form_service: AwaitableFormService = Depends(get_form_service)
+):
+    chunks = await form_service.export_form_data(output_format)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[output_format],
+        headers={"Content-Disposition": f'attachment; filename="form-data.{output_format}"'}
+    )
+
+
+@router.get("/search", response_model=PaginatedApiResponse[List[FormDataResponse]])
 async def search_form_data(
-    db: Session = Depends(get_db),
+    form_service: AwaitableFormService = Depends(get_form_service),
     first_name: Optional[str] = Query(None, description="First name to search for"),
     last_name: Optional[str] = Query(None, description="Last name to search for"),
     email: Optional[str] = Query(None, description="Email to search for"),
-    job_title: Optional[str] = Query(None, description="Job title to search for")
+    job_title: Optional[str] = Query(None, description="Job title to search for"),
+    q: Optional[str] = Query(
+        None, description="Full-text query over professional summary, career goals, skills and job experience; results are ranked by relevance"
+    ),
+    skill: Optional[List[str]] = Query(None, description="Skill as name[:level], e.g. Python:Expert; repeat to require several"),
+    language: Optional[List[str]] = Query(None, description="Language as name[:proficiency], e.g. German:Fluent; repeat to require several"),
+    certification: Optional[List[str]] = Query(None, description="Certification as name[:issuer]; repeat to require several"),
+    experience: Optional[List[str]] = Query(None, description="Job experience as company[:job title]; repeat to require several"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of results per page"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None)
 ):
     try:
-        form_service = FormService(db)
-        result = form_service.search_form_data(
+        criteria = dict(
+            limit=limit,
+            cursor=cursor,
             first_name=first_name,
             last_name=last_name,
             email=email,
-            job_title=job_title
+            job_title=job_title,
+            selection=FieldSelection.parse(fields, include),
+            q=q,
+            child_filters=ChildFilter.parse_all(
+                skill=skill, language=language, certification=certification, experience=experience
+            )
         )
-        return success_response(result, "Search successful")
+        if if_none_match is not None or limit > STREAM_PAGE_THRESHOLD:
+            etag = await form_service.get_search_page_etag(**criteria)
+            if etag_matches(if_none_match, etag):
+                return not_modified_response(etag)
+        if limit > STREAM_PAGE_THRESHOLD:
+            # Large pages are streamed a batch per service call, like exports, and not cached.
+            chunks = await form_service.stream_form_data_page_json(**criteria)
+            return streaming_paginated_response(chunks, "Search successful", etag=etag)
+        page = await form_service.search_form_data_page_json(**criteria)
+        return serialized_paginated_response(page.body, "Search successful", etag=page.etag)
+    except InvalidCursorError as e:
+        return error_response({"cursor": str(e)}, INVALID_CURSOR_MESSAGE, 400)
+    except InvalidFieldSelectionError as e:
+        return error_response({"fields": str(e)}, INVALID_FIELDS_MESSAGE, 400)
+    except InvalidChildFilterError as e:
+        return error_response({"filter": str(e)}, INVALID_FILTER_MESSAGE, 400)
     except Exception as e:
         return error_response({"detail": str(e)}, "Error searching form data", 500)
 
 
 @router.get("/{form_id}", response_model=ApiResponse[FormDataResponse])
-async def get_form_data(form_id: str, db: Session = Depends(get_db)):
-    form_service = FormService(db)
-    result = form_service.get_form_data(form_id)
+async def get_form_data(
+    form_id: str,
+    form_service: AwaitableFormService = Depends(get_form_service),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None)
+):
+    try:
+        selection = FieldSelection.parse(fields, include)
+    except InvalidFieldSelectionError as e:
+        return error_response({"fields": str(e)}, INVALID_FIELDS_MESSAGE, 400)
+    etag = None
+    if if_none_match is not None or selection is not None:
+        # Read before the body, so the tag is never newer than what it is sent with.
+        etag = await form_service.get_form_data_etag(form_id, selection)
+        if etag is None:
+            return error_response({"id": f"Form data with ID {form_id} not found"}, NOT_FOUND_MESSAGE, 404)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+    if selection is None:
+        # Full documents are served as cached JSON bytes, tagged from the same row.
+        document = await form_service.get_form_data_json(form_id)
+        if document is None:
+            return error_response({"id": f"Form data with ID {form_id} not found"}, NOT_FOUND_MESSAGE, 404)
+        return serialized_success_response(document.body, "Fetch successful", etag=document.etag)
+    result = await form_service.get_form_data(form_id, selection)
     if result is None:
         return error_response({"id": f"Form data with ID {form_id} not found"}, NOT_FOUND_MESSAGE, 404)
-    return success_response(result, "Fetch successful")
+    return success_response(result, "Fetch successful", etag=etag)
 
 
-@router.get("/", response_model=ApiResponse[List[FormDataResponse]])
-async def get_all_form_data(db: Session = Depends(get_db)):
+@router.get("/", response_model=PaginatedApiResponse[List[FormDataResponse]])
+async def get_all_form_data(
+    form_service: AwaitableFormService = Depends(get_form_service),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of entries per page"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None)
+):
     try:
-        form_service = FormService(db)
-        result = form_service.get_all_form_data()
-        return success_response(result, "Fetch all successful")
+        selection = FieldSelection.parse(fields, include)
+        etag = await form_service.get_form_data_page_etag(limit, cursor, selection)
+        if etag_matches(if_none_match, etag):
+            return not_modified_response(etag)
+        if limit > STREAM_PAGE_THRESHOLD:
+            # Large pages are streamed a batch per service call, like exports.
+            chunks = await form_service.stream_form_data_page_json(limit, cursor, selection)
+            return streaming_paginated_response(chunks, "Fetch all successful", etag=etag)
+        result = await form_service.get_form_data_page(limit, cursor, selection)
+        return paginated_response(result, "Fetch all successful", etag=etag)
+    except InvalidCursorError as e:
+        return error_response({"cursor": str(e)}, INVALID_CURSOR_MESSAGE, 400)
+    except InvalidFieldSelectionError as e:
+        return error_response({"fields": str(e)}, INVALID_FIELDS_MESSAGE, 400)
     except Exception as e:
         return error_response({"detail": str(e)}, "Error retrieving form data", 500)
 
 
 @router.put("/{form_id}", response_model=ApiResponse[FormDataResponse])
-async def update_form_data(form_id: str, form_data: FormData, db: Session = Depends(get_db)):
-    form_service = FormService(db)
-    result = form_service.update_form_data(form_id, form_data)
+async def update_form_data(
+    form_id: str,
+    form_data: FormData,
+    form_service: AwaitableFormService = Depends(get_form_service),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION)
+):
+    try:
+        selection = FieldSelection.parse(fields, include)
+    except InvalidFieldSelectionError as e:
+        return error_response({"fields": str(e)}, INVALID_FIELDS_MESSAGE, 400)
+    result = await form_service.update_form_data(form_id, form_data, selection)
     if result is None:
         return error_response({"id": f"Form data with ID {form_id} not found"}, NOT_FOUND_MESSAGE, 404)
     return success_response(result, "Update successful")
 
 
-@router.delete("/{form_id}", response_model=ApiResponse[FormDataResponse])
-async def delete_form_data(form_id: str, db: Session = Depends(get_db)):
-    form_service = FormService(db)
-    result = form_service.delete_form_data(form_id)
+@router.patch("/{form_id}", response_model=ApiResponse[FormDataResponse])
+async def patch_form_data(
+    form_id: str,
+    form_patch: FormDataPatch,
+    form_service: AwaitableFormService = Depends(get_form_service),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION)
+):
+    try:
+        selection = FieldSelection.parse(fields, include)
+    except InvalidFieldSelectionError as e:
+        return error_response({"fields": str(e)}, INVALID_FIELDS_MESSAGE, 400)
+    result = await form_service.patch_form_data(form_id, form_patch, selection)
+    if result is None:
+        return error_response({"id": f"Form data with ID {form_id} not found"}, NOT_FOUND_MESSAGE, 404)
+    return success_response(result, "Patch successful")
+
+
+@router.delete("/{form_id}", response_model=ApiResponse[FormDataScalarResponse])
+async def delete_form_data(form_id: str, form_service: AwaitableFormService = Depends(get_form_service)):
+    result = await form_service.delete_form_data(form_id)
     if result is None:
         return error_response({"id": f"Form data with ID {form_id} not found"}, NOT_FOUND_MESSAGE, 404)
     return success_response(result, "Delete successful")
 
 
+def _add_child_routes(collection: str) -> None:
+    """POST /{form_id}/<collection> and DELETE /{form_id}/<collection>/{child_id} for one child collection."""
+    new_child_schema = NEW_CHILD_SCHEMAS[collection]
+    response_schema = CHILD_RESPONSES[collection]
+
+    async def add_child(
+        form_id: str,
+        child: new_child_schema,
+        form_service: AwaitableFormService = Depends(get_form_service)
+    ):
+        result = await form_service.add_child(form_id, collection, child)
+        if result is None:
+            return error_response({"id": f"Form data with ID {form_id} not found"}, NOT_FOUND_MESSAGE, 404)
+        return child_created_response(result)
+
+    async def remove_child(
+        form_id: str,
+        child_id: str,
+        form_service: AwaitableFormService = Depends(get_form_service)
+    ):
+        if not await form_service.remove_child(form_id, collection, child_id):
+            return error_response(
+                {"id": f"No {collection} entry {child_id} on form data with ID {form_id}"}, NOT_FOUND_MESSAGE, 404
+            )
+        return success_response(message="Delete successful")
+
+    router.add_api_route(
+        f"/{{form_id}}/{collection}", add_child, methods=["POST"], status_code=201,
+        response_model=ApiResponse[response_schema], name=f"add_{collection}_entry"
+    )
+    router.add_api_route(
+        f"/{{form_id}}/{collection}/{{child_id}}", remove_child, methods=["DELETE"],
+        response_model=ApiResponse[None], name=f"remove_{collection}_entry"
+    )
+
+
+for child_collection in NEW_CHILD_SCHEMAS:
+    _add_child_routes(child_collection)
+
+
 @router.get("/storage/info", response_model=ApiResponse[StorageInfoResponse])
-async def get_storage_info(db: Session = Depends(get_db)):
+async def get_storage_info(
+    form_service: AwaitableFormService = Depends(get_form_service),
+    count: CountMode = Query(
+        CountMode.COUNTER,
+        description="counter: maintained total (O(1)); exact: count(*) scan; estimate: planner statistics on PostgreSQL"
+    )
+):
     try:
-        form_service = FormService(db)
-        result = form_service.get_storage_info()
+        result = await form_service.get_storage_info(count)
         return storage_info_response(result)
     except Exception as e:
         return error_response({"detail": str(e)}, "Error getting storage info", 500)
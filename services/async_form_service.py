@@ -0,0 +1,211 @@
+"""
+Awaitable service facades used by the async route handlers.
+The business logic stays in FormService; the facades only decide where its
+synchronous calls run relative to the event loop.
+"""
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, Any, Generator, Iterator, List, Optional, Tuple, TypeVar
+from sqlalchemy.orm import Session
+from models.schemas import FormData, FormDataPatch, BulkDeleteRequest
+from models.enums import CountMode
+from pydantic import BaseModel
+from models.response_schemas import FormDataResponse, FormDataDocument, FormDataPage, ChildResponse
+from services.form_service import FormService, search_key
+from services.field_selection import FieldSelection
+from services.db_executor import DatabaseExecutor
+from services.document_cache import get_document_cache, get_search_cache, cache_key
+from utils.etags import TaggedBody
+
+if TYPE_CHECKING:
+    # Only needed in async mode; importing it requires greenlet.
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+class AwaitableFormService(ABC):
+    """
+    Async mirror of the FormService API.
+    Subclasses implement `_call`, which runs one FormService operation and returns its result.
+    """
+
+    @abstractmethod
+    async def _call(self, operation: Callable[[FormService], T]) -> T:
+        """Run one FormService operation and return its result."""
+
+    async def create_form_data(self, form_data: FormData) -> FormDataResponse:
+        return await self._call(lambda service: service.create_form_data(form_data))
+
+    async def create_deduplicated_form_data(self, form_data: FormData) -> Tuple[str, bool]:
+        return await self._call(lambda service: service.create_deduplicated_form_data(form_data))
+
+    async def bulk_create_form_data(self, forms: List[FormData]) -> List[str]:
+        return await self._call(lambda service: service.bulk_create_form_data(forms))
+
+    async def get_form_data(self, form_id: str, selection: Optional[FieldSelection] = None) -> Optional[FormDataDocument]:
+        return await self._call(lambda service: service.get_form_data(form_id, selection))
+
+    async def get_form_data_json(self, form_id: str) -> Optional[TaggedBody]:
+        # A local hit is served here, without a trip through the executor or the session.
+        key = cache_key(form_id)
+        cached = get_document_cache().get_local(key) if key is not None else None
+        if cached is not None:
+            return TaggedBody.unpack(cached)
+        return await self._call(lambda service: service.load_form_data_json(form_id))
+
+    async def stream_form_data_page_json(self, limit: int, cursor: Optional[str] = None,
+                                         selection: Optional[FieldSelection] = None, **criteria) -> "ChunkStream":
+        return await ChunkStream.start(
+            self, lambda service: service.stream_form_data_page_json(limit, cursor, selection, **criteria)
+        )
+
+    async def export_form_data(self, output_format: str) -> "ChunkStream":
+        return await ChunkStream.start(self, lambda service: service.export_form_data(output_format))
+
+    async def get_form_data_etag(self, form_id: str, selection: Optional[FieldSelection] = None) -> Optional[str]:
+        key = cache_key(form_id)
+        cached = get_document_cache().get_local(key) if key is not None and selection is None else None
+        if cached is not None:
+            return TaggedBody.unpack(cached).etag
+        return await self._call(lambda service: service.load_form_data_etag(form_id, selection))
+
+    async def get_all_form_data(self) -> List[FormDataResponse]:
+        return await self._call(lambda service: service.get_all_form_data())
+
+    async def get_form_data_page(self, limit: int, cursor: Optional[str] = None,
+                                 selection: Optional[FieldSelection] = None) -> FormDataPage:
+        return await self._call(lambda service: service.get_form_data_page(limit, cursor, selection))
+
+    async def get_form_data_page_etag(self, limit: int, cursor: Optional[str] = None,
+                                      selection: Optional[FieldSelection] = None) -> str:
+        return await self._call(lambda service: service.get_form_data_page_etag(limit, cursor, selection))
+
+    async def update_form_data(self, form_id: str, form_data: FormData,
+                               selection: Optional[FieldSelection] = None) -> Optional[FormDataDocument]:
+        return await self._call(lambda service: service.update_form_data(form_id, form_data, selection))
+
+    async def patch_form_data(self, form_id: str, form_patch: FormDataPatch,
+                              selection: Optional[FieldSelection] = None) -> Optional[FormDataDocument]:
+        return await self._call(lambda service: service.patch_form_data(form_id, form_patch, selection))
+
+    async def add_child(self, form_id: str, collection: str, child: BaseModel) -> Optional[ChildResponse]:
+        return await self._call(lambda service: service.add_child(form_id, collection, child))
+
+    async def remove_child(self, form_id: str, collection: str, child_id: str) -> bool:
+        return await self._call(lambda service: service.remove_child(form_id, collection, child_id))
+
+    async def delete_form_data(self, form_id: str) -> Optional[FormDataDocument]:
+        return await self._call(lambda service: service.delete_form_data(form_id))
+
+    async def bulk_delete_form_data(self, request: BulkDeleteRequest) -> int:
+        return await self._call(lambda service: service.bulk_delete_form_data(request))
+
+    async def search_form_data_page(self, limit: int, cursor: Optional[str] = None, **criteria) -> FormDataPage:
+        return await self._call(lambda service: service.search_form_data_page(limit, cursor, **criteria))
+
+    async def search_form_data_page_json(self, limit: int, cursor: Optional[str] = None, **criteria) -> TaggedBody:
+        cached = get_search_cache().get_local(search_key(limit=limit, cursor=cursor, **criteria))
+        if cached is not None:
+            return TaggedBody.unpack(cached)
+        return await self._call(lambda service: service.load_search_page_json(limit, cursor, **criteria))
+
+    async def get_search_page_etag(self, limit: int, cursor: Optional[str] = None, **criteria) -> str:
+        cached = get_search_cache().get_local(search_key(limit=limit, cursor=cursor, **criteria))
+        if cached is not None:
+            return TaggedBody.unpack(cached).etag
+        return await self._call(lambda service: service.load_search_page_etag(limit, cursor, **criteria))
+
+    async def get_storage_info(self, count_mode: CountMode = CountMode.COUNTER) -> Dict[str, Any]:
+        return await self._call(lambda service: service.get_storage_info(count_mode))
+
+
+class InlineFormService(AwaitableFormService):
+    """
+    Runs FormService directly on the event loop thread (DB_EXECUTION_MODE=sync).
+    Every database round trip blocks the loop; kept as the default for compatibility.
+    """
+
+    def __init__(self, db: Session):
+        self.service = FormService(db)
+
+    async def _call(self, operation: Callable[[FormService], T]) -> T:
+        return operation(self.service)
+
+
+class ThreadPoolFormService(AwaitableFormService):
+    """
+    Runs FormService on the bounded DatabaseExecutor (DB_EXECUTION_MODE=threadpool).
+    The event loop stays free while a call waits on the database; calls beyond the
+    pool size queue in the executor rather than on the connection pool.
+    """
+
+    def __init__(self, db: Session, executor: DatabaseExecutor):
+        self.service = FormService(db)
+        self.executor = executor
+
+    async def _call(self, operation: Callable[[FormService], T]) -> T:
+        return await self.executor.run(operation, self.service)
+
+
+class AsyncFormService(AwaitableFormService):
+    """
+    Runs FormService on an AsyncSession (DB_EXECUTION_MODE=async).
+    AsyncSession.run_sync executes the sync repository and mapper code in a greenlet
+    whose I/O goes through the async driver, so concurrent requests overlap their
+    database waits instead of blocking the loop.
+    """
+
+    def __init__(self, db: "AsyncSession"):
+        self.db = db
+
+    async def _call(self, operation: Callable[[FormService], T]) -> T:
+        return await self.db.run_sync(lambda session: operation(FormService(session)))
+
+
+class ChunkStream:
+    """
+    Async iterator over a FormService chunk generator, advanced one chunk per `_call`, so each
+    chunk's queries run where the facade runs its other calls (on the DatabaseExecutor in
+    threadpool mode). The generators hold no session state between chunks. `value` is the
+    generator's return value once it is exhausted.
+    """
+
+    def __init__(self, service: AwaitableFormService):
+        self._service = service
+        self._chunks: Optional[Generator[bytes, None, Any]] = None
+        self._first: Optional[Tuple[bool, Any]] = None
+        self.value: Any = None
+
+    @classmethod
+    async def start(cls, service: AwaitableFormService,
+                    open_chunks: Callable[[FormService], Iterator[bytes]]) -> "ChunkStream":
+        """Open the generator and produce its first chunk now, so its errors fail the request."""
+        stream = cls(service)
+
+        def first(form_service: FormService) -> Tuple[bool, Any]:
+            stream._chunks = open_chunks(form_service)
+            return stream._step()
+
+        stream._first = await service._call(first)
+        return stream
+
+    def __aiter__(self) -> "ChunkStream":
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self._first is not None:
+            done, item = self._first
+            self._first = None
+        else:
+            done, item = await self._service._call(lambda service: self._step())
+        if done:
+            self.value = item
+            raise StopAsyncIteration
+        return item
+
+    def _step(self) -> Tuple[bool, Any]:
+        # StopIteration cannot cross an await, so the end is returned as a flag.
+        try:
+            return False, next(self._chunks)
+        except StopIteration as end:
+            return True, end.value
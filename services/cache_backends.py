@@ -0,0 +1,158 @@
+"""
+Shared cache backends: a key-value store with counters and pub/sub, shared by every
+worker process. CACHE_BACKEND_URL selects one:
+  unset      - no shared tier; each worker only has its in-process cache
+  memory://  - InMemoryCacheBackend, shared by the caches of this process (tests, development)
+  redis://…  - RedisCacheBackend (requires the `redis` package)
+"""
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "form-data:")
+
+
+def counter_seed(now_seconds: float) -> int:
+    """
+    Starting value of a missing counter: the time in milliseconds. Counters expire, so one
+    can be recreated while entries tagged with its old values are still cached; starting
+    from the clock, a recreated counter does not repeat those values.
+    """
+    return int(now_seconds * 1000)
+
+
+class CacheBackend(ABC):
+    """Interface of a shared cache backend; modeled on the Redis commands it maps to."""
+
+    @abstractmethod
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """MGET: values of the keys, None where missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """SET with an expiry."""
+
+    @abstractmethod
+    def incr(self, key: str, ttl_seconds: float) -> int:
+        """
+        INCR and (re)set the expiry, atomically: add one to a counter and return it. A
+        missing counter starts from counter_seed().
+        """
+
+    @abstractmethod
+    def publish(self, channel: str, message: str) -> None:
+        """PUBLISH a message to every subscriber of `channel`."""
+
+    @abstractmethod
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> None:
+        """Call `handler` with every message published on `channel` from now on, by any worker."""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local stand-in for a shared backend; handlers run synchronously on publish."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._handlers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._values[key] = (value, self._clock() + ttl_seconds)
+
+    def incr(self, key: str, ttl_seconds: float) -> int:
+        with self._lock:
+            current = self._get(key)
+            now = self._clock()
+            value = (int(current) if current is not None else counter_seed(now)) + 1
+            self._values[key] = (str(value).encode(), now + ttl_seconds)
+            return value
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            handlers = list(self._handlers[channel])
+        for handler in handlers:
+            handler(message)
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> None:
+        with self._lock:
+            self._handlers[channel].append(handler)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._values[key]
+            return None
+        return value
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis (or any Redis-protocol server); subscriptions are served by a daemon thread."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND_URL is a Redis URL but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._listener = None
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return self._client.mget(keys)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._client.set(key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    def incr(self, key: str, ttl_seconds: float) -> int:
+        ttl_ms = max(1, int(ttl_seconds * 1000))
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.set(key, counter_seed(time.time()), nx=True, px=ttl_ms)
+        pipeline.incr(key)
+        pipeline.pexpire(key, ttl_ms)
+        return pipeline.execute()[1]
+
+    def publish(self, channel: str, message: str) -> None:
+        self._client.publish(channel, message)
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: lambda message: handler(message["data"].decode())})
+        if self._listener is None:
+            self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        self._client.close()
+
+
+def create_cache_backend(url: Optional[str]) -> Optional[CacheBackend]:
+    """Backend for a CACHE_BACKEND_URL; None means no shared tier."""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryCacheBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unknown CACHE_BACKEND_URL scheme in '{url}'. Expected 'memory://' or 'redis://'.")
@@ -0,0 +1,53 @@
+"""
+Search filters on child collections.
+Each filter is written as `name[:qualifier]`, e.g. `skill=Python:Expert` or
+`experience=Acme Corp:Engineer`, and matches forms that have at least one child
+row with that name (and qualifier), ignoring case.
+"""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, func
+from sqlalchemy.sql import ColumnElement
+from database.models import FormDataModel, CHILD_MODELS
+
+# Filter kind -> (collection, name column, qualifier column).
+CHILD_FILTERS: Dict[str, Tuple[str, str, str]] = {
+    "skill": ("skills", "name", "level"),
+    "language": ("languages", "name", "proficiency"),
+    "certification": ("certifications", "name", "issuer"),
+    "experience": ("job_experiences", "company_name", "job_title"),
+}
+
+
+class InvalidChildFilterError(ValueError):
+    """Raised when a child filter has no name."""
+
+
+class ChildFilter:
+    """One `name[:qualifier]` condition on a child collection."""
+
+    def __init__(self, kind: str, name: str, qualifier: Optional[str] = None):
+        self.kind = kind
+        self.name = name
+        self.qualifier = qualifier
+
+    @classmethod
+    def parse(cls, kind: str, value: str) -> "ChildFilter":
+        """Split `name[:qualifier]` at the first colon."""
+        name, _, qualifier = value.partition(":")
+        if not name.strip():
+            raise InvalidChildFilterError(f"{kind} filter needs a name, e.g. {kind}=Name[:qualifier]")
+        return cls(kind, name.strip(), qualifier.strip() or None)
+
+    @classmethod
+    def parse_all(cls, **values: Optional[List[str]]) -> List["ChildFilter"]:
+        """Parse repeated query values per kind; all resulting filters must match."""
+        return [cls.parse(kind, value) for kind, kind_values in values.items() for value in kind_values or ()]
+
+    def condition(self) -> ColumnElement:
+        """EXISTS semi-join on the child table, served by its (form_data_id, lower(name), lower(qualifier)) index."""
+        collection, name_column, qualifier_column = CHILD_FILTERS[self.kind]
+        model = CHILD_MODELS[collection]
+        clauses = [func.lower(getattr(model, name_column)) == self.name.lower()]
+        if self.qualifier is not None:
+            clauses.append(func.lower(getattr(model, qualifier_column)) == self.qualifier.lower())
+        return getattr(FormDataModel, collection).any(and_(*clauses))
@@ -0,0 +1,60 @@
+"""
+Canonical content hashes of submitted form data, used to skip no-op writes.
+
+A hash has two halves, `<scalar fields>:<child collections>`, each the SHA-256 of
+the canonical JSON of that part. A full-document PUT only writes scalar fields, so
+it compares and replaces the first half and keeps the second. A write to the children
+alone empties the second half (`<scalar fields>:`), which no submission hashes to, so
+PUTs can still be compared. Child ids are left out: the server assigns them, so a
+re-sent submission hashes the same.
+"""
+import hashlib
+import json
+from typing import Any, Optional
+from sqlalchemy import String, func, literal
+from sqlalchemy.sql import ColumnElement
+from database.models import FormDataModel, CHILD_MODELS
+from models.schemas import FormData
+
+SCALAR_HASH_LENGTH = 64
+
+
+def _digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def scalar_hash(form_data: FormData) -> str:
+    """Hash of the scalar fields, the part a PUT writes."""
+    return _digest(form_data.model_dump(mode="json", exclude=set(CHILD_MODELS)))
+
+
+def content_hash(form_data: FormData) -> str:
+    """Hash of the whole submission."""
+    children = {
+        name: [child.model_dump(mode="json", exclude={"id"}) for child in getattr(form_data, name)]
+        for name in CHILD_MODELS
+    }
+    return f"{scalar_hash(form_data)}:{_digest(children)}"
+
+
+def stored_scalar_hash() -> ColumnElement:
+    """The scalar half of form_data.content_hash, in SQL."""
+    return func.substr(FormDataModel.content_hash, 1, SCALAR_HASH_LENGTH)
+
+
+def without_children_hash(stored: Optional[str]) -> Optional[str]:
+    """A stored content hash with its children half emptied, after a write to the children alone."""
+    return f"{stored[:SCALAR_HASH_LENGTH]}:" if stored else None
+
+
+def with_scalar_hash(new_scalar_hash: str) -> ColumnElement:
+    """form_data.content_hash with its scalar half replaced; the children half stays empty while unknown."""
+    return literal(new_scalar_hash, String).concat(
+        func.coalesce(func.substr(FormDataModel.content_hash, SCALAR_HASH_LENGTH + 1, type_=String), ":")
+    )
+
+
+def stored_without_children_hash() -> ColumnElement:
+    """without_children_hash() of form_data.content_hash, in SQL."""
+    return func.substr(FormDataModel.content_hash, 1, SCALAR_HASH_LENGTH, type_=String).concat(":")
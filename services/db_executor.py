@@ -0,0 +1,89 @@
+"""
+Bounded thread pool for running the synchronous service layer off the event loop.
+Sized to the SQLAlchemy connection pool, so a worker thread never waits for a connection;
+excess calls queue here instead, where their depth and wait time are measured.
+Streamed pages and exports run here too, one call per batch, so a stream never holds a
+thread or a connection while it waits on the client.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+from database.connection import POOL_CAPACITY
+
+T = TypeVar("T")
+
+
+class DatabaseExecutor:
+    """ThreadPoolExecutor wrapper that records queue depth and queue wait time."""
+
+    def __init__(self, max_workers: int = POOL_CAPACITY):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-executor")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run `func(*args)` on the pool and await its result."""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def task() -> T:
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool size, queue depth and queue wait times (milliseconds)."""
+        with self._lock:
+            started = self._completed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queue_depth": self._queued,
+                "completed": self._completed,
+                "avg_wait_ms": round(self._total_wait / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_db_executor: Optional[DatabaseExecutor] = None
+_db_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DatabaseExecutor:
+    """Process-wide executor, created on first use."""
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is None:
+            _db_executor = DatabaseExecutor()
+        return _db_executor
+
+
+def shutdown_db_executor() -> None:
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is not None:
+            _db_executor.shutdown()
+            _db_executor = None
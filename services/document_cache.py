@@ -0,0 +1,338 @@
+"""
+Process-wide caches of serialized responses: form documents for GET /form-data/{id}
+and search result pages. Entries are the response's JSON bytes packed with its ETag
+(utils/etags.py), so a hit skips the database, the mapper and Pydantic.
+
+Each cache has two tiers. The local tier is an in-process LRU (DocumentCache) bounded
+by entry count and total bytes, with a TTL. The optional shared tier is a CacheBackend
+(services/cache_backends.py) that all workers read and fill. FormService invalidates
+after every write; an invalidation bumps a version counter in the shared tier, so
+entries cached before the write no longer match, and is broadcast so every worker
+drops the key from its local tier.
+
+Compressed variants of cached (or any strongly tagged) responses are kept apart, in a
+local LRU keyed by ETag that the compression middleware (utils/compression.py) fills.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from uuid import UUID
+from services.cache_backends import CacheBackend, create_cache_backend, CACHE_BACKEND_URL, CACHE_KEY_PREFIX
+
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "10000"))
+DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DOCUMENT_CACHE_TTL_SECONDS = float(os.getenv("DOCUMENT_CACHE_TTL_SECONDS", "60"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "30"))
+COMPRESSED_CACHE_MAX_ENTRIES = int(os.getenv("COMPRESSED_CACHE_MAX_ENTRIES", "10000"))
+COMPRESSED_CACHE_MAX_BYTES = int(os.getenv("COMPRESSED_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+COMPRESSED_CACHE_TTL_SECONDS = float(os.getenv("COMPRESSED_CACHE_TTL_SECONDS", "300"))
+INVALIDATION_CHANNEL = f"{CACHE_KEY_PREFIX}invalidations"
+# Invalidation message key meaning every entry of a cache.
+ALL_KEYS = "*"
+
+
+class _Entry(NamedTuple):
+    value: bytes
+    expires_at: float
+
+
+class DocumentCache:
+    """Thread-safe LRU of bytes values with a TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int = DOCUMENT_CACHE_MAX_ENTRIES, max_bytes: int = DOCUMENT_CACHE_MAX_BYTES,
+                 ttl_seconds: float = DOCUMENT_CACHE_TTL_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        # Bumped by every invalidation; a fill that started before one is dropped.
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def generation(self) -> int:
+        """Take before reading the value to cache, and pass it to set()."""
+        with self._lock:
+            return self._generation
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def set(self, key: str, value: bytes, generation: int) -> None:
+        """Store `value` unless something was invalidated since `generation` was taken."""
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._remove(key)
+            self._entries[key] = _Entry(value, self._clock() + self.ttl_seconds)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of size limits, occupancy and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.value)
+
+
+def cache_key(form_id: str) -> Optional[str]:
+    """Canonical form of a form ID, so differently written IDs share one entry; None if invalid."""
+    try:
+        return str(UUID(str(form_id)))
+    except ValueError:
+        return None
+
+
+class CacheToken(NamedTuple):
+    """Versions seen before reading a value from the database; set() stores it only if both still hold."""
+    generation: int
+    version: Optional[bytes]
+
+
+class SharedCache:
+    """
+    A local DocumentCache in front of an optional shared CacheBackend. Shared entries are
+    tagged with `<key version>.<cache epoch>`: invalidate() bumps the key's version and
+    clear() the epoch, so a stale entry is rejected on read instead of having to be found
+    and deleted. Local hits rely on the broadcast invalidations, and on the local TTL
+    if one is ever lost.
+    """
+
+    def __init__(self, name: str, local: DocumentCache, backend: Optional[CacheBackend] = None,
+                 ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.local = local
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else local.ttl_seconds
+        self._lock = threading.Lock()
+        self._shared_hits = 0
+        self._shared_misses = 0
+        self._shared_stale = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        cached = self.get_local(key)
+        return cached if cached is not None else self.get_shared(key)
+
+    def get_local(self, key: str) -> Optional[bytes]:
+        """Local tier only; never blocks on the network, so it is safe on the event loop."""
+        return self.local.get(key)
+
+    def get_shared(self, key: str) -> Optional[bytes]:
+        """Shared tier only, in one round trip; a hit also fills the local tier."""
+        if self.backend is None:
+            return None
+        generation = self.local.generation()
+        entry, version, epoch = self.backend.get_many(
+            [self._entry_key(key), self._version_key(key), self._epoch_key()]
+        )
+        tag, _, value = entry.partition(b"\n") if entry is not None else (None, None, None)
+        with self._lock:
+            if entry is None:
+                self._shared_misses += 1
+                return None
+            if tag != self._tag(version, epoch):
+                self._shared_stale += 1
+                self._shared_misses += 1
+                return None
+            self._shared_hits += 1
+        self.local.set(key, value, generation)
+        return value
+
+    def token(self, key: str) -> CacheToken:
+        """Take before reading the value to cache from the database, and pass it to set()."""
+        generation = self.local.generation()
+        if self.backend is None:
+            return CacheToken(generation, None)
+        version, epoch = self.backend.get_many([self._version_key(key), self._epoch_key()])
+        return CacheToken(generation, self._tag(version, epoch))
+
+    def set(self, key: str, value: bytes, token: CacheToken) -> None:
+        self.local.set(key, value, token.generation)
+        if self.backend is not None and self.local.enabled:
+            self.backend.set(self._entry_key(key), token.version + b"\n" + value, self.ttl_seconds)
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the keys everywhere, with one broadcast; call after the write has committed."""
+        for key in keys:
+            self.local.invalidate(key)
+        if self.backend is not None:
+            for key in keys:
+                self.backend.incr(self._version_key(key), self._counter_ttl)
+            self.backend.publish(INVALIDATION_CHANNEL, " ".join((self.name,) + keys))
+
+    def clear(self) -> None:
+        """Drop every key everywhere."""
+        self.local.clear()
+        if self.backend is not None:
+            self.backend.incr(self._epoch_key(), self._counter_ttl)
+            self.backend.publish(INVALIDATION_CHANNEL, f"{self.name} {ALL_KEYS}")
+
+    def on_invalidation(self, keys: List[str]) -> None:
+        """Apply an invalidation broadcast by any worker to the local tier."""
+        if ALL_KEYS in keys:
+            self.local.clear()
+        for key in keys:
+            self.local.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            shared = None
+            if self.backend is not None:
+                shared = {
+                    "backend": type(self.backend).__name__,
+                    "hits": self._shared_hits,
+                    "misses": self._shared_misses,
+                    "stale": self._shared_stale,
+                }
+        return {"local": self.local.stats(), "shared": shared}
+
+    @property
+    def _counter_ttl(self) -> float:
+        # Outlives every entry tagged with the counter's value, including one whose token was
+        # taken just before the bump and which was stored just after it.
+        return 2 * self.ttl_seconds
+
+    @staticmethod
+    def _tag(version: Optional[bytes], epoch: Optional[bytes]) -> bytes:
+        return (version or b"0") + b"." + (epoch or b"0")
+
+    def _entry_key(self, key: str) -> str:
+        return f"{CACHE_KEY_PREFIX}{self.name}:{key}"
+
+    def _version_key(self, key: str) -> str:
+        return f"{CACHE_KEY_PREFIX}{self.name}:{key}:version"
+
+    def _epoch_key(self) -> str:
+        return f"{CACHE_KEY_PREFIX}{self.name}:epoch"
+
+
+def subscribe_invalidations(backend: CacheBackend, *caches: SharedCache) -> None:
+    """Route invalidation broadcasts on `backend` to the local tiers of `caches`, by cache name."""
+    by_name = {cache.name: cache for cache in caches}
+
+    def handle(message: str) -> None:
+        name, *keys = message.split(" ")
+        cache = by_name.get(name)
+        if cache is not None:
+            cache.on_invalidation(keys)
+
+    backend.subscribe(INVALIDATION_CHANNEL, handle)
+
+
+_document_cache: Optional[SharedCache] = None
+_search_cache: Optional[SharedCache] = None
+_compressed_cache: Optional[DocumentCache] = None
+_cache_backend: Optional[CacheBackend] = None
+_caches_lock = threading.Lock()
+
+
+def _create_caches() -> None:
+    global _document_cache, _search_cache, _cache_backend
+    _cache_backend = create_cache_backend(CACHE_BACKEND_URL)
+    _document_cache = SharedCache("documents", DocumentCache(), _cache_backend)
+    _search_cache = SharedCache(
+        "searches",
+        DocumentCache(SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_TTL_SECONDS),
+        _cache_backend
+    )
+    if _cache_backend is not None:
+        subscribe_invalidations(_cache_backend, _document_cache, _search_cache)
+
+
+def get_document_cache() -> SharedCache:
+    """Process-wide document cache, created on first use."""
+    with _caches_lock:
+        if _document_cache is None:
+            _create_caches()
+        return _document_cache
+
+
+def get_search_cache() -> SharedCache:
+    """Process-wide search result cache, created on first use."""
+    with _caches_lock:
+        if _search_cache is None:
+            _create_caches()
+        return _search_cache
+
+
+def get_compressed_cache() -> DocumentCache:
+    """
+    Process-wide cache of compressed response bodies, keyed by coding and strong ETag.
+    A strong ETag names one exact body, so entries never go stale and are not invalidated
+    by writes; they are only evicted, and a write simply stops their tags being requested.
+    """
+    global _compressed_cache
+    with _caches_lock:
+        if _compressed_cache is None:
+            _compressed_cache = DocumentCache(
+                COMPRESSED_CACHE_MAX_ENTRIES, COMPRESSED_CACHE_MAX_BYTES, COMPRESSED_CACHE_TTL_SECONDS
+            )
+        return _compressed_cache
+
+
+def shutdown_caches() -> None:
+    global _document_cache, _search_cache, _compressed_cache, _cache_backend
+    with _caches_lock:
+        if _cache_backend is not None:
+            _cache_backend.close()
+        _document_cache = _search_cache = _compressed_cache = _cache_backend = None
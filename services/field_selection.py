@@ -0,0 +1,50 @@
+"""
+Sparse fieldset support for read endpoints.
+Parses the `fields=` and `include=` query parameters into the scalar columns
+and child collections a client asked for.
+"""
+from typing import Optional, Tuple
+from database.models import CHILD_MODELS
+from models.response_schemas import FormDataResponse
+
+SCALAR_FIELDS = tuple(name for name in FormDataResponse.model_fields if name not in CHILD_MODELS)
+COLLECTION_FIELDS = tuple(CHILD_MODELS)
+
+
+class InvalidFieldSelectionError(ValueError):
+    """Raised when `fields` or `include` names something that does not exist."""
+
+
+class FieldSelection:
+    """Scalar fields and child collections to read and return for each form."""
+
+    def __init__(self, fields: Tuple[str, ...] = SCALAR_FIELDS, collections: Tuple[str, ...] = COLLECTION_FIELDS):
+        self.fields = fields if "id" in fields else ("id",) + fields
+        self.collections = collections
+
+    @classmethod
+    def parse(cls, fields: Optional[str] = None, include: Optional[str] = None) -> Optional["FieldSelection"]:
+        """
+        Build a selection from comma-separated query values.
+        Returns None when neither parameter is given, meaning the full document.
+        An empty `include=` selects no child collections.
+        """
+        if fields is None and include is None:
+            return None
+        selected_fields = cls._split(fields, SCALAR_FIELDS, "fields") if fields is not None else SCALAR_FIELDS
+        selected_collections = cls._split(include, COLLECTION_FIELDS, "include") if include is not None else COLLECTION_FIELDS
+        return cls(selected_fields, selected_collections)
+
+    @staticmethod
+    def _split(value: str, allowed: Tuple[str, ...], parameter: str) -> Tuple[str, ...]:
+        names = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise InvalidFieldSelectionError(
+                f"Unknown {parameter}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+            )
+        return names
+
+
+# Scalar fields only, e.g. for rows that no longer have child collections to read.
+SCALARS_ONLY = FieldSelection(collections=())
@@ -0,0 +1,59 @@
+"""
+Streaming export of every form data entry as NDJSON or flattened CSV.
+Rows are read by keyset queries and encoded one batch at a time, so memory
+use is bounded by the batch size and bytes flow immediately.
+"""
+import csv
+import io
+from typing import Iterator
+from sqlalchemy.orm import Session
+from services.repositories.form_data_repository import FormDataRepository, STREAM_BATCH_SIZE
+from services.mappers.form_data_mapper import FormDataMapper
+from services.mappers.form_data_csv_mapper import FormDataCsvMapper, EXPORT_CSV_COLUMNS
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class FormDataExporter:
+    """Encodes the whole form data table chunk by chunk."""
+
+    def __init__(self, db: Session, batch_size: int = STREAM_BATCH_SIZE):
+        self.repository = FormDataRepository(db)
+        self.mapper = FormDataMapper()
+        self.batch_size = batch_size
+
+    def stream(self, output_format: str) -> Iterator[bytes]:
+        """Return a byte-chunk iterator for the requested format."""
+        if output_format == "csv":
+            return self.csv()
+        return self.ndjson()
+
+    def ndjson(self) -> Iterator[bytes]:
+        """One JSON document per line; one yielded chunk per batch."""
+        for batch in self.repository.stream_batches(self.batch_size):
+            yield b"".join(
+                self.mapper.db_to_response_model(db_form_data).model_dump_json().encode() + b"\n"
+                for db_form_data in batch
+            )
+
+    def csv(self) -> Iterator[bytes]:
+        """Header first, then one chunk of flattened records per batch."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_COLUMNS)
+        writer.writeheader()
+        yield self._drain(buffer)
+        for batch in self.repository.stream_batches(self.batch_size):
+            for db_form_data in batch:
+                document = self.mapper.db_to_response_model(db_form_data).model_dump(mode="json")
+                writer.writerow(FormDataCsvMapper.document_to_record(document))
+            yield self._drain(buffer)
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
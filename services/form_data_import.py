@@ -0,0 +1,216 @@
+"""
+Streaming bulk import of NDJSON or CSV form data.
+The request body is decompressed, split into records and validated incrementally;
+valid rows are written in fixed-size chunks that are committed independently.
+Memory use is bounded by the chunk size, MAX_LINE_LENGTH and the number of reported
+errors, not by the size of the upload.
+"""
+import codecs
+import csv
+import json
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from models.schemas import FormData
+from services.async_form_service import AwaitableFormService
+from services.mappers.form_data_csv_mapper import FormDataCsvMapper
+from services.repositories.form_data_repository import BULK_CHUNK_SIZE
+
+IMPORT_FORMATS = ("ndjson", "csv")
+MAX_REPORTED_ERRORS = 100
+# Longer lines are rejected, and skipped without being held in memory.
+MAX_LINE_LENGTH = 1024 * 1024
+
+# (line number, payload, error) - exactly one of payload and error is set.
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[Dict[str, str]]]
+
+
+class ImportStreamError(ValueError):
+    """Raised when the body itself cannot be read, e.g. corrupt gzip data."""
+
+
+async def gunzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Incrementally decompress a gzip body."""
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    try:
+        async for chunk in chunks:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        tail = decompressor.flush()
+    except zlib.error as e:
+        raise ImportStreamError(f"Invalid gzip data: {str(e)}") from e
+    if not decompressor.eof:
+        raise ImportStreamError("Truncated gzip data")
+    if tail:
+        yield tail
+
+
+async def iter_lines(chunks: AsyncIterator[bytes],
+                     max_line_length: int = MAX_LINE_LENGTH) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """
+    Yield (line_number, text) for each line of a UTF-8 byte stream, without line endings.
+    Each chunk is scanned once; the pieces of a line spanning chunks are joined when it
+    ends. A line over `max_line_length` characters is yielded as (line_number, None).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pieces: List[str] = []
+    length = 0
+    oversized = False
+    line_number = 0
+
+    def add_piece(piece: str) -> None:
+        nonlocal length, oversized, pieces
+        length += len(piece)
+        if length > max_line_length:
+            oversized, pieces = True, []
+        elif piece:
+            pieces.append(piece)
+
+    try:
+        async for chunk in chunks:
+            text = decoder.decode(chunk)
+            start = 0
+            end = text.find("\n")
+            while end != -1:
+                if not oversized:
+                    add_piece(text[start:end])
+                line_number += 1
+                yield line_number, None if oversized else "".join(pieces).rstrip("\r")
+                pieces, length, oversized = [], 0, False
+                start = end + 1
+                end = text.find("\n", start)
+            if not oversized:
+                add_piece(text[start:])
+        if not oversized:
+            add_piece(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        raise ImportStreamError(f"Body is not valid UTF-8 near line {line_number + 1}") from e
+    if pieces or oversized:
+        yield line_number + 1, None if oversized else "".join(pieces).rstrip("\r")
+
+
+def validation_errors(error: ValidationError) -> Dict[str, str]:
+    """Flatten a ValidationError into {field.path: message}."""
+    return {".".join(str(part) for part in item["loc"]) or "record": item["msg"] for item in error.errors()}
+
+
+class FormDataImporter:
+    """Validates streamed records and writes them in independently committed chunks."""
+
+    def __init__(self, form_service: AwaitableFormService, chunk_size: int = BULK_CHUNK_SIZE,
+                 max_reported_errors: int = MAX_REPORTED_ERRORS, max_line_length: int = MAX_LINE_LENGTH):
+        self.form_service = form_service
+        self.chunk_size = chunk_size
+        self.max_reported_errors = max_reported_errors
+        self.max_line_length = max_line_length
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._chunk: List[FormData] = []
+        self._chunk_lines: List[int] = []
+
+    async def run(self, body: AsyncIterator[bytes], input_format: str, gzipped: bool = False) -> Dict[str, Any]:
+        """Import the whole stream and return a summary report."""
+        started = time.perf_counter()
+        if gzipped:
+            body = gunzip_stream(body)
+        records = self._csv_records(body) if input_format == "csv" else self._ndjson_records(body)
+        async for line_number, payload, error in records:
+            if error is None:
+                self._accept(line_number, payload)
+            else:
+                self._reject(line_number, error)
+            if len(self._chunk) >= self.chunk_size:
+                await self._flush()
+        await self._flush()
+
+        duration = time.perf_counter() - started
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "duration_seconds": round(duration, 3),
+            "rows_per_second": round(self.accepted / duration, 1) if duration > 0 else 0.0,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+    async def _ndjson_records(self, body: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+        async for line_number, line in iter_lines(body, self.max_line_length):
+            if line is None:
+                yield line_number, None, {"record": f"Line exceeds {self.max_line_length} characters"}
+                continue
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, {"record": f"Invalid JSON: {str(e)}"}
+                continue
+            if not isinstance(payload, dict):
+                yield line_number, None, {"record": "Expected a JSON object"}
+                continue
+            yield line_number, payload, None
+
+    async def _csv_records(self, body: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+        header = None
+        pending = ""
+        start_line = 0
+        async for line_number, line in iter_lines(body, self.max_line_length):
+            if line is None:
+                # Drops the record the line belongs to; the next line starts a new one.
+                yield start_line if pending else line_number, None, {"record": f"Line exceeds {self.max_line_length} characters"}
+                pending = ""
+                continue
+            if not pending:
+                start_line = line_number
+                if not line.strip():
+                    continue
+            pending = f"{pending}\n{line}" if pending else line
+            # An odd number of quotes means a quoted cell continues on the next line.
+            if pending.count('"') % 2:
+                continue
+            values = next(csv.reader([pending]))
+            pending = ""
+            if header is None:
+                header = values
+                continue
+            try:
+                payload = FormDataCsvMapper.record_to_payload(dict(zip(header, values)))
+            except ValueError as e:
+                yield start_line, None, {"record": str(e)}
+                continue
+            yield start_line, payload, None
+        if pending:
+            yield start_line, None, {"record": "Unterminated quoted field"}
+
+    def _accept(self, line_number: int, payload: Dict[str, Any]) -> None:
+        try:
+            self._chunk.append(FormData.model_validate(payload))
+            self._chunk_lines.append(line_number)
+        except ValidationError as e:
+            self._reject(line_number, validation_errors(e))
+
+    def _reject(self, line_number: int, errors: Dict[str, str]) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({"line": line_number, "errors": errors})
+
+    async def _flush(self) -> None:
+        if not self._chunk:
+            return
+        chunk, lines = self._chunk, self._chunk_lines
+        self._chunk, self._chunk_lines = [], []
+        try:
+            await self.form_service.bulk_create_form_data(chunk)
+            self.accepted += len(chunk)
+        except Exception:
+            # A failed chunk is rolled back on its own; earlier chunks stay committed. Its
+            # rows are retried one at a time, so only the lines that fail are rejected.
+            for form_data, line_number in zip(chunk, lines):
+                try:
+                    await self.form_service.bulk_create_form_data([form_data])
+                    self.accepted += 1
+                except Exception as e:
+                    self._reject(line_number, {"record": f"Write failed: {str(e)}"})
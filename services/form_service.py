@@ -1,46 +1,219 @@
-from typing import List, Optional, Dict, Any
+from typing import Generator, Iterator, List, Optional, Dict, Any, Tuple
+from pydantic_core import to_json
 from sqlalchemy.orm import Session
-from models.schemas import FormData
-from models.response_schemas import FormDataResponse
+from models.schemas import FormData, FormDataPatch, BulkDeleteRequest
+from models.enums import CountMode
+from pydantic import BaseModel
+from models.response_schemas import FormDataResponse, FormDataDocument, FormDataPage, ChildResponse
+from services.field_selection import FieldSelection, SCALARS_ONLY, COLLECTION_FIELDS
+from services.child_filters import ChildFilter
+from services.document_cache import SharedCache, get_document_cache, get_search_cache, cache_key
 from services.repositories.form_data_repository import FormDataRepository
-from services.mappers.form_data_mapper import FormDataMapper
+from services.form_data_export import FormDataExporter
+from services.mappers.form_data_mapper import FormDataMapper, CHILD_CONVERTERS
+from database.models import FormDataModel
+from utils.pagination import encode_cursor, decode_cursor
+from utils.etags import TaggedBody, parameters_digest, document_etag, collection_etag, timestamp
+
+# Beyond this many forms, a write clears the document cache instead of invalidating each one.
+MAX_KEYED_INVALIDATIONS = 100
+
+
+def search_key(**parameters) -> str:
+    """Search cache key, also the query part of the page's ETag."""
+    return parameters_digest(resource="search", **parameters)
+
+
+def list_key(**parameters) -> str:
+    """Query part of the ETag of a GET /form-data/ page."""
+    return parameters_digest(resource="list", **parameters)
+
 
 class FormService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: Optional[SharedCache] = None, search_cache: Optional[SharedCache] = None):
         """Initialize service with dependencies."""
         self.repository = FormDataRepository(db)
         self.mapper = FormDataMapper()
+        self.cache = cache if cache is not None else get_document_cache()
+        self.search_cache = search_cache if search_cache is not None else get_search_cache()
     
     def create_form_data(self, form_data: FormData) -> FormDataResponse:
         """Create a new form data entry."""
         db_form_data = self.repository.create(form_data)
+        self.search_cache.clear()
         return self.mapper.db_to_response_model(db_form_data)
     
-    def get_form_data(self, form_id: str) -> Optional[FormDataResponse]:
-        """Retrieve form data by ID."""
-        db_form_data = self.repository.get_by_id(form_id)
-        if not db_form_data:
+    def create_deduplicated_form_data(self, form_data: FormData) -> Tuple[str, bool]:
+        """
+        ID of an existing entry last written with an identical submission, or of a new
+        entry created from it; the flag tells whether it was created.
+        """
+        form_id, created = self.repository.create_deduplicated(form_data)
+        if created:
+            self.search_cache.clear()
+        return str(form_id), created
+    
+    def bulk_create_form_data(self, forms: List[FormData]) -> List[str]:
+        """Create many form data entries with batched inserts; returns their IDs in input order."""
+        try:
+            return [str(form_id) for form_id in self.repository.bulk_create(forms)]
+        finally:
+            # Earlier chunks may have committed before a failure.
+            self.search_cache.clear()
+    
+    def get_form_data(self, form_id: str, selection: Optional[FieldSelection] = None) -> Optional[FormDataDocument]:
+        """Retrieve form data by ID, optionally restricted to a sparse selection."""
+        loaded = self.repository.get_by_id(form_id, selection)
+        if loaded is None:
             return None
-        return self.mapper.db_to_response_model(db_form_data)
+        row, children = loaded
+        return self.mapper.row_to_document(row, children, selection)
+    
+    def get_form_data_json(self, form_id: str) -> Optional[TaggedBody]:
+        """The full document as JSON bytes with its ETag, from the document cache when possible."""
+        key = cache_key(form_id)
+        if key is None:
+            return None
+        cached = self.cache.get_local(key)
+        if cached is not None:
+            return TaggedBody.unpack(cached)
+        return self.load_form_data_json(form_id)
+    
+    def load_form_data_json(self, form_id: str) -> Optional[TaggedBody]:
+        """The full document after a local cache miss: from the shared tier, else read, serialized and cached."""
+        key = cache_key(form_id)
+        if key is None:
+            return None
+        cached = self.cache.get_shared(key)
+        if cached is not None:
+            return TaggedBody.unpack(cached)
+        token = self.cache.token(key)
+        document = self.get_form_data(form_id)
+        if document is None:
+            return None
+        tagged = TaggedBody(document_etag(key, document.updated_at), document.model_dump_json().encode())
+        self.cache.set(key, tagged.pack(), token)
+        return tagged
+    
+    def get_form_data_etag(self, form_id: str, selection: Optional[FieldSelection] = None) -> Optional[str]:
+        """ETag of a document (or of a sparse selection of it); None if the form does not exist."""
+        key = cache_key(form_id)
+        if key is None:
+            return None
+        if selection is None:
+            cached = self.cache.get_local(key)
+            if cached is not None:
+                return TaggedBody.unpack(cached).etag
+        return self.load_form_data_etag(form_id, selection)
+    
+    def load_form_data_etag(self, form_id: str, selection: Optional[FieldSelection] = None) -> Optional[str]:
+        """ETag of a document from its updated_at, read by primary key without loading the row."""
+        key = cache_key(form_id)
+        updated_at = self.repository.get_updated_at(form_id) if key is not None else None
+        if updated_at is None:
+            return None
+        representation = parameters_digest(selection=selection) if selection is not None else None
+        return document_etag(key, timestamp(updated_at), representation)
     
     def get_all_form_data(self) -> List[FormDataResponse]:
         """Retrieve all form data entries."""
         db_list = self.repository.get_all()
         return self.mapper.db_list_to_response_list(db_list)
     
-    def update_form_data(self, form_id: str, form_data: FormData) -> Optional[FormDataResponse]:
-        """Update existing form data."""
-        db_form_data = self.repository.update(form_id, form_data)
-        if not db_form_data:
+    def get_form_data_page(self, limit: int, cursor: Optional[str] = None,
+                           selection: Optional[FieldSelection] = None) -> FormDataPage:
+        """Retrieve one keyset page of form data entries."""
+        db_list = self.repository.get_page(limit + 1, decode_cursor(cursor), selection)
+        return self._to_page(db_list, limit, selection)
+    
+    def get_form_data_page_etag(self, limit: int, cursor: Optional[str] = None,
+                                selection: Optional[FieldSelection] = None) -> str:
+        """ETag of one GET /form-data/ page; read it before the page."""
+        return collection_etag(self.repository.get_version(), list_key(limit=limit, cursor=cursor, selection=selection))
+    
+    def stream_form_data_page_json(self, limit: int, cursor: Optional[str] = None,
+                                   selection: Optional[FieldSelection] = None,
+                                   **criteria) -> Generator[bytes, None, Optional[str]]:
+        """
+        One list or search page as comma-separated document JSON, one chunk per batch of
+        rows read by its own keyset query; the generator returns the next cursor. No session
+        state is held between chunks, so each may be produced on a different thread. The
+        cursor is decoded and checked against the query now, before the first chunk, so a bad
+        or mismatched one still fails the request with InvalidCursorError.
+        """
+        batches = self.repository.stream_search(limit + 1, decode_cursor(cursor), selection, **criteria)
+        return self._page_chunks(batches, limit, selection)
+    
+    def export_form_data(self, output_format: str) -> Iterator[bytes]:
+        """Every entry as NDJSON or CSV chunks, one per batch, like stream_form_data_page_json."""
+        return FormDataExporter(self.repository.db).stream(output_format)
+    
+    def update_form_data(self, form_id: str, form_data: FormData,
+                         selection: Optional[FieldSelection] = None) -> Optional[FormDataDocument]:
+        """Update existing form data; only the selected child collections are read back."""
+        updated = self.repository.update(form_id, form_data)
+        if updated is None:
             return None
-        return self.mapper.db_to_response_model(db_form_data)
+        updated_row, written = updated
+        if written:
+            self._invalidate(form_id)
+        collections = selection.collections if selection is not None else COLLECTION_FIELDS
+        children = self.repository.get_children(updated_row.id, collections)
+        return self.mapper.row_to_document(updated_row, children, selection)
     
-    def delete_form_data(self, form_id: str) -> Optional[FormDataResponse]:
-        """Delete form data by ID."""
-        db_form_data = self.repository.delete(form_id)
-        if not db_form_data:
+    def patch_form_data(self, form_id: str, form_patch: FormDataPatch,
+                        selection: Optional[FieldSelection] = None) -> Optional[FormDataDocument]:
+        """Apply a partial update, syncing child collections by child id."""
+        patched = self.repository.patch(form_id, form_patch)
+        if patched is None:
             return None
-        return self.mapper.db_to_response_model(db_form_data)
+        if patched[1]:
+            self._invalidate(form_id)
+        return self.get_form_data(form_id, selection)
+    
+    def add_child(self, form_id: str, collection: str, child: BaseModel) -> Optional[ChildResponse]:
+        """Append one entry to a child collection; None if the form does not exist."""
+        row = self.repository.add_child(form_id, collection, child)
+        if row is None:
+            return None
+        self._invalidate(form_id)
+        return CHILD_CONVERTERS[collection](row)
+    
+    def remove_child(self, form_id: str, collection: str, child_id: str) -> bool:
+        """Remove one entry from a child collection; False if the form has no such entry."""
+        removed = self.repository.remove_child(form_id, collection, child_id)
+        if removed:
+            self._invalidate(form_id)
+        return removed
+    
+    def delete_form_data(self, form_id: str) -> Optional[FormDataDocument]:
+        """Delete form data by ID; returns the deleted entry's scalar fields."""
+        deleted_row = self.repository.delete(form_id)
+        if not deleted_row:
+            return None
+        self._invalidate(form_id)
+        return self.mapper.db_to_partial_response(deleted_row, SCALARS_ONLY)
+    
+    def bulk_delete_form_data(self, request: BulkDeleteRequest) -> int:
+        """Delete the requested IDs, or every entry matching the filter; returns the number deleted."""
+        if request.ids is not None:
+            deleted = self.repository.delete_many(request.ids)
+            if deleted:
+                self._invalidate(*request.ids)
+            return deleted
+        criteria = request.filter
+        try:
+            return self.repository.delete_matching(
+                criteria.first_name, criteria.last_name, criteria.email, criteria.job_title, q=criteria.q,
+                child_filters=ChildFilter.parse_all(
+                    skill=criteria.skill, language=criteria.language,
+                    certification=criteria.certification, experience=criteria.experience
+                )
+            )
+        finally:
+            # The matched IDs are never loaded; earlier chunks may have committed before a failure.
+            self.cache.clear()
+            self.search_cache.clear()
     
     def search_form_data(self, first_name: Optional[str] = None, last_name: Optional[str] = None,
                         email: Optional[str] = None, job_title: Optional[str] = None) -> List[FormDataResponse]:
@@ -48,11 +221,99 @@ class FormService:
         db_results = self.repository.search(first_name, last_name, email, job_title)
         return self.mapper.db_list_to_response_list(db_results)
     
-    def get_storage_info(self) -> Dict[str, Any]:
-        """Get storage information."""
-        total_entries = self.repository.count()
+    def search_form_data_page(self, limit: int, cursor: Optional[str] = None,
+                              first_name: Optional[str] = None, last_name: Optional[str] = None,
+                              email: Optional[str] = None, job_title: Optional[str] = None,
+                              selection: Optional[FieldSelection] = None, q: Optional[str] = None,
+                              child_filters: Optional[List[ChildFilter]] = None) -> FormDataPage:
+        """Search form data and return one keyset page of the matches (ranked when `q` is given)."""
+        db_results = self.repository.search(first_name, last_name, email, job_title,
+                                            limit=limit + 1, after=decode_cursor(cursor),
+                                            selection=selection, q=q, child_filters=child_filters)
+        return self._to_page(db_results, limit, selection)
+    
+    def search_form_data_page_json(self, limit: int, cursor: Optional[str] = None, **criteria) -> TaggedBody:
+        """
+        One search page serialized as `{"data": [...], "next_cursor": ...}`, with its ETag,
+        from the search cache when possible.
+        """
+        cached = self.search_cache.get_local(search_key(limit=limit, cursor=cursor, **criteria))
+        if cached is not None:
+            return TaggedBody.unpack(cached)
+        return self.load_search_page_json(limit, cursor, **criteria)
+    
+    def load_search_page_json(self, limit: int, cursor: Optional[str] = None, **criteria) -> TaggedBody:
+        """A search page after a local cache miss: from the shared tier, else searched, serialized and cached."""
+        key = search_key(limit=limit, cursor=cursor, **criteria)
+        cached = self.search_cache.get_shared(key)
+        if cached is not None:
+            return TaggedBody.unpack(cached)
+        token = self.search_cache.token(key)
+        etag = collection_etag(self.repository.get_version(), key)
+        page = self.search_form_data_page(limit, cursor, **criteria)
+        tagged = TaggedBody(etag, page.model_dump_json(by_alias=True).encode())
+        self.search_cache.set(key, tagged.pack(), token)
+        return tagged
+    
+    def get_search_page_etag(self, limit: int, cursor: Optional[str] = None, **criteria) -> str:
+        """ETag of one search page, from the search cache or the form_data version, without searching."""
+        key = search_key(limit=limit, cursor=cursor, **criteria)
+        cached = self.search_cache.get_local(key)
+        if cached is not None:
+            return TaggedBody.unpack(cached).etag
+        return self.load_search_page_etag(limit, cursor, **criteria)
+    
+    def load_search_page_etag(self, limit: int, cursor: Optional[str] = None, **criteria) -> str:
+        """ETag of one search page from the form_data version."""
+        return collection_etag(self.repository.get_version(), search_key(limit=limit, cursor=cursor, **criteria))
+    
+    def get_storage_info(self, count_mode: CountMode = CountMode.COUNTER) -> Dict[str, Any]:
+        """Get storage information; see FormDataRepository.count for the count modes."""
         return {
-            "total_entries": total_entries,
+            "total_entries": self.repository.count(count_mode),
+            "count_mode": count_mode.value,
             "storage_type": "database",
             "database_engine": "postgresql/sqlite"
-        }
\ No newline at end of file
+        }
+    
+    def _invalidate(self, *form_ids: str) -> None:
+        """
+        Drop the forms' cached documents and all cached searches; call after the write has
+        committed, and only if something was written, since it empties the search cache.
+        """
+        keys = [key for key in map(cache_key, form_ids) if key is not None]
+        if len(keys) > MAX_KEYED_INVALIDATIONS:
+            self.cache.clear()
+        elif keys:
+            self.cache.invalidate(*keys)
+        self.search_cache.clear()
+    
+    def _page_chunks(self, batches: Iterator[List[FormDataModel]], limit: int,
+                     selection: Optional[FieldSelection] = None) -> Generator[bytes, None, Optional[str]]:
+        """Encode `limit + 1` streamed rows like _to_page; the extra row only signals more data."""
+        sent = 0
+        try:
+            for batch in batches:
+                rows = batch[:limit - sent]
+                if rows:
+                    yield b",".join(to_json(self.mapper.db_to_document(row, selection)) for row in rows)
+                    sent += len(rows)
+                    last = rows[-1]
+                if len(rows) < len(batch):
+                    return encode_cursor(last.created_at, last.id, last.search_rank)
+            return None
+        finally:
+            batches.close()
+    
+    def _to_page(self, db_list: List[FormDataModel], limit: int,
+                 selection: Optional[FieldSelection] = None) -> FormDataPage:
+        """Build a page from `limit + 1` fetched rows; the extra row only signals more data."""
+        next_cursor = None
+        if len(db_list) > limit:
+            db_list = db_list[:limit]
+            last = db_list[-1]
+            next_cursor = encode_cursor(last.created_at, last.id, last.search_rank)
+        return FormDataPage(
+            items=self.mapper.db_list_to_documents(db_list, selection),
+            next_cursor=next_cursor
+        )
@@ -1,4 +1,5 @@
 """Mappers module for data transformation."""
 from .form_data_mapper import FormDataMapper
+from .form_data_csv_mapper import FormDataCsvMapper
 
-__all__ = ["FormDataMapper"]
+__all__ = ["FormDataMapper", "FormDataCsvMapper"]
@@ -0,0 +1,140 @@
+"""
+Conversions between the SQLAlchemy models and the Pydantic schemas, compiled once at
+import time from their metadata instead of being written out field by field.
+
+Fields are matched by name, and every schema field must be a column or a child
+relationship of its model, so a field added on one side only fails at import instead
+of silently drifting. A column's SQL type decides how it is read: UUIDs become strings
+and DateTimes ISO 8601 strings. Readers are generated Python source, one function per
+model with its child collections inlined as comprehensions, so converting a document
+is a single call. For ORM instances with everything loaded, that call reads the
+instance __dict__ directly, skipping the instrumented attribute descriptors; result
+rows, and instances with unloaded attributes, take the attribute path. Writers copy
+the shared fields with one attrgetter.
+"""
+import operator
+from typing import Any, Callable, Dict, Optional, Type
+from pydantic import BaseModel
+from sqlalchemy import DateTime, Uuid, inspect
+from sqlalchemy.orm import Mapper
+from database.models import FormDataModel, CHILD_MODELS
+from models.schemas import FormData, NEW_CHILD_SCHEMAS
+from models.response_schemas import FormDataResponse, CHILD_RESPONSES
+
+
+def _read_expression(column, source: str) -> str:
+    """Source reading one column from the expression `source` as a JSON-ready value."""
+    if isinstance(column.type, Uuid):
+        converted = f"str({source})"
+    elif isinstance(column.type, DateTime):
+        converted = f"{source}.isoformat()"
+    else:
+        return source
+    if column.nullable or isinstance(column.type, DateTime):
+        return f"({converted} if {source} is not None else None)"
+    return converted
+
+
+def _check_fields(mapper: Mapper, schema: Type[BaseModel]) -> None:
+    for name in schema.model_fields:
+        if name not in mapper.columns and name not in mapper.relationships:
+            raise TypeError(f"{schema.__name__}.{name} is neither a column nor a relationship of {mapper.class_.__name__}")
+
+
+class CompiledReader:
+    """Reads instances or result rows of one model into documents of one response schema."""
+
+    def __init__(self, model: type, schema: Type[BaseModel], children: Optional[Dict[str, "CompiledReader"]] = None):
+        self.model = model
+        self.schema = schema
+        self.children = children or {}
+        self._mapper = inspect(model)
+        _check_fields(self._mapper, schema)
+        self.columns = tuple(name for name in schema.model_fields if name in self._mapper.columns)
+        self.collections = tuple(name for name in schema.model_fields if name in self._mapper.relationships)
+        missing = set(self.collections) - set(self.children)
+        if missing:
+            raise TypeError(f"No reader for {schema.__name__} collections {sorted(missing)}")
+        name = f"{model.__name__}_to_{schema.__name__}"
+        # The whole document, children read through the relationships.
+        self.to_dict: Callable[[Any], Dict[str, Any]] = self._compile(
+            name, "row",
+            f"try:\n        state = row.__dict__\n        return {self.dict_source('state', from_state=True)}\n"
+            f"    except (AttributeError, KeyError):\n        return {self.dict_source('row')}"
+        )
+        # Only the columns, for result rows whose children are loaded separately.
+        self.columns_to_dict: Callable[[Any], Dict[str, Any]] = self._compile(
+            f"{name}_columns", "row", f"return {self.dict_source('row', with_collections=False)}"
+        )
+        # One function per column, for sparse field selections.
+        self.column_readers: Dict[str, Callable[[Any], Any]] = {
+            column: self._compile(f"{name}_{column}", "row", f"return {self._column_source(column, 'row')}")
+            for column in self.columns
+        }
+
+    def dict_source(self, source: str, with_collections: bool = True, from_state: bool = False, depth: int = 0) -> str:
+        """
+        Source of a dict literal with the schema's fields read from the instance `source`,
+        or, with `from_state`, from `source` being an instance __dict__ (KeyError if unloaded).
+        """
+        items = []
+        for field in self.schema.model_fields:
+            if field in self.columns:
+                items.append(f"{field!r}: {self._column_source(field, source, from_state)}")
+            elif with_collections:
+                item = f"child{depth}"
+                child_source = self.children[field].dict_source(item, from_state=from_state, depth=depth + 1)
+                if from_state:
+                    items.append(
+                        f"{field!r}: [{child_source} for instance{depth} in {source}[{field!r}] "
+                        f"for {item} in (instance{depth}.__dict__,)]"
+                    )
+                else:
+                    items.append(f"{field!r}: [{child_source} for {item} in {source}.{field}]")
+        return "{" + ", ".join(items) + "}"
+
+    def to_response(self, row: Any) -> BaseModel:
+        """The document as a validated response model."""
+        return self.schema.model_validate(self.to_dict(row))
+
+    def _column_source(self, column: str, source: str, from_state: bool = False) -> str:
+        value = f"{source}[{column!r}]" if from_state else f"{source}.{column}"
+        return _read_expression(self._mapper.columns[column], value)
+
+    @staticmethod
+    def _compile(name: str, argument: str, body: str) -> Callable:
+        namespace: Dict[str, Any] = {}
+        code = compile(f"def {name}({argument}):\n    {body}\n", f"<compiled mapper {name}>", "exec")
+        exec(code, namespace)
+        return namespace[name]
+
+
+class CompiledWriter:
+    """Column values of one model from a validated request schema instance."""
+
+    def __init__(self, model: type, schema: Type[BaseModel]):
+        mapper = inspect(model)
+        _check_fields(mapper, schema)
+        # Keys are assigned by the database or passed in by the repository.
+        self.columns = tuple(
+            name for name in schema.model_fields
+            if name in mapper.columns and not mapper.columns[name].primary_key and not mapper.columns[name].foreign_keys
+        )
+        getter = operator.attrgetter(*self.columns)
+        self._get = getter if len(self.columns) > 1 else lambda instance: (getter(instance),)
+
+    def __call__(self, instance: BaseModel) -> Dict[str, Any]:
+        """Enum fields are already plain values (use_enum_values)."""
+        return dict(zip(self.columns, self._get(instance)))
+
+
+CHILD_READERS: Dict[str, CompiledReader] = {
+    name: CompiledReader(CHILD_MODELS[name], CHILD_RESPONSES[name]) for name in CHILD_MODELS
+}
+FORM_DATA_READER = CompiledReader(FormDataModel, FormDataResponse, CHILD_READERS)
+
+# Child writers accept both the full child schemas (with an ignored id) and the id-less ones.
+CHILD_WRITERS: Dict[str, CompiledWriter] = {
+    name: CompiledWriter(CHILD_MODELS[name], NEW_CHILD_SCHEMAS[name]) for name in CHILD_MODELS
+}
+FORM_DATA_WRITER = CompiledWriter(FormDataModel, FormData)
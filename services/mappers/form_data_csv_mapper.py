@@ -0,0 +1,53 @@
+"""
+Flat CSV representation of form data used by bulk import and export.
+Scalar fields map to one column each; child collections are JSON-encoded arrays.
+"""
+import json
+from typing import Any, Dict, Tuple
+from database.models import CHILD_MODELS
+from models.schemas import FormData
+from models.response_schemas import FormDataResponse
+
+SCALAR_COLUMNS: Tuple[str, ...] = tuple(name for name in FormData.model_fields if name not in CHILD_MODELS)
+COLLECTION_COLUMNS: Tuple[str, ...] = tuple(CHILD_MODELS)
+CSV_COLUMNS: Tuple[str, ...] = SCALAR_COLUMNS + COLLECTION_COLUMNS
+# Exports also carry the server-generated id and timestamps; import ignores them.
+EXPORT_CSV_COLUMNS: Tuple[str, ...] = tuple(
+    name for name in FormDataResponse.model_fields if name not in CHILD_MODELS
+) + COLLECTION_COLUMNS
+
+
+class FormDataCsvMapper:
+    """Mapper class converting between CSV records and FormData payloads."""
+
+    @staticmethod
+    def record_to_payload(record: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Convert one CSV record (header -> cell) to a FormData payload.
+        Empty cells fall back to the field default; unknown columns are ignored by FormData.
+        Raises ValueError when a collection cell is not a JSON array.
+        """
+        payload: Dict[str, Any] = {}
+        for column, value in record.items():
+            if column is None or value is None or value == "":
+                continue
+            if column in COLLECTION_COLUMNS:
+                items = json.loads(value)
+                if not isinstance(items, list):
+                    raise ValueError(f"Column '{column}' must contain a JSON array")
+                payload[column] = items
+            else:
+                payload[column] = value
+        return payload
+
+    @staticmethod
+    def document_to_record(document: Dict[str, Any]) -> Dict[str, str]:
+        """Flatten a JSON-mode response document into one CSV record."""
+        record: Dict[str, str] = {}
+        for column in EXPORT_CSV_COLUMNS:
+            value = document.get(column)
+            if column in COLLECTION_COLUMNS:
+                record[column] = json.dumps(value or [], separators=(",", ":"))
+            else:
+                record[column] = "" if value is None else str(value)
+        return record
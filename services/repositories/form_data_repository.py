@@ -2,23 +2,62 @@
 Repository layer for FormData database operations.
 Handles all database access and CRUD operations.
 """
-from typing import List, Optional
-from uuid import UUID
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+import re
+from sqlalchemy.orm import Session, Query, selectinload, load_only, raiseload
+from sqlalchemy import (
+    and_, or_, tuple_, case, cast, insert, select, update, delete, func, literal, literal_column, null, text, union_all
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import ColumnElement
 from database.models import (
-    FormDataModel, EducationModel, JobExperienceModel, SkillModel,
-    CertificationModel, LanguageModel, ProjectModel, ReferenceModel
+    utc_now, FormDataModel, TableCounterModel, FORM_DATA_COUNTER, FORM_DATA_VERSION, CHILD_MODELS
 )
-from models.schemas import FormData
-from datetime import datetime
+from pydantic import BaseModel
+from models.schemas import FormData, FormDataPatch
+from models.enums import CountMode
+from database.search_indexes import (
+    form_data_fts, form_data_trigram, search_document_expression,
+    SEARCH_VECTOR_COLUMN, TEXT_SEARCH_CONFIG, MIN_TRIGRAM_TERM_LENGTH,
+    SEARCH_DOCUMENT_FIELDS, SEARCH_DOCUMENT_COLLECTIONS
+)
+from services.field_selection import FieldSelection, COLLECTION_FIELDS
+from services.child_filters import ChildFilter
+from services.content_hash import (
+    content_hash, scalar_hash, stored_scalar_hash, with_scalar_hash, without_children_hash, stored_without_children_hash
+)
+from services.mappers.compiled_mapper import FORM_DATA_WRITER, CHILD_WRITERS
+from utils.pagination import Keyset, InvalidCursorError
 
 
-def get_enum_value(value):
-    """Helper function to safely get enum value."""
-    if hasattr(value, 'value'):
-        return value.value
-    return value
+BULK_CHUNK_SIZE = 500
+STREAM_BATCH_SIZE = 500
+# Row types of the children read by get_children, one per collection.
+CHILD_ROWS = {
+    name: namedtuple(f"{model.__name__}Row", [column.name for column in model.__table__.columns])
+    for name, model in CHILD_MODELS.items()
+}
+
+
+def child_loader_options(selection: Optional[FieldSelection] = None) -> list:
+    """
+    Eager-load child collections with one batched SELECT ... IN per collection,
+    so reading N forms costs 1 + len(CHILD_MODELS) queries instead of 7N + 1.
+    With a selection, only the requested columns and collections are loaded.
+    """
+    if selection is None:
+        return [selectinload(getattr(FormDataModel, name)) for name in CHILD_MODELS]
+    # created_at is always needed to build keyset cursors.
+    columns = set(selection.fields) | {"id", "created_at"}
+    options = [load_only(*(getattr(FormDataModel, column) for column in columns))]
+    for name in CHILD_MODELS:
+        relationship = getattr(FormDataModel, name)
+        options.append(selectinload(relationship) if name in selection.collections else raiseload(relationship))
+    return options
 
 
 class FormDataRepository:
@@ -34,39 +73,14 @@ class FormDataRepository:
     def create(self, form_data: FormData) -> FormDataModel:
         """Create a new form data entry in the database."""
         try:
-            db_form_data = FormDataModel(
-                first_name=form_data.first_name,
-                last_name=form_data.last_name,
-                email=form_data.email,
-                mobile_number=form_data.mobile_number,
-                date_of_birth=form_data.date_of_birth,
-                street_address=form_data.street_address,
-                city=form_data.city,
-                state=form_data.state,
-                postal_code=form_data.postal_code,
-                country=form_data.country,
-                title=get_enum_value(form_data.title),
-                marital_status=get_enum_value(form_data.marital_status),
-                developer=form_data.developer,
-                job=form_data.job,
-                portfolio_website=form_data.portfolio_website,
-                github_url=form_data.github_url,
-                linkedin_url=form_data.linkedin_url,
-                preferred_work_type=get_enum_value(form_data.preferred_work_type),
-                expected_salary=form_data.expected_salary,
-                preferred_location=form_data.preferred_location,
-                availability_date=form_data.availability_date,
-                career_goals=form_data.career_goals,
-                professional_summary=form_data.professional_summary,
-                hobbies=form_data.hobbies,
-                volunteer_work=form_data.volunteer_work,
-                additional_notes=form_data.additional_notes
-            )
+            db_form_data = FormDataModel(**FORM_DATA_WRITER(form_data), content_hash=content_hash(form_data))
             
             self.db.add(db_form_data)
             self.db.flush()
             
-            self._create_related_records(db_form_data.id, form_data)
+            self._insert_children([(db_form_data.id, form_data)])
+            self._refresh_search_documents([db_form_data.id])
+            self._record_write(count_delta=1)
             
             self.db.commit()
             self.db.refresh(db_form_data)
@@ -77,91 +91,314 @@ class FormDataRepository:
             self.db.rollback()
             raise RuntimeError(f"Error creating form data: {str(e)}")
     
-    def get_by_id(self, form_id: str) -> Optional[FormDataModel]:
-        """Retrieve form data by ID."""
+    def create_deduplicated(self, form_data: FormData) -> Tuple[UUID, bool]:
+        """
+        Create a form unless one holds an identical submission; returns its ID and whether
+        it was created. The insert claims dedup_hash with ON CONFLICT DO NOTHING, so of two
+        concurrent identical submissions only one inserts and the other gets its ID.
+        """
+        hash_value = content_hash(form_data)
+        while True:
+            existing_id = self.find_by_content_hash(hash_value)
+            if existing_id is not None:
+                return existing_id, False
+            try:
+                form_id = self.db.execute(
+                    self._insert_statement(FormDataModel)
+                    .values(**FORM_DATA_WRITER(form_data), content_hash=hash_value, dedup_hash=hash_value)
+                    .on_conflict_do_nothing(index_elements=[FormDataModel.dedup_hash])
+                    .returning(FormDataModel.id)
+                ).scalar()
+                if form_id is None:
+                    self.db.rollback()
+                    winner_id = self.db.execute(
+                        select(FormDataModel.id).where(FormDataModel.dedup_hash == hash_value)
+                    ).scalar()
+                    if winner_id is not None:
+                        return winner_id, False
+                    # The winner was written again in the meantime; look it up afresh.
+                    continue
+                self._insert_children([(form_id, form_data)])
+                self._refresh_search_documents([form_id])
+                self._record_write(count_delta=1)
+                self.db.commit()
+                return form_id, True
+                
+            except Exception as e:
+                self.db.rollback()
+                raise RuntimeError(f"Error creating form data: {str(e)}")
+    
+    def bulk_create(self, forms: List[FormData], chunk_size: int = BULK_CHUNK_SIZE) -> List[UUID]:
+        """
+        Insert many forms with multi-row INSERTs, one transaction per chunk.
+        Parent IDs are generated up front so every child type of a chunk
+        goes in with a single executemany statement.
+        """
+        created_ids: List[UUID] = []
+        for start in range(0, len(forms), chunk_size):
+            chunk = forms[start:start + chunk_size]
+            forms_with_ids = [(uuid4(), form_data) for form_data in chunk]
+            parent_rows = [
+                {"id": form_id, **FORM_DATA_WRITER(form_data), "content_hash": content_hash(form_data)}
+                for form_id, form_data in forms_with_ids
+            ]
+            try:
+                self.db.execute(insert(FormDataModel), parent_rows)
+                self._insert_children(forms_with_ids)
+                self._refresh_search_documents([row["id"] for row in parent_rows])
+                self._record_write(count_delta=len(parent_rows))
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                raise RuntimeError(
+                    f"Error creating form data batch at item {start} ({len(created_ids)} already committed): {str(e)}"
+                )
+            created_ids.extend(row["id"] for row in parent_rows)
+        return created_ids
+    
+    def get_by_id(self, form_id: str,
+                  selection: Optional[FieldSelection] = None) -> Optional[Tuple[Row, Dict[str, List[Any]]]]:
+        """
+        Retrieve form data by ID in two round trips: its (selected) columns, then its
+        (selected) child collections in one statement through get_children.
+        Returns the row and its children, or None if it does not exist.
+        """
         try:
             uuid_id = UUID(form_id)
         except ValueError:
             return None
-            
-        return self.db.query(FormDataModel).filter(
-            FormDataModel.id == uuid_id
-        ).first()
+        
+        columns = (
+            FormDataModel.__table__.columns if selection is None
+            else [FormDataModel.__table__.c[field] for field in selection.fields]
+        )
+        row = self.db.execute(select(*columns).where(FormDataModel.id == uuid_id)).first()
+        if row is None:
+            return None
+        collections = selection.collections if selection is not None else COLLECTION_FIELDS
+        return row, self.get_children(uuid_id, collections)
     
     def get_all(self) -> List[FormDataModel]:
         """Retrieve all form data entries."""
-        return self.db.query(FormDataModel).all()
+        return self._loaded_query().all()
+    
+    def get_page(self, limit: int, after: Optional[Keyset] = None,
+                 selection: Optional[FieldSelection] = None) -> List[FormDataModel]:
+        """Retrieve up to `limit` entries ordered by (created_at, id), starting after `after`."""
+        query = self._apply_keyset(self._loaded_query(selection), limit, after)
+        return query.all()
     
-    def update(self, form_id: str, form_data: FormData) -> Optional[FormDataModel]:
-        """Update existing form data."""
+    def stream_batches(self, batch_size: int = STREAM_BATCH_SIZE,
+                       selection: Optional[FieldSelection] = None) -> Iterator[List[FormDataModel]]:
+        """
+        Yield every entry in (created_at, id) order, `batch_size` rows at a time, each batch
+        read by its own keyset query like get_page(). Children are batch-loaded per batch;
+        see _keyset_batches for how the session is released between batches.
+        """
+        def build(size: int, after: Optional[Keyset]) -> Tuple[Query, None]:
+            return self._apply_keyset(self._loaded_query(selection), size, after), None
+        return self._keyset_batches(build, build(batch_size, None), None, batch_size)
+    
+    def find_by_content_hash(self, hash_value: str) -> Optional[UUID]:
+        """ID of a form last written with exactly this submission, via the content_hash index."""
+        return self.db.execute(
+            select(FormDataModel.id).where(FormDataModel.content_hash == hash_value).limit(1)
+        ).scalar()
+    
+    def update(self, form_id: str, form_data: FormData) -> Optional[Tuple[Row, bool]]:
+        """
+        Update the scalar fields of a form with a single UPDATE ... RETURNING, recomputing
+        its search document in the same statement. Child collections are left unchanged.
+        A re-sent payload whose scalar hash matches the stored one is not written at all
+        (updated_at is kept) and the current row is read instead.
+        Returns the updated or current row's columns and whether it was written, or None
+        if it does not exist.
+        """
         try:
             uuid_id = UUID(form_id)
         except ValueError:
             return None
-            
-        db_form_data = self.db.query(FormDataModel).filter(
-            FormDataModel.id == uuid_id
-        ).first()
         
-        if not db_form_data:
+        values = FORM_DATA_WRITER(form_data)
+        new_scalar_hash = scalar_hash(form_data)
+        try:
+            updated_data = self.db.execute(
+                update(FormDataModel)
+                .where(
+                    FormDataModel.id == uuid_id,
+                    or_(FormDataModel.content_hash.is_(None), stored_scalar_hash() != new_scalar_hash)
+                )
+                .values(
+                    **values,
+                    search_document=search_document_expression(values),
+                    content_hash=with_scalar_hash(new_scalar_hash),
+                    dedup_hash=None
+                )
+                .returning(*FormDataModel.__table__.columns)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if updated_data is not None:
+                self._record_write()
+            self.db.commit()
+            
+            if updated_data is None:
+                current = self.db.execute(
+                    select(*FormDataModel.__table__.columns).where(FormDataModel.id == uuid_id)
+                ).first()
+                return (current, False) if current is not None else None
+            return updated_data, True
+            
+        except Exception as e:
+            self.db.rollback()
+            raise RuntimeError(f"Error updating form data: {str(e)}")
+    
+    def patch(self, form_id: str, form_patch: FormDataPatch) -> Optional[Tuple[FormDataModel, bool]]:
+        """
+        Apply a partial update. Only fields present in the patch are assigned, and the ORM
+        writes only columns whose value actually changed. Each child collection present is
+        synchronized by child id: matching children are updated (only if different), new
+        ones inserted and missing ones deleted, so unchanged children are never written.
+        Returns the form and whether anything was written, or None if it does not exist.
+        """
+        uuid_id = self._convert_to_uuid(form_id)
+        if uuid_id is None:
+            return None
+        db_form_data = self.db.get(FormDataModel, uuid_id)
+        if db_form_data is None:
             return None
         
         try:
-            db_form_data.first_name = form_data.first_name
-            db_form_data.last_name = form_data.last_name
-            db_form_data.email = form_data.email
-            db_form_data.mobile_number = form_data.mobile_number
-            db_form_data.date_of_birth = form_data.date_of_birth
-            db_form_data.street_address = form_data.street_address
-            db_form_data.city = form_data.city
-            db_form_data.state = form_data.state
-            db_form_data.postal_code = form_data.postal_code
-            db_form_data.country = form_data.country
-            db_form_data.title = get_enum_value(form_data.title) if form_data.title else None
-            db_form_data.marital_status = get_enum_value(form_data.marital_status) if form_data.marital_status else None
-            db_form_data.developer = form_data.developer
-            db_form_data.job = form_data.job
-            db_form_data.portfolio_website = form_data.portfolio_website
-            db_form_data.github_url = form_data.github_url
-            db_form_data.linkedin_url = form_data.linkedin_url
-            db_form_data.preferred_work_type = get_enum_value(form_data.preferred_work_type) if form_data.preferred_work_type else None
-            db_form_data.expected_salary = form_data.expected_salary
-            db_form_data.preferred_location = form_data.preferred_location
-            db_form_data.availability_date = form_data.availability_date
-            db_form_data.career_goals = form_data.career_goals
-            db_form_data.professional_summary = form_data.professional_summary
-            db_form_data.hobbies = form_data.hobbies
-            db_form_data.volunteer_work = form_data.volunteer_work
-            db_form_data.additional_notes = form_data.additional_notes
-            db_form_data.updated_at = datetime.now()
+            provided = form_patch.model_fields_set
+            for name in provided - set(CHILD_MODELS):
+                setattr(db_form_data, name, getattr(form_patch, name))
+            changed_collections = [
+                name for name in CHILD_MODELS
+                if name in provided and self._sync_children(uuid_id, name, getattr(form_patch, name))
+            ]
+            scalars_changed = self.db.is_modified(db_form_data)
+            if changed_collections and not scalars_changed:
+                db_form_data.updated_at = utc_now()
+            if scalars_changed:
+                db_form_data.content_hash = None
+            elif changed_collections:
+                db_form_data.content_hash = without_children_hash(db_form_data.content_hash)
+            if changed_collections or scalars_changed:
+                db_form_data.dedup_hash = None
+            self.db.flush()
             
+            if set(SEARCH_DOCUMENT_COLLECTIONS) & set(changed_collections) or (
+                scalars_changed and set(SEARCH_DOCUMENT_FIELDS) & provided
+            ):
+                self._refresh_search_documents([uuid_id])
+            written = bool(changed_collections) or scalars_changed
+            if written:
+                self._record_write()
             self.db.commit()
-            self.db.refresh(db_form_data)
+            return db_form_data, written
             
-            return db_form_data
+        except Exception as e:
+            self.db.rollback()
+            raise RuntimeError(f"Error patching form data: {str(e)}")
+    
+    def add_child(self, form_id: str, collection: str, child: BaseModel) -> Optional[Row]:
+        """
+        Insert one child row without loading the parent form. Touching the parent's
+        updated_at doubles as the existence check; the search document is refreshed
+        only for the collections it is built from.
+        """
+        uuid_id = self._convert_to_uuid(form_id)
+        if uuid_id is None:
+            return None
+        model = CHILD_MODELS[collection]
+        
+        try:
+            if not self._touch(uuid_id):
+                self.db.rollback()
+                return None
+            row = self.db.execute(
+                insert(model)
+                .values(form_data_id=uuid_id, **CHILD_WRITERS[collection](child))
+                .returning(*model.__table__.columns)
+            ).one()
+            if collection in SEARCH_DOCUMENT_COLLECTIONS:
+                self._refresh_search_documents([uuid_id])
+            self.db.commit()
+            return row
             
         except Exception as e:
             self.db.rollback()
-            raise RuntimeError(f"Error updating form data: {str(e)}")
+            raise RuntimeError(f"Error adding {collection} entry: {str(e)}")
     
-    def delete(self, form_id: str) -> Optional[FormDataModel]:
-        """Delete form data by ID."""
+    def remove_child(self, form_id: str, collection: str, child_id: str) -> bool:
+        """Delete one child row of the given form with a single DELETE; False if there is none."""
+        uuid_id = self._convert_to_uuid(form_id)
+        child_uuid = self._convert_to_uuid(child_id)
+        if uuid_id is None or child_uuid is None:
+            return False
+        model = CHILD_MODELS[collection]
+        
+        try:
+            result = self.db.execute(delete(model).where(model.id == child_uuid, model.form_data_id == uuid_id))
+            if result.rowcount == 0:
+                self.db.rollback()
+                return False
+            self._touch(uuid_id)
+            if collection in SEARCH_DOCUMENT_COLLECTIONS:
+                self._refresh_search_documents([uuid_id])
+            self.db.commit()
+            return True
+            
+        except Exception as e:
+            self.db.rollback()
+            raise RuntimeError(f"Error removing {collection} entry: {str(e)}")
+    
+    def get_children(self, form_id: UUID, collections: Sequence[str]) -> Dict[str, List[Any]]:
+        """
+        Load the given child collections of one form in a single statement: a UNION ALL of
+        one SELECT per collection, each filling its own columns and NULL for the others'.
+        Children are returned as named tuples with their model's column names.
+        """
+        children: Dict[str, List[Any]] = {name: [] for name in collections}
+        if not children:
+            return children
+        slots = [(name, column) for name in children for column in CHILD_MODELS[name].__table__.columns]
+        selects = [
+            select(
+                literal(name).label("collection"),
+                *(
+                    (column if owner == name else cast(null(), column.type)).label(f"{owner}__{column.name}")
+                    for owner, column in slots
+                )
+            ).where(CHILD_MODELS[name].form_data_id == form_id)
+            for name in children
+        ]
+        positions: Dict[str, List[int]] = {name: [] for name in children}
+        for index, (owner, _) in enumerate(slots, start=1):
+            positions[owner].append(index)
+        for row in self.db.execute(union_all(*selects)):
+            name = row[0]
+            children[name].append(CHILD_ROWS[name](*(row[index] for index in positions[name])))
+        return children
+    
+    def delete(self, form_id: str) -> Optional[Row]:
+        """
+        Delete form data by ID with a single DELETE ... RETURNING; child rows are removed
+        by ON DELETE CASCADE. Returns the deleted row's columns, or None if it did not exist.
+        """
         try:
             uuid_id = UUID(form_id)
         except ValueError:
             return None
-            
-        db_form_data = self.db.query(FormDataModel).filter(
-            FormDataModel.id == uuid_id
-        ).first()
-        
-        if not db_form_data:
-            return None
         
         try:
-            deleted_data = db_form_data
-            
-            self.db.delete(db_form_data)
+            deleted_data = self.db.execute(
+                delete(FormDataModel)
+                .where(FormDataModel.id == uuid_id)
+                .returning(*FormDataModel.__table__.columns)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if deleted_data is not None:
+                self._record_write(count_delta=-1)
             self.db.commit()
             
             return deleted_data
@@ -170,39 +407,309 @@ class FormDataRepository:
             self.db.rollback()
             raise RuntimeError(f"Error deleting form data: {str(e)}")
     
+    def delete_many(self, form_ids: List[str], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Delete the given IDs, one DELETE ... WHERE id IN (...) and commit per chunk. Unknown IDs are ignored."""
+        uuid_ids = [uuid_id for uuid_id in map(self._convert_to_uuid, form_ids) if uuid_id is not None]
+        deleted = 0
+        for start in range(0, len(uuid_ids), chunk_size):
+            deleted += self._delete_chunk(uuid_ids[start:start + chunk_size], deleted)
+        return deleted
+    
+    def delete_matching(self, first_name: Optional[str] = None, last_name: Optional[str] = None,
+                        email: Optional[str] = None, job_title: Optional[str] = None,
+                        q: Optional[str] = None, child_filters: Optional[List[ChildFilter]] = None,
+                        chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Delete every entry matching the search criteria, `chunk_size` rows per statement,
+        so no single transaction holds locks on the whole match set.
+        """
+        deleted = 0
+        while True:
+            query, _ = self._apply_filters(self.db.query(FormDataModel.id), first_name, last_name,
+                                           email, job_title, q, child_filters)
+            form_ids = [row.id for row in query.limit(chunk_size)]
+            if not form_ids:
+                return deleted
+            deleted += self._delete_chunk(form_ids, deleted)
+    
     def search(self, first_name: Optional[str] = None, last_name: Optional[str] = None,
-               email: Optional[str] = None, job_title: Optional[str] = None) -> List[FormDataModel]:
-        """Search form data based on criteria."""
-        query = self.db.query(FormDataModel)
-        
-        if first_name:
-            query = query.filter(FormDataModel.first_name.ilike(f"%{first_name}%"))
-        if last_name:
-            query = query.filter(FormDataModel.last_name.ilike(f"%{last_name}%"))
-        if email:
-            query = query.filter(FormDataModel.email.ilike(f"%{email}%"))
-        if job_title:
-            query = query.filter(FormDataModel.job.ilike(f"%{job_title}%"))
-        
-        return query.all()
+               email: Optional[str] = None, job_title: Optional[str] = None,
+               limit: Optional[int] = None, after: Optional[Keyset] = None,
+               selection: Optional[FieldSelection] = None, q: Optional[str] = None,
+               child_filters: Optional[List[ChildFilter]] = None) -> List[FormDataModel]:
+        """
+        Search form data based on criteria, optionally as a keyset page.
+        With `q`, results are full-text matches ordered by relevance; each returned
+        model carries its rank in `search_rank`. Every child filter must match.
+        """
+        query, rank = self._search_query(first_name, last_name, email, job_title, limit, after, selection, q, child_filters)
+        return self._with_ranks(query.all(), rank)
+    
+    def stream_search(self, limit: int, after: Optional[Keyset] = None, selection: Optional[FieldSelection] = None,
+                      batch_size: int = STREAM_BATCH_SIZE, first_name: Optional[str] = None,
+                      last_name: Optional[str] = None, email: Optional[str] = None, job_title: Optional[str] = None,
+                      q: Optional[str] = None, child_filters: Optional[List[ChildFilter]] = None
+                      ) -> Iterator[List[FormDataModel]]:
+        """
+        One keyset page of search() (or of get_page(), without criteria), yielded `batch_size`
+        rows at a time, each batch read by its own keyset query, so memory use does not grow
+        with `limit`. The first query is built, and the cursor checked, before the first batch
+        is requested, so an InvalidCursorError is raised by this call itself.
+        """
+        def build(size: int, position: Optional[Keyset]) -> Tuple[Query, Optional[ColumnElement]]:
+            return self._search_query(first_name, last_name, email, job_title, size, position, selection, q, child_filters)
+        return self._keyset_batches(build, build(min(limit, batch_size), after), limit, batch_size)
     
-    def count(self) -> int:
-        """Get total count of form data entries."""
-        return self.db.query(FormDataModel).count()
+    def _keyset_batches(self, build: Callable[[int, Optional[Keyset]], Tuple[Query, Optional[ColumnElement]]],
+                        first: Tuple[Query, Optional[ColumnElement]], limit: Optional[int],
+                        batch_size: int) -> Iterator[List[FormDataModel]]:
+        """
+        Read up to `limit` rows (all, if None) in batches, each seeking past the last row of
+        the previous one. The session is closed before each batch is yielded: the batch is
+        fully loaded and detached, and no transaction or connection is held between batches,
+        so consecutive batches may be read on different threads.
+        """
+        query, rank = first
+        remaining = limit
+        while True:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            try:
+                batch = self._with_ranks(query.all(), rank)
+            finally:
+                self.db.close()
+            if batch:
+                yield batch
+            if remaining is not None:
+                remaining -= len(batch)
+            if len(batch) < size or remaining == 0:
+                return
+            last = batch[-1]
+            after = (last.created_at, last.id) if rank is None else (last.search_rank, last.created_at, last.id)
+            query, rank = build(size if remaining is None else min(batch_size, remaining), after)
     
-    def _create_related_records(self, form_data_id, form_data: FormData) -> None:
-        """Helper method to create related records."""
-        uuid_id = self._convert_to_uuid(form_data_id)
+    def get_updated_at(self, form_id: str) -> Optional[datetime]:
+        """A form's updated_at by primary key, without loading the row; None if it does not exist."""
+        uuid_id = self._convert_to_uuid(form_id)
         if uuid_id is None:
-            return
-            
-        self._create_educations(uuid_id, form_data.educations)
-        self._create_job_experiences(uuid_id, form_data.job_experiences)
-        self._create_skills(uuid_id, form_data.skills)
-        self._create_certifications(uuid_id, form_data.certifications)
-        self._create_languages(uuid_id, form_data.languages)
-        self._create_projects(uuid_id, form_data.projects)
-        self._create_references(uuid_id, form_data.references)
+            return None
+        return self.db.execute(select(FormDataModel.updated_at).where(FormDataModel.id == uuid_id)).scalar()
+    
+    def get_version(self) -> int:
+        """The form_data version, bumped in the transaction of every write."""
+        return self.db.execute(
+            select(TableCounterModel.value).where(TableCounterModel.name == FORM_DATA_VERSION)
+        ).scalar_one()
+    
+    def count(self, mode: CountMode = CountMode.COUNTER) -> int:
+        """
+        Total number of form data entries. COUNTER reads the maintained counter row,
+        EXACT runs count(*) (a full scan), and ESTIMATE reads the planner's
+        pg_class.reltuples on PostgreSQL, falling back to the counter elsewhere or
+        while the table has never been analyzed.
+        """
+        if mode == CountMode.EXACT:
+            return self.db.execute(select(func.count()).select_from(FormDataModel)).scalar_one()
+        if mode == CountMode.ESTIMATE and self.db.get_bind().dialect.name == "postgresql":
+            estimate = self.db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'form_data'::regclass")
+            ).scalar()
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return self.db.execute(
+            select(TableCounterModel.value).where(TableCounterModel.name == FORM_DATA_COUNTER)
+        ).scalar_one()
+    
+    def _loaded_query(self, selection: Optional[FieldSelection] = None) -> Query:
+        """Query form data with its (selected) child collections batch-loaded."""
+        return self.db.query(FormDataModel).options(*child_loader_options(selection))
+    
+    def _search_query(self, first_name: Optional[str], last_name: Optional[str], email: Optional[str],
+                      job_title: Optional[str], limit: Optional[int], after: Optional[Keyset],
+                      selection: Optional[FieldSelection], q: Optional[str],
+                      child_filters: Optional[List[ChildFilter]]) -> Tuple[Query, Optional[ColumnElement]]:
+        """The search query, selecting (model, rank) rows for ranked searches, and the rank expression."""
+        query, rank = self._apply_filters(self._loaded_query(selection), first_name, last_name,
+                                          email, job_title, q, child_filters)
+        
+        if rank is not None:
+            query = query.add_columns(rank)
+        if limit is not None:
+            query = self._apply_keyset(query, limit, after, rank)
+        elif rank is not None:
+            query = query.order_by(rank, FormDataModel.created_at, FormDataModel.id)
+        return query, rank
+    
+    @staticmethod
+    def _with_ranks(rows: Sequence[Any], rank: Optional[ColumnElement]) -> List[FormDataModel]:
+        """Models of search rows; for ranked searches each carries its rank in `search_rank`."""
+        if rank is None:
+            return list(rows)
+        results = []
+        for db_form_data, search_rank in rows:
+            db_form_data.search_rank = search_rank
+            results.append(db_form_data)
+        return results
+    
+    def _apply_filters(self, query: Query, first_name: Optional[str], last_name: Optional[str],
+                       email: Optional[str], job_title: Optional[str], q: Optional[str],
+                       child_filters: Optional[List[ChildFilter]]) -> Tuple[Query, Optional[ColumnElement]]:
+        """Apply the search criteria to `query`; returns it with the full-text rank expression, if any."""
+        rank = None
+        if q:
+            query, rank = self._full_text_match(query, q)
+        substrings = {"first_name": first_name, "last_name": last_name, "email": email, "job": job_title}
+        query = self._substring_match(query, {name: term for name, term in substrings.items() if term})
+        for child_filter in child_filters or ():
+            query = query.filter(child_filter.condition())
+        return query, rank
+    
+    def _sync_children(self, form_id: UUID, name: str, children: List[BaseModel]) -> bool:
+        """Diff one child collection against the patch by child id; returns whether anything changed."""
+        model = CHILD_MODELS[name]
+        to_values = CHILD_WRITERS[name]
+        existing = {str(child.id): child for child in self.db.query(model).filter(model.form_data_id == form_id)}
+        changed = False
+        for child in children:
+            values = to_values(child)
+            db_child = existing.pop(child.id, None)
+            if db_child is None:
+                self.db.add(model(form_data_id=form_id, **values))
+                changed = True
+                continue
+            for column, value in values.items():
+                setattr(db_child, column, value)
+            changed = changed or self.db.is_modified(db_child)
+        for db_child in existing.values():
+            self.db.delete(db_child)
+            changed = True
+        return changed
+    
+    def _delete_chunk(self, form_ids: List[UUID], already_deleted: int) -> int:
+        """Delete one chunk of IDs in its own transaction and return the number of rows removed."""
+        try:
+            result = self.db.execute(
+                delete(FormDataModel)
+                .where(FormDataModel.id.in_(form_ids))
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                self._record_write(count_delta=-result.rowcount)
+            self.db.commit()
+            return result.rowcount
+        except Exception as e:
+            self.db.rollback()
+            raise RuntimeError(f"Error deleting form data ({already_deleted} already deleted): {str(e)}")
+    
+    def _apply_keyset(self, query: Query, limit: int, after: Optional[Keyset],
+                      rank: Optional[ColumnElement] = None) -> Query:
+        """
+        Order by (created_at, id), or (rank, created_at, id) for ranked searches,
+        and seek past the last row of the previous page.
+        """
+        columns = [FormDataModel.created_at, FormDataModel.id]
+        if rank is not None:
+            columns.insert(0, rank)
+        if after is not None:
+            if len(after) != len(columns):
+                raise InvalidCursorError("Cursor does not belong to this kind of query")
+            query = query.filter(tuple_(*columns) > tuple(after))
+        return query.order_by(*columns).limit(limit)
+    
+    def _full_text_match(self, query: Query, q: str):
+        """
+        Restrict `query` to full-text matches of `q` and return it with a rank
+        expression where lower values are more relevant.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            search_vector = literal_column(f"form_data.{SEARCH_VECTOR_COLUMN}")
+            ts_query = func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), q)
+            query = query.filter(search_vector.op("@@")(ts_query))
+            return query, -func.ts_rank(search_vector, ts_query)
+        # SQLite FTS5: quote every word so user input cannot use FTS query syntax.
+        terms = re.findall(r"\w+", q)
+        fts_query = " ".join(f'"{term}"' for term in terms) or '""'
+        query = query.join(form_data_fts, form_data_fts.c.rowid == literal_column("form_data.rowid"))
+        query = query.filter(form_data_fts.c.search_document.match(fts_query))
+        return query, form_data_fts.c.rank
+    
+    def _substring_match(self, query: Query, terms: Dict[str, str]) -> Query:
+        """
+        Restrict `query` to rows whose columns contain the given terms, case-insensitively.
+        On PostgreSQL the ILIKE filters are served by the pg_trgm indexes. SQLite cannot
+        index LIKE, so terms long enough to have trigrams are first matched against the
+        trigram FTS5 table, which turns the scan into an index probe; ILIKE still applies
+        to every term so results are unchanged.
+        """
+        if not terms:
+            return query
+        for name, term in terms.items():
+            query = query.filter(getattr(FormDataModel, name).ilike(f"%{term}%"))
+        if self.db.get_bind().dialect.name != "sqlite":
+            return query
+        phrases = []
+        for name, term in terms.items():
+            if len(term) >= MIN_TRIGRAM_TERM_LENGTH:
+                escaped = term.replace('"', '""')
+                phrases.append(f'{name}:"{escaped}"')
+        if phrases:
+            query = query.join(form_data_trigram, form_data_trigram.c.rowid == literal_column("form_data.rowid"))
+            query = query.filter(literal_column(form_data_trigram.name).match(" AND ".join(phrases)))
+        return query
+    
+    def _record_write(self, count_delta: int = 0) -> None:
+        """
+        Bump the form_data version, and add `count_delta` to the row count, in one UPDATE
+        inside the caller's transaction. Every committed change to form data calls this.
+        """
+        names = (FORM_DATA_VERSION, FORM_DATA_COUNTER) if count_delta else (FORM_DATA_VERSION,)
+        self.db.execute(
+            update(TableCounterModel)
+            .where(TableCounterModel.name.in_(names))
+            .values(value=TableCounterModel.value + case(
+                (TableCounterModel.name == FORM_DATA_COUNTER, count_delta), else_=1
+            ))
+        )
+    
+    def _insert_statement(self, model: type):
+        """INSERT of the session's dialect, for its ON CONFLICT clauses."""
+        dialect = postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        return dialect.insert(model)
+    
+    def _touch(self, form_id: UUID) -> bool:
+        """
+        Bump a form's updated_at, empty the children half of its content hash, clear its dedup
+        hash and record the write after a child write; False if the form does not exist.
+        """
+        result = self.db.execute(
+            update(FormDataModel)
+            .where(FormDataModel.id == form_id)
+            .values(updated_at=utc_now(), content_hash=stored_without_children_hash(), dedup_hash=None)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            return False
+        self._record_write()
+        return True
+    
+    def _refresh_search_documents(self, form_ids: List[UUID]) -> None:
+        """Recompute search_document for the given rows; updated_at is left as the write set it."""
+        self.db.execute(
+            update(FormDataModel)
+            .where(FormDataModel.id.in_(form_ids))
+            .values(search_document=search_document_expression(), updated_at=FormDataModel.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+    
+    def _insert_children(self, forms: List[Tuple[UUID, FormData]]) -> None:
+        """Insert the child entries of the given (form id, form) pairs, one executemany INSERT per child type."""
+        for name, model in CHILD_MODELS.items():
+            to_values = CHILD_WRITERS[name]
+            rows = [
+                {"form_data_id": form_id, **to_values(child)}
+                for form_id, form_data in forms for child in getattr(form_data, name)
+            ]
+            if rows:
+                self.db.execute(insert(model), rows)
     
     def _convert_to_uuid(self, form_data_id) -> Optional[UUID]:
         """Convert form_data_id to UUID."""
@@ -212,90 +719,3 @@ class FormDataRepository:
             except ValueError:
                 return None
         return form_data_id
-    
-    def _create_educations(self, uuid_id: UUID, educations: list) -> None:
-        """Create education records."""
-        for edu in educations:
-            db_edu = EducationModel(
-                form_data_id=uuid_id,
-                university_name=edu.university_name,
-                degree_type=get_enum_value(edu.degree_type) if edu.degree_type else None,
-                course_name=edu.course_name
-            )
-            self.db.add(db_edu)
-    
-    def _create_job_experiences(self, uuid_id: UUID, job_experiences: list) -> None:
-        """Create job experience records."""
-        for job_exp in job_experiences:
-            db_job_exp = JobExperienceModel(
-                form_data_id=uuid_id,
-                job_title=job_exp.job_title,
-                company_name=job_exp.company_name,
-                start_date=job_exp.start_date,
-                end_date=job_exp.end_date,
-                is_present_job=job_exp.is_present_job,
-                description=job_exp.description
-            )
-            self.db.add(db_job_exp)
-    
-    def _create_skills(self, uuid_id: UUID, skills: list) -> None:
-        """Create skill records."""
-        for skill in skills:
-            db_skill = SkillModel(
-                form_data_id=uuid_id,
-                name=skill.name,
-                level=get_enum_value(skill.level) if skill.level else None,
-                category=skill.category
-            )
-            self.db.add(db_skill)
-    
-    def _create_certifications(self, uuid_id: UUID, certifications: list) -> None:
-        """Create certification records."""
-        for cert in certifications:
-            db_cert = CertificationModel(
-                form_data_id=uuid_id,
-                name=cert.name,
-                issuer=cert.issuer,
-                date_obtained=cert.date_obtained,
-                expiry_date=cert.expiry_date,
-                has_expiry=cert.has_expiry
-            )
-            self.db.add(db_cert)
-    
-    def _create_languages(self, uuid_id: UUID, languages: list) -> None:
-        """Create language records."""
-        for lang in languages:
-            db_lang = LanguageModel(
-                form_data_id=uuid_id,
-                name=lang.name,
-                proficiency=get_enum_value(lang.proficiency) if lang.proficiency else None
-            )
-            self.db.add(db_lang)
-    
-    def _create_projects(self, uuid_id: UUID, projects: list) -> None:
-        """Create project records."""
-        for project in projects:
-            db_project = ProjectModel(
-                form_data_id=uuid_id,
-                title=project.title,
-                description=project.description,
-                technologies=project.technologies,
-                link=project.link,
-                start_date=project.start_date,
-                end_date=project.end_date,
-                is_ongoing=project.is_ongoing
-            )
-            self.db.add(db_project)
-
-    def _create_references(self, uuid_id: UUID, references: list) -> None:
-        """Create reference records."""
-        for ref in references:
-            db_ref = ReferenceModel(
-                form_data_id=uuid_id,
-                name=ref.name,
-                position=ref.position,
-                company=ref.company,
-                email=ref.email,
-                phone=ref.phone
-            )
-            self.db.add(db_ref)
@@ -1,12 +1,12 @@
 import pytest
 import asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
-from database.connection import Base, get_db
+from database.connection import Base, get_db, enable_sqlite_foreign_keys
 from database.models import FormDataModel
 from models.schemas import FormData
 
@@ -17,6 +17,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+event.listen(engine, "connect", enable_sqlite_foreign_keys)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -41,6 +42,21 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def query_counter():
+    """Count SQL statements executed against the test engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with test database."""
@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.connection import Base, enable_sqlite_foreign_keys
+from database.async_connection import to_async_url
+from services.async_form_service import AsyncFormService
+from services.field_selection import FieldSelection
+from models.schemas import FormData
+from models.response_schemas import FormDataResponse
+
+
+@pytest.fixture
+async def async_session_factory():
+    """Create an in-memory aiosqlite database for each test."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    event.listen(engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+class TestAsyncFormService:
+    """Test suite for the AsyncSession-backed service facade."""
+
+    @pytest.mark.unit
+    def test_to_async_url(self):
+        """Test that sync database URLs are mapped to asyncio drivers."""
+        assert to_async_url("sqlite:///./formdata.db").drivername == "sqlite+aiosqlite"
+        assert to_async_url("postgresql://u:p@localhost/db").drivername == "postgresql+asyncpg"
+        assert to_async_url("postgresql+psycopg2://u:p@localhost/db").drivername == "postgresql+asyncpg"
+
+    @pytest.mark.unit
+    async def test_streamed_export_and_page(self, async_session_factory, sample_form_data):
+        """Test that streamed exports and pages are driven through AsyncSession a chunk at a time."""
+        async with async_session_factory() as db:
+            service = AsyncFormService(db)
+            await service.bulk_create_form_data([FormData(**sample_form_data)] * 3)
+
+            export = b"".join([chunk async for chunk in await service.export_form_data("ndjson")])
+            assert export.count(b"\n") == 3
+
+            page = await service.stream_form_data_page_json(2)
+            documents = [chunk async for chunk in page]
+            assert b",".join(documents).count(b'"first_name":"John"') == 2
+            assert page.value == (await service.get_form_data_page(2)).next_cursor
+
+    @pytest.mark.unit
+    async def test_crud_roundtrip(self, async_session_factory, sample_form_data):
+        """Test create, read, update and delete through AsyncSession."""
+        async with async_session_factory() as db:
+            service = AsyncFormService(db)
+            created = await service.create_form_data(FormData(**sample_form_data))
+            assert isinstance(created, FormDataResponse)
+            assert len(created.skills) == 1
+
+            fetched = await service.get_form_data(created.id)
+            assert fetched.id == created.id
+            assert len(fetched.languages) == 2
+
+            sparse = await service.get_form_data(created.id, FieldSelection.parse("email", ""))
+            assert sparse == {"id": created.id, "email": "john.doe@example.com"}
+
+            updated = await service.update_form_data(created.id, FormData(**dict(sample_form_data, job="CTO")))
+            assert updated.job == "CTO"
+
+            deleted = await service.delete_form_data(created.id)
+            assert deleted["id"] == created.id
+            assert await service.get_form_data(created.id) is None
+
+    @pytest.mark.unit
+    async def test_pagination_and_search(self, async_session_factory, sample_form_data):
+        """Test keyset pages and search through AsyncSession."""
+        async with async_session_factory() as db:
+            service = AsyncFormService(db)
+            for index in range(3):
+                await service.create_form_data(FormData(**dict(sample_form_data, email=f"user{index}@example.com")))
+
+            page = await service.get_form_data_page(limit=2)
+            assert len(page.items) == 2
+            assert page.next_cursor is not None
+
+            results = await service.search_form_data_page(limit=10, first_name="John")
+            assert len(results.items) == 3
+            assert (await service.get_storage_info())["total_entries"] == 3
+
+    @pytest.mark.unit
+    async def test_concurrent_sessions(self, async_session_factory, sample_form_data):
+        """Test that several sessions can be driven concurrently from one event loop."""
+        async def create_one(index):
+            async with async_session_factory() as db:
+                payload = dict(sample_form_data, email=f"user{index}@example.com")
+                return await AsyncFormService(db).create_form_data(FormData(**payload))
+
+        created = await asyncio.gather(*(create_one(index) for index in range(5)))
+        assert len({item.id for item in created}) == 5
@@ -0,0 +1,62 @@
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import select
+from services.mappers.compiled_mapper import CompiledReader, CompiledWriter, FORM_DATA_READER, FORM_DATA_WRITER
+from services.repositories.form_data_repository import FormDataRepository
+from database.models import FormDataModel, SkillModel
+from models.schemas import FormData
+from models.response_schemas import FormDataResponse
+
+
+class TestCompiledMapper:
+    """Test suite for the mappers generated from the model metadata."""
+
+    @pytest.fixture
+    def loaded_form(self, db_session, sample_form_data):
+        repository = FormDataRepository(db_session)
+        repository.create(FormData(**sample_form_data))
+        db_session.expire_all()
+        return repository.get_page(1)[0]
+
+    @pytest.mark.unit
+    def test_loaded_instance_and_attribute_paths_agree(self, db_session, loaded_form):
+        """Test that the __dict__ fast path, the attribute path and a result row give the same document."""
+        document = FORM_DATA_READER.to_dict(loaded_form)
+        assert document["id"] == str(loaded_form.id)
+        assert document["created_at"] == loaded_form.created_at.isoformat()
+        assert document["skills"] == [
+            {"id": str(skill.id), "name": "Python", "level": "Expert", "category": "Programming"}
+            for skill in loaded_form.skills
+        ]
+        assert FormDataResponse.model_validate(document) == FORM_DATA_READER.to_response(loaded_form)
+
+        db_session.expire(loaded_form, ["city", "skills"])
+        assert FORM_DATA_READER.to_dict(loaded_form) == document
+        row = db_session.execute(
+            select(*FormDataModel.__table__.columns).where(FormDataModel.id == loaded_form.id)
+        ).one()
+        assert FORM_DATA_READER.columns_to_dict(row) == {
+            key: value for key, value in document.items() if key in FORM_DATA_READER.columns
+        }
+
+    @pytest.mark.unit
+    def test_writer_copies_every_shared_column(self, sample_form_data):
+        """Test that a form's column values leave out child collections and database-assigned keys."""
+        values = FORM_DATA_WRITER(FormData(**sample_form_data))
+
+        assert "id" not in values and "skills" not in values and "created_at" not in values
+        assert values["first_name"] == "John" and values["title"] == "Mr"
+        assert set(values) == set(FORM_DATA_WRITER.columns)
+
+    @pytest.mark.unit
+    def test_schema_field_without_a_column_fails_at_compile_time(self):
+        """Test that a field added to a schema but not to its model is caught when the mapper is built."""
+        class DriftedSkill(BaseModel):
+            id: str
+            name: str
+            years: int
+
+        with pytest.raises(TypeError, match="DriftedSkill.years"):
+            CompiledReader(SkillModel, DriftedSkill)
+        with pytest.raises(TypeError, match="DriftedSkill.years"):
+            CompiledWriter(SkillModel, DriftedSkill)
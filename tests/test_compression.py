@@ -0,0 +1,109 @@
+import asyncio
+import gzip
+import json
+import zlib
+import pytest
+from services.document_cache import get_compressed_cache
+from utils.compression import CompressionMiddleware, negotiate_encoding
+
+CODINGS = dict.fromkeys(["zstd", "br", "gzip"])
+
+
+class TestCompression:
+    """Test suite for negotiated response compression."""
+
+    @pytest.fixture
+    def large_form(self, client, sample_form_data):
+        skills = [{"id": "", "name": f"Skill {i}", "level": "Expert", "category": "Programming"} for i in range(20)]
+        response = client.post("/api/v1/form-data/", json=dict(sample_form_data, skills=skills))
+        return response.json()["data"]["id"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("accept_encoding, expected", [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "zstd"),
+        ("*;q=0.1, br", "br"),
+        ("GZIP;Q=1, zstd;q=0", "gzip"),
+        ("gzip;q=0, deflate", None),
+    ])
+    def test_negotiation_follows_q_values_then_server_preference(self, accept_encoding, expected):
+        """Test that the accepted coding with the highest q-value wins, ties going to zstd, then br, then gzip."""
+        assert negotiate_encoding(accept_encoding, CODINGS) == expected
+        assert negotiate_encoding("br, zstd", {"gzip": None}) is None
+
+    @pytest.mark.unit
+    def test_document_is_compressed_only_when_accepted(self, client, large_form):
+        """Test that a compressed document decodes to the identity body, with a weak form of the same ETag."""
+        url = f"/api/v1/form-data/{large_form}"
+        plain = client.get(url, headers={"Accept-Encoding": "identity"})
+        compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in plain.headers
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in compressed.headers["vary"] and "Accept-Encoding" in plain.headers["vary"]
+        assert compressed.json() == plain.json()
+        assert int(compressed.headers["content-length"]) < len(plain.content) // 2
+        assert compressed.headers["etag"] == f"W/{plain.headers['etag']}"
+        assert client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]}).status_code == 304
+
+        small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers and small.json() == {"status": "healthy"}
+
+    @pytest.mark.unit
+    def test_repeated_hits_reuse_the_compressed_body(self, client, large_form):
+        """Test that a strongly tagged body is compressed once, and a write's new tag compresses afresh."""
+        url = f"/api/v1/form-data/{large_form}"
+        headers = {"Accept-Encoding": "gzip"}
+        before = get_compressed_cache().stats()
+        first = client.get(url, headers=headers)
+        assert client.get(url, headers=headers).content == first.content
+        after = get_compressed_cache().stats()
+        assert (after["misses"] - before["misses"], after["hits"] - before["hits"]) == (1, 1)
+
+        client.patch(url, json={"city": "Springfield"})
+        changed = client.get(url, headers=headers)
+        assert changed.json()["data"]["city"] == "Springfield"
+        assert get_compressed_cache().stats()["misses"] == after["misses"] + 1
+
+    @pytest.mark.unit
+    def test_streamed_responses_are_compressed_incrementally(self, client, large_form, monkeypatch):
+        """Test that streamed pages and exports are gzip streams that decode to the uncompressed body."""
+        monkeypatch.setattr("routes.form_data_routes.STREAM_PAGE_THRESHOLD", 1)
+        url = "/api/v1/form-data/?limit=10"
+        plain = client.get(url, headers={"Accept-Encoding": "identity"})
+        with client.stream("GET", url, headers={"Accept-Encoding": "gzip"}) as streamed:
+            assert streamed.headers["content-encoding"] == "gzip"
+            assert "content-length" not in streamed.headers
+            raw = b"".join(streamed.iter_raw())
+        assert json.loads(gzip.decompress(raw)) == plain.json()
+
+        export = client.get("/api/v1/form-data/export", headers={"Accept-Encoding": "gzip"})
+        assert export.headers["content-encoding"] == "gzip"
+        assert json.loads(export.text.splitlines()[0])["id"] == large_form
+
+    @pytest.mark.unit
+    def test_each_streamed_chunk_is_flushed_to_the_client(self):
+        """Test that every compressed chunk decodes on arrival, before the stream has ended."""
+        chunks = [b'{"success":true,"data":[', b'{"id":"1"}', b"]}"]
+        sent = []
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json")]})
+            for chunk in chunks:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+        asyncio.run(CompressionMiddleware(app, minimum_size=1024)(scope, None, send))
+
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        bodies = [message["body"] for message in sent[1:]]
+        assert [decompressor.decompress(body) for body in bodies[:3]] == chunks
+        assert decompressor.decompress(bodies[3]) == b"" and decompressor.eof
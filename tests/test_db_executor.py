@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import pytest
+from services.db_executor import DatabaseExecutor
+from services.async_form_service import ThreadPoolFormService
+from models.schemas import FormData
+
+
+class TestDatabaseExecutor:
+    """Test suite for the bounded database thread pool."""
+
+    @pytest.fixture
+    def executor(self):
+        executor = DatabaseExecutor(max_workers=1)
+        yield executor
+        executor.shutdown()
+
+    @pytest.mark.unit
+    async def test_runs_off_the_event_loop(self, executor):
+        """Test that calls execute on a pool thread."""
+        thread_name = await executor.run(lambda: threading.current_thread().name)
+        assert thread_name.startswith("db-executor")
+
+    @pytest.mark.unit
+    async def test_reports_queue_depth_and_wait(self, executor):
+        """Test that calls beyond the pool size queue and their wait is measured."""
+        release = threading.Event()
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        queued = [asyncio.ensure_future(executor.run(lambda: None)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats["active"] == 1
+        assert stats["queue_depth"] == 3
+
+        release.set()
+        await asyncio.gather(blocker, *queued)
+
+        stats = executor.stats()
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 4
+        assert stats["max_wait_ms"] >= 40
+
+    @pytest.mark.unit
+    async def test_event_loop_stays_responsive(self, executor):
+        """Test that a slow call does not stall other coroutines."""
+        release = threading.Event()
+        slow_call = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+        assert not slow_call.done()
+        release.set()
+        await slow_call
+
+    @pytest.mark.unit
+    async def test_threadpool_form_service(self, db_session, executor, sample_form_data):
+        """Test the service facade running on the executor."""
+        service = ThreadPoolFormService(db_session, executor)
+        created = await service.create_form_data(FormData(**sample_form_data))
+        fetched = await service.get_form_data(created.id)
+
+        assert fetched.id == created.id
+        assert executor.stats()["completed"] == 2
+
+    @pytest.mark.unit
+    async def test_streamed_page_reads_on_the_executor(self, db_session, executor, sample_form_data):
+        """Test that each step of a streamed page is an executor call that leaves no transaction open."""
+        service = ThreadPoolFormService(db_session, executor)
+        await service.bulk_create_form_data([FormData(**sample_form_data)] * 3)
+        completed = executor.stats()["completed"]
+
+        chunks = await service.stream_form_data_page_json(2)
+        assert executor.stats()["completed"] == completed + 1
+        documents = [chunk async for chunk in chunks]
+        assert executor.stats()["completed"] == completed + 2
+        assert not db_session.in_transaction()
+
+        assert b",".join(documents).count(b'"first_name":"John"') == 2
+        assert chunks.value == (await service.get_form_data_page(2)).next_cursor
@@ -0,0 +1,189 @@
+import pytest
+from services import FormService
+from services.cache_backends import InMemoryCacheBackend
+from services.document_cache import DocumentCache, SharedCache, get_document_cache, subscribe_invalidations
+from models.schemas import FormData, FormDataPatch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDocumentCache:
+    """Test suite for the in-process document cache."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used_by_count_and_bytes(self, clock):
+        """Test that the cache stays within both bounds, dropping the least recently read entry."""
+        cache = DocumentCache(max_entries=2, max_bytes=10, ttl_seconds=60, clock=clock)
+        cache.set("a", b"aaa", cache.generation())
+        cache.set("b", b"bbb", cache.generation())
+        assert cache.get("a") == b"aaa"
+        cache.set("c", b"ccc", cache.generation())
+
+        assert cache.get("b") is None
+        cache.set("d", b"dddddddd", cache.generation())
+        assert cache.get("a") is None and cache.get("c") is None and cache.get("d") == b"dddddddd"
+        stats = cache.stats()
+        assert stats["evictions"] == 3
+        assert stats["bytes"] == 8
+        assert (stats["hits"], stats["misses"]) == (2, 3)
+
+    @pytest.mark.unit
+    def test_entries_expire_after_ttl(self, clock):
+        """Test that an entry is a miss once its TTL has passed."""
+        cache = DocumentCache(max_entries=10, max_bytes=100, ttl_seconds=5, clock=clock)
+        cache.set("a", b"aaa", cache.generation())
+        clock.now = 4.9
+        assert cache.get("a") == b"aaa"
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    @pytest.mark.unit
+    def test_fill_started_before_an_invalidation_is_dropped(self, clock):
+        """Test that a value read before a concurrent write is not cached after it."""
+        cache = DocumentCache(max_entries=10, max_bytes=100, ttl_seconds=60, clock=clock)
+        generation = cache.generation()
+        cache.invalidate("a")
+        cache.set("a", b"stale", generation)
+
+        assert cache.get("a") is None
+
+    @pytest.mark.unit
+    def test_shared_tier_rejects_entries_cached_before_a_write(self, clock):
+        """Test that a value read before another worker's write is not served from the shared tier."""
+        backend = InMemoryCacheBackend(clock=clock)
+        reader = SharedCache("documents", DocumentCache(10, 100, 60, clock=clock), backend)
+        writer = SharedCache("documents", DocumentCache(10, 100, 60, clock=clock), backend)
+
+        token = reader.token("a")
+        writer.invalidate("a")
+        reader.set("a", b"stale", token)
+
+        assert writer.get("a") is None
+        assert writer.stats()["shared"]["stale"] == 1
+
+    @pytest.mark.unit
+    def test_version_counters_expire_without_repeating_values(self, clock):
+        """Test that invalidation counters expire after the entries they tag, and restart above their old values."""
+        backend = InMemoryCacheBackend(clock=clock)
+        cache = SharedCache("documents", DocumentCache(10, 100, 60, clock=clock), backend)
+        token = cache.token("a")
+        cache.invalidate("a")
+        cache.set("a", b"tagged", cache.token("a"))
+        first = backend.get_many([cache._version_key("a")])[0]
+
+        clock.now = 119.9
+        assert backend.get_many([cache._version_key("a")]) == [first]
+        clock.now = 120.0
+        assert backend.get_many([cache._version_key("a")]) == [None]
+        cache.invalidate("a")
+        assert int(backend.get_many([cache._version_key("a")])[0]) > int(first)
+        cache.set("a", b"stale", token)
+        assert cache.get_shared("a") is None
+
+    @pytest.mark.unit
+    def test_workers_share_entries_and_invalidations(self, db_session, sample_form_data, query_counter):
+        """Test that one worker's fill serves another, and one worker's write evicts everywhere."""
+        backend = InMemoryCacheBackend()
+        workers = []
+        for _ in range(2):
+            documents = SharedCache("documents", DocumentCache(10, 1_000_000, 60), backend)
+            searches = SharedCache("searches", DocumentCache(10, 1_000_000, 60), backend)
+            subscribe_invalidations(backend, documents, searches)
+            workers.append(FormService(db_session, documents, searches))
+        first, second = workers
+        created = first.create_form_data(FormData(**sample_form_data))
+        first.get_form_data_json(created.id)
+        first.search_form_data_page_json(limit=10, first_name="John")
+
+        query_counter.clear()
+        assert second.get_form_data_json(created.id) == first.get_form_data_json(created.id)
+        assert second.search_form_data_page_json(limit=10, first_name="John") is not None
+        assert query_counter == []
+
+        second.update_form_data(created.id, FormData(**dict(sample_form_data, city="Springfield")))
+        assert first.cache.get_local(created.id) is None
+        assert b'"city":"Springfield"' in first.get_form_data_json(created.id).body
+        second.create_form_data(FormData(**sample_form_data))
+        page = first.search_form_data_page_json(limit=10, first_name="John")
+        assert page.body.count(b'"first_name":"John"') == 2
+
+    @pytest.mark.unit
+    def test_service_serves_hits_without_queries(self, db_session, sample_form_data, query_counter):
+        """Test that a cached document is returned without touching the database and dropped on write."""
+        service = FormService(db_session, SharedCache("documents", DocumentCache(10, 1_000_000, 60)))
+        created = service.create_form_data(FormData(**sample_form_data))
+        first = service.get_form_data_json(created.id)
+
+        query_counter.clear()
+        assert service.get_form_data_json(created.id.upper()) == first
+        assert query_counter == []
+
+        service.update_form_data(created.id, FormData(**dict(sample_form_data, city="Springfield")))
+        assert b'"city":"Springfield"' in service.get_form_data_json(created.id).body
+
+    @pytest.mark.unit
+    def test_writes_that_change_nothing_keep_the_caches(self, db_session, sample_form_data):
+        """Test that skipped, empty and missing-form writes invalidate nothing, and a real write does."""
+        service = FormService(db_session, SharedCache("documents", DocumentCache(10, 1_000_000, 60)),
+                              SharedCache("searches", DocumentCache(10, 1_000_000, 60)))
+        created = service.create_form_data(FormData(**sample_form_data))
+        service.get_form_data_json(created.id)
+        service.search_form_data_page_json(limit=10, first_name="John")
+        version = service.repository.get_version()
+        invalidations = service.search_cache.stats()["local"]["invalidations"]
+        missing = "00000000-0000-0000-0000-000000000000"
+
+        assert service.update_form_data(created.id, FormData(**sample_form_data)) is not None
+        assert service.patch_form_data(created.id, FormDataPatch(city=sample_form_data["city"])) is not None
+        assert service.update_form_data(missing, FormData(**sample_form_data)) is None
+        assert service.remove_child(created.id, "skills", missing) is False
+        assert service.delete_form_data(missing) is None
+        assert service.cache.get_local(created.id) is not None
+        assert service.search_cache.stats()["local"]["invalidations"] == invalidations
+        assert service.repository.get_version() == version
+
+        service.patch_form_data(created.id, FormDataPatch(city="Springfield"))
+        assert service.cache.get_local(created.id) is None
+        assert service.search_cache.stats()["local"]["invalidations"] == invalidations + 1
+
+    @pytest.mark.unit
+    def test_api_reads_reflect_every_write_path(self, client, created_form_data, sample_form_data):
+        """Test that cached GETs never return a document older than the last write."""
+        url = f"/api/v1/form-data/{created_form_data}"
+        hits_before = get_document_cache().stats()["local"]["hits"]
+        assert client.get(url).json() == client.get(url).json()
+        assert get_document_cache().stats()["local"]["hits"] == hits_before + 1
+
+        client.put(url, json=dict(sample_form_data, city="Springfield"))
+        assert client.get(url).json()["data"]["city"] == "Springfield"
+        client.patch(url, json={"city": "Shelbyville"})
+        assert client.get(url).json()["data"]["city"] == "Shelbyville"
+        skill = client.post(f"{url}/skills", json={"name": "Go", "category": "Programming"}).json()["data"]
+        assert skill in client.get(url).json()["data"]["skills"]
+        client.delete(f"{url}/skills/{skill['id']}")
+        assert skill not in client.get(url).json()["data"]["skills"]
+        client.delete(url)
+        assert client.get(url).status_code == 404
+
+    @pytest.mark.unit
+    def test_cached_search_matches_uncached_response(self, client, created_form_data):
+        """Test that a search served from the cache has the same envelope and follows writes."""
+        url = "/api/v1/form-data/search?first_name=John&limit=1"
+        first = client.get(url)
+        assert first.json() == client.get(url).json()
+        assert first.json()["data"][0]["id"] == created_form_data
+        assert "next_cursor" in first.json()
+
+        client.delete(f"/api/v1/form-data/{created_form_data}")
+        assert client.get(url).json()["data"] == []
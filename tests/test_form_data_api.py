@@ -22,6 +22,19 @@ class TestFormDataAPI:
         created_id = data["data"]["id"]
         assert uuid.UUID(created_id)
 
+    @pytest.mark.unit
+    def test_create_form_data_dedup_returns_existing_id(self, client, created_form_data, sample_form_data):
+        """Test that dedup=true returns the identical submission's ID instead of inserting."""
+        response = client.post("/api/v1/form-data/?dedup=true", json=sample_form_data)
+
+        assert response.status_code == 200
+        assert response.json()["data"]["id"] == created_form_data
+        assert client.post("/api/v1/form-data/", json=sample_form_data).json()["data"]["id"] != created_form_data
+
+        changed = dict(sample_form_data, skills=[])
+        response = client.post("/api/v1/form-data/?dedup=true", json=changed)
+        assert response.status_code == 201
+
     @pytest.mark.unit
     def test_create_form_data_with_relationships(self, client, sample_form_data):
         """Test form data creation with related records - just verify creation success."""
@@ -70,6 +83,32 @@ class TestFormDataAPI:
         response = client.post("/api/v1/form-data/", json=invalid_data)
         assert response.status_code == 422
 
+    @pytest.mark.unit
+    def test_create_form_data_batch(self, client, sample_form_data):
+        """Test batch creation of several forms with their children."""
+        batch = [dict(sample_form_data, email=f"user{index}@example.com") for index in range(3)]
+        response = client.post("/api/v1/form-data/batch", json=batch)
+        
+        assert response.status_code == 201
+        data = response.json()
+        
+        assert data["success"] is True
+        assert len(data["data"]["ids"]) == 3
+        
+        for index, form_id in enumerate(data["data"]["ids"]):
+            document = client.get(f"/api/v1/form-data/{form_id}").json()["data"]
+            assert document["email"] == f"user{index}@example.com"
+            assert len(document["languages"]) == 2
+            assert document["skills"][0]["level"] == "Expert"
+
+    @pytest.mark.unit
+    def test_create_form_data_batch_validation(self, client, sample_form_data, sample_invalid_form_data):
+        """Test that one invalid form rejects the whole batch."""
+        response = client.post("/api/v1/form-data/batch", json=[sample_form_data, sample_invalid_form_data])
+        assert response.status_code == 422
+        
+        assert client.get("/api/v1/form-data/").json()["data"] == []
+
     @pytest.mark.unit
     def test_get_form_data_by_id_success(self, client, created_form_data):
         """Test successful retrieval of form data by ID."""
@@ -112,6 +151,42 @@ class TestFormDataAPI:
         assert "message" in data
         assert "errors" in data
 
+    @pytest.mark.unit
+    def test_get_form_data_sparse_fields(self, client, created_form_data):
+        """Test that fields= and include= restrict the returned document."""
+        response = client.get(
+            f"/api/v1/form-data/{created_form_data}",
+            params={"fields": "first_name,email", "include": "skills,languages"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()["data"]
+        
+        assert set(data) == {"id", "first_name", "email", "skills", "languages"}
+        assert data["skills"][0]["name"] == "Python"
+        assert len(data["languages"]) == 2
+
+    @pytest.mark.unit
+    def test_get_all_form_data_without_collections(self, client, created_form_data):
+        """Test that an empty include= omits every child collection."""
+        response = client.get("/api/v1/form-data/?fields=last_name&include=")
+        
+        assert response.status_code == 200
+        data = response.json()["data"]
+        
+        assert data == [{"id": created_form_data, "last_name": "Doe"}]
+
+    @pytest.mark.unit
+    def test_get_form_data_unknown_field(self, client, created_form_data):
+        """Test that unknown field names are rejected."""
+        response = client.get(f"/api/v1/form-data/{created_form_data}?fields=password")
+        
+        assert response.status_code == 400
+        data = response.json()
+        
+        assert data["success"] is False
+        assert "fields" in data["errors"]
+
     @pytest.mark.unit
     def test_get_all_form_data_empty(self, client):
         """Test retrieval of all form data when database is empty."""
@@ -168,6 +243,122 @@ class TestFormDataAPI:
         assert data["data"]["first_name"] == "Updated John"
         assert data["data"]["job"] == "Senior Software Engineer"
 
+    @pytest.mark.unit
+    def test_update_form_data_resend_is_not_written(self, client, created_form_data, sample_form_data):
+        """Test that re-sending the stored submission leaves updated_at unchanged, unlike a real change."""
+        before = client.get(f"/api/v1/form-data/{created_form_data}").json()["data"]
+        response = client.put(f"/api/v1/form-data/{created_form_data}", json=sample_form_data)
+
+        assert response.status_code == 200
+        assert response.json()["data"] == before
+
+        response = client.put(f"/api/v1/form-data/{created_form_data}", json=dict(sample_form_data, city="Springfield"))
+        assert response.json()["data"]["updated_at"] > before["updated_at"]
+
+    @pytest.mark.unit
+    def test_update_form_data_after_partial_write_is_written(self, client, created_form_data, sample_form_data):
+        """Test that a PATCH clears the content hash, so the original submission is applied again."""
+        client.patch(f"/api/v1/form-data/{created_form_data}", json={"city": "Springfield"})
+        response = client.put(f"/api/v1/form-data/{created_form_data}", json=sample_form_data)
+
+        assert response.json()["data"]["city"] == sample_form_data["city"]
+
+    @pytest.mark.unit
+    def test_update_form_data_matches_get(self, client, created_form_data, sample_form_data):
+        """Test that the PUT response is the same document a GET returns afterwards."""
+        updated = dict(sample_form_data, city="Springfield")
+        response = client.put(f"/api/v1/form-data/{created_form_data}", json=updated)
+
+        assert response.status_code == 200
+        assert response.json()["data"] == client.get(f"/api/v1/form-data/{created_form_data}").json()["data"]
+
+    @pytest.mark.unit
+    def test_update_form_data_without_collections(self, client, created_form_data, sample_form_data):
+        """Test that an empty include= returns the updated scalar fields only."""
+        response = client.put(f"/api/v1/form-data/{created_form_data}?include=", json=sample_form_data)
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["id"] == created_form_data
+        assert "skills" not in data
+
+    @pytest.mark.unit
+    def test_patch_form_data_changes_only_given_fields(self, client, created_form_data):
+        """Test that PATCH updates the given fields and leaves the rest untouched."""
+        before = client.get(f"/api/v1/form-data/{created_form_data}").json()["data"]
+        response = client.patch(f"/api/v1/form-data/{created_form_data}", json={"city": "Springfield"})
+
+        assert response.status_code == 200
+        after = response.json()["data"]
+        assert after["city"] == "Springfield"
+        assert {key: value for key, value in after.items() if key not in ("city", "updated_at")} == \
+            {key: value for key, value in before.items() if key not in ("city", "updated_at")}
+
+    @pytest.mark.unit
+    def test_patch_form_data_syncs_child_collection_by_id(self, client, created_form_data):
+        """Test that PATCH updates matching children, inserts new ones and deletes missing ones."""
+        skill = client.get(f"/api/v1/form-data/{created_form_data}").json()["data"]["skills"][0]
+        patch = {"skills": [
+            dict(skill, level="Expert"),
+            {"id": "new", "name": "Rust", "level": "Beginner", "category": "Programming"},
+        ]}
+        response = client.patch(f"/api/v1/form-data/{created_form_data}", json=patch)
+
+        assert response.status_code == 200
+        skills = {item["name"]: item for item in response.json()["data"]["skills"]}
+        assert skills["Python"] == dict(skill, level="Expert")
+        assert skills["Rust"]["id"] != "new"
+
+        response = client.patch(f"/api/v1/form-data/{created_form_data}", json={"skills": [skills["Rust"]]})
+        assert [item["name"] for item in response.json()["data"]["skills"]] == ["Rust"]
+
+    @pytest.mark.unit
+    def test_patch_form_data_rejects_null_required_field(self, client, created_form_data):
+        """Test that an explicit null for a required field is a validation error, not a clear."""
+        response = client.patch(f"/api/v1/form-data/{created_form_data}", json={"first_name": None})
+
+        assert response.status_code == 422
+
+    @pytest.mark.unit
+    def test_patch_form_data_not_found(self, client):
+        """Test PATCH of non-existent form data."""
+        response = client.patch(f"/api/v1/form-data/{uuid.uuid4()}", json={"city": "Springfield"})
+
+        assert response.status_code == 404
+
+    @pytest.mark.unit
+    def test_add_and_remove_child_entry(self, client, created_form_data):
+        """Test that a skill can be appended and removed without sending the whole document."""
+        skill = {"name": "Rust", "level": "Beginner", "category": "Programming"}
+        response = client.post(f"/api/v1/form-data/{created_form_data}/skills", json=skill)
+
+        assert response.status_code == 201
+        added = response.json()["data"]
+        assert added == dict(skill, id=added["id"])
+        skills = client.get(f"/api/v1/form-data/{created_form_data}").json()["data"]["skills"]
+        assert added in skills and len(skills) == 2
+        assert [item["id"] for item in client.get("/api/v1/form-data/search?q=rust").json()["data"]] == [created_form_data]
+
+        response = client.delete(f"/api/v1/form-data/{created_form_data}/skills/{added['id']}")
+        assert response.status_code == 200
+        assert added not in client.get(f"/api/v1/form-data/{created_form_data}").json()["data"]["skills"]
+        assert client.get("/api/v1/form-data/search?q=rust").json()["data"] == []
+
+    @pytest.mark.unit
+    def test_child_entry_not_found(self, client, created_form_data):
+        """Test that child writes on a missing form, or of a missing entry, are 404s."""
+        project = {"title": "Site", "start_date": "2024-01-01", "end_date": "2024-02-01"}
+        assert client.post(f"/api/v1/form-data/{uuid.uuid4()}/projects", json=project).status_code == 404
+        assert client.delete(f"/api/v1/form-data/{created_form_data}/projects/{uuid.uuid4()}").status_code == 404
+        assert client.delete(f"/api/v1/form-data/{created_form_data}/projects/not-a-uuid").status_code == 404
+
+    @pytest.mark.unit
+    def test_add_child_entry_validates_body(self, client, created_form_data):
+        """Test that a child entry is validated against its own schema."""
+        response = client.post(f"/api/v1/form-data/{created_form_data}/languages", json={"proficiency": "Native"})
+
+        assert response.status_code == 422
+
     @pytest.mark.unit
     def test_update_form_data_not_found(self, client, sample_form_data):
         """Test update of non-existent form data."""
@@ -196,10 +387,38 @@ class TestFormDataAPI:
         assert "data" in data
         assert data["data"]["id"] == form_id
         assert "first_name" in data["data"]
+        assert "skills" not in data["data"]
         
         get_response = client.get(f"/api/v1/form-data/{form_id}")
         assert get_response.status_code == 404
 
+        schemas = client.get("/openapi.json").json()["components"]["schemas"]
+        assert "skills" not in schemas["FormDataScalarResponse"]["properties"]
+        assert "FormDataScalarResponse" in str(schemas["ApiResponse_FormDataScalarResponse_"])
+
+    @pytest.mark.unit
+    def test_delete_form_data_batch(self, client, sample_form_data):
+        """Test bulk deletion by IDs and by search filter."""
+        batch = [dict(sample_form_data, email=f"user{index}@example.com") for index in range(4)]
+        ids = client.post("/api/v1/form-data/batch", json=batch).json()["data"]["ids"]
+
+        response = client.post("/api/v1/form-data/batch/delete", json={"ids": ids[:2]})
+        assert response.status_code == 200
+        assert response.json()["data"] == {"deleted": 2}
+
+        response = client.post("/api/v1/form-data/batch/delete", json={"filter": {"email": "user3@", "skill": ["Python"]}})
+        assert response.json()["data"] == {"deleted": 1}
+
+        remaining = client.get("/api/v1/form-data/").json()["data"]
+        assert [item["id"] for item in remaining] == [ids[2]]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("body", [{}, {"ids": []}, {"filter": {}}, {"ids": ["x"], "filter": {"q": "x"}}])
+    def test_delete_form_data_batch_requires_one_selector(self, client, body):
+        """Test that bulk delete needs either IDs or a non-empty filter."""
+        response = client.post("/api/v1/form-data/batch/delete", json=body)
+        assert response.status_code == 422
+
     @pytest.mark.unit
     def test_delete_form_data_not_found(self, client):
         """Test deletion of non-existent form data."""
@@ -244,6 +463,192 @@ class TestFormDataAPI:
         assert isinstance(data["data"], list)
         assert len(data["data"]) == 0
 
+    @pytest.mark.unit
+    def test_get_all_form_data_paginates_with_cursor(self, client, sample_form_data):
+        """Test walking the collection page by page with next_cursor."""
+        created_ids = []
+        for index in range(5):
+            payload = sample_form_data.copy()
+            payload["email"] = f"user{index}@example.com"
+            created_ids.append(client.post("/api/v1/form-data/", json=payload).json()["data"]["id"])
+        
+        seen_ids = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/v1/form-data/", params=params)
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["data"]) <= 2
+            seen_ids.extend(item["id"] for item in data["data"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert sorted(seen_ids) == sorted(created_ids)
+        assert len(seen_ids) == len(set(seen_ids))
+
+    @pytest.mark.unit
+    def test_get_all_form_data_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected."""
+        response = client.get("/api/v1/form-data/?cursor=not-a-cursor")
+        
+        assert response.status_code == 400
+        data = response.json()
+        
+        assert data["success"] is False
+        assert "cursor" in data["errors"]
+
+    @pytest.mark.unit
+    def test_search_form_data_paginates(self, client, sample_form_data):
+        """Test that search results are paginated."""
+        for index in range(3):
+            payload = sample_form_data.copy()
+            payload["email"] = f"john{index}@example.com"
+            client.post("/api/v1/form-data/", json=payload)
+        
+        first_page = client.get("/api/v1/form-data/search?first_name=John&limit=2").json()
+        assert len(first_page["data"]) == 2
+        assert first_page["next_cursor"] is not None
+        
+        second_page = client.get(
+            "/api/v1/form-data/search",
+            params={"first_name": "John", "limit": 2, "cursor": first_page["next_cursor"]}
+        ).json()
+        assert len(second_page["data"]) == 1
+        assert second_page["next_cursor"] is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("url", [
+        "/api/v1/form-data/?limit=2",
+        "/api/v1/form-data/search?first_name=John&limit=2",
+        "/api/v1/form-data/search?q=python&limit=2&fields=first_name&include=skills",
+    ])
+    def test_large_pages_are_streamed_with_the_same_body(self, client, sample_form_data, monkeypatch, url):
+        """Test that a page above the streaming threshold is chunked but reads exactly like a buffered one."""
+        for index in range(5):
+            client.post("/api/v1/form-data/", json=dict(sample_form_data, email=f"john{index}@example.com"))
+        buffered = client.get(url)
+        monkeypatch.setattr("routes.form_data_routes.STREAM_PAGE_THRESHOLD", 1)
+
+        streamed = client.get(url)
+        assert "content-length" not in streamed.headers
+        assert streamed.json() == buffered.json()
+        assert streamed.headers["etag"] == buffered.headers["etag"]
+        last = client.get(f"{url}&cursor={streamed.json()['next_cursor']}").json()
+        last = client.get(f"{url}&cursor={last['next_cursor']}").json()
+        assert len(last["data"]) == 1 and last["next_cursor"] is None
+        assert client.get(f"{url}&cursor=not-a-cursor").status_code == 400
+
+    @pytest.mark.unit
+    def test_streamed_page_rejects_a_cursor_of_another_query_kind(self, client, sample_form_data, monkeypatch):
+        """Test that a ranked search cursor sent to a streamed list page is a 400, not an empty 200."""
+        for index in range(3):
+            client.post("/api/v1/form-data/", json=dict(sample_form_data, email=f"john{index}@example.com"))
+        ranked_cursor = client.get("/api/v1/form-data/search?q=python&limit=1").json()["next_cursor"]
+        monkeypatch.setattr("routes.form_data_routes.STREAM_PAGE_THRESHOLD", 2)
+
+        response = client.get("/api/v1/form-data/", params={"limit": 3, "cursor": ranked_cursor})
+        assert response.status_code == 400
+        assert response.json()["success"] is False
+
+    @pytest.mark.unit
+    def test_search_form_data_full_text(self, client, sample_form_data):
+        """Test full-text search over skills, job descriptions and the summary."""
+        python_dev = client.post("/api/v1/form-data/", json=sample_form_data).json()["data"]["id"]
+        writer = sample_form_data.copy()
+        writer.update({
+            "email": "writer@example.com",
+            "professional_summary": "Technical writer documenting developer platforms",
+            "skills": [{"id": "skill1", "name": "Copywriting", "level": "Expert", "category": "Writing"}],
+            "job_experiences": [],
+        })
+        writer_id = client.post("/api/v1/form-data/", json=writer).json()["data"]["id"]
+
+        by_skill = client.get("/api/v1/form-data/search", params={"q": "python"}).json()
+        assert [item["id"] for item in by_skill["data"]] == [python_dev]
+
+        by_description = client.get("/api/v1/form-data/search", params={"q": "developed applications"}).json()
+        assert [item["id"] for item in by_description["data"]] == [python_dev]
+
+        by_summary = client.get("/api/v1/form-data/search", params={"q": "documenting"}).json()
+        assert [item["id"] for item in by_summary["data"]] == [writer_id]
+
+    @pytest.mark.unit
+    def test_search_form_data_full_text_paginates(self, client, sample_form_data):
+        """Test walking ranked full-text results with next_cursor."""
+        for index in range(3):
+            payload = sample_form_data.copy()
+            payload["email"] = f"python{index}@example.com"
+            client.post("/api/v1/form-data/", json=payload)
+
+        first_page = client.get("/api/v1/form-data/search", params={"q": "python", "limit": 2}).json()
+        assert len(first_page["data"]) == 2
+        assert first_page["next_cursor"] is not None
+
+        second_page = client.get(
+            "/api/v1/form-data/search",
+            params={"q": "python", "limit": 2, "cursor": first_page["next_cursor"]}
+        ).json()
+        assert len(second_page["data"]) == 1
+        assert second_page["next_cursor"] is None
+        seen = {item["id"] for item in first_page["data"] + second_page["data"]}
+        assert len(seen) == 3
+
+    @pytest.mark.unit
+    def test_search_form_data_full_text_follows_updates(self, client, created_form_data, sample_form_data):
+        """Test that the search index reflects an updated summary."""
+        assert client.get("/api/v1/form-data/search", params={"q": "kubernetes"}).json()["data"] == []
+
+        updated = dict(sample_form_data, professional_summary="Platform engineer running Kubernetes clusters")
+        client.put(f"/api/v1/form-data/{created_form_data}", json=updated)
+
+        found = client.get("/api/v1/form-data/search", params={"q": "kubernetes"}).json()
+        assert [item["id"] for item in found["data"]] == [created_form_data]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("q", ['"', "python AND (", "***", "NEAR(python"])
+    def test_search_form_data_full_text_ignores_query_syntax(self, client, created_form_data, q):
+        """Test that query operators in user input do not cause errors."""
+        response = client.get("/api/v1/form-data/search", params={"q": q})
+
+        assert response.status_code == 200
+        assert isinstance(response.json()["data"], list)
+
+    @pytest.mark.unit
+    def test_search_form_data_by_child_collections(self, client, sample_form_data):
+        """Test that skill, language, certification and experience filters must all match."""
+        certified = dict(sample_form_data, email="certified@example.com", certifications=[{
+            "id": "cert1", "name": "AWS Solutions Architect", "issuer": "Amazon",
+            "date_obtained": "2022-01-01", "expiry_date": "2025-01-01", "has_expiry": True
+        }])
+        certified_id = client.post("/api/v1/form-data/", json=certified).json()["data"]["id"]
+        client.post("/api/v1/form-data/", json=sample_form_data)
+
+        response = client.get("/api/v1/form-data/search", params=[
+            ("skill", "python:expert"),
+            ("language", "English:Native"),
+            ("language", "spanish"),
+            ("certification", "AWS Solutions Architect:amazon"),
+            ("experience", "Tech Corp:Software Developer"),
+        ])
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["data"]] == [certified_id]
+
+        assert len(client.get("/api/v1/form-data/search?skill=Python").json()["data"]) == 2
+        assert client.get("/api/v1/form-data/search?skill=Python:Beginner").json()["data"] == []
+        assert client.get("/api/v1/form-data/search?language=English&language=German").json()["data"] == []
+
+    @pytest.mark.unit
+    def test_search_form_data_child_filter_needs_name(self, client):
+        """Test that a child filter without a name is rejected."""
+        response = client.get("/api/v1/form-data/search?skill=:Expert")
+
+        assert response.status_code == 400
+        assert "filter" in response.json()["errors"]
+
     @pytest.mark.integration
     def test_full_crud_workflow(self, client, sample_form_data):
         """Test complete CRUD workflow."""
@@ -270,3 +675,58 @@ class TestFormDataAPI:
         
         read_deleted_response = client.get(f"/api/v1/form-data/{form_id}")
         assert read_deleted_response.status_code == 404
+
+    @pytest.mark.unit
+    def test_storage_info_count_modes(self, client, created_form_data):
+        """Test that every count mode reports the total and names the mode used."""
+        for mode in ("counter", "exact", "estimate"):
+            response = client.get(f"/api/v1/form-data/storage/info?count={mode}")
+
+            assert response.status_code == 200
+            assert response.json()["data"]["total_entries"] == 1
+            assert response.json()["data"]["count_mode"] == mode
+        assert client.get("/api/v1/form-data/storage/info?count=guess").status_code == 422
+
+    @pytest.mark.unit
+    def test_conditional_get_of_a_document(self, client, created_form_data, sample_form_data):
+        """Test that a matching If-None-Match is a 304, and that writes change the ETag only when they change data."""
+        url = f"/api/v1/form-data/{created_form_data}"
+        etag = client.get(url).headers["etag"]
+
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b"" and not_modified.headers["etag"] == etag
+        # Compressed responses carry the weak form of the tag; both forms validate.
+        assert etag.startswith("W/")
+        assert client.get(url, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": etag[2:]}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+        client.put(url, json=sample_form_data)
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        client.post(f"{url}/skills", json={"name": "Go", "category": "Programming"})
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+        assert client.get(f"/api/v1/form-data/{uuid.uuid4()}", headers={"If-None-Match": "*"}).status_code == 404
+
+    @pytest.mark.unit
+    def test_conditional_get_of_a_sparse_selection(self, client, created_form_data):
+        """Test that each representation of a document has its own ETag."""
+        url = f"/api/v1/form-data/{created_form_data}"
+        full = client.get(url).headers["etag"]
+        sparse = client.get(f"{url}?fields=first_name&include=").headers["etag"]
+
+        assert sparse != full
+        assert client.get(f"{url}?fields=first_name&include=", headers={"If-None-Match": sparse}).status_code == 304
+        assert client.get(f"{url}?fields=email&include=", headers={"If-None-Match": sparse}).status_code == 200
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("url", ["/api/v1/form-data/?limit=5", "/api/v1/form-data/search?first_name=John"])
+    def test_conditional_get_of_a_collection(self, client, created_form_data, sample_form_data, url):
+        """Test that list and search pages are 304 until any form data is written."""
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        client.post("/api/v1/form-data/", json=dict(sample_form_data, first_name="Jane"))
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
@@ -0,0 +1,206 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from services.form_data_import import FormDataImporter
+from services.mappers.form_data_csv_mapper import CSV_COLUMNS, COLLECTION_COLUMNS
+
+
+def to_ndjson(records):
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+def to_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for record in records:
+        row = {
+            column: json.dumps(value) if column in COLLECTION_COLUMNS else ("" if value is None else value)
+            for column, value in record.items()
+        }
+        writer.writerow(row)
+    return buffer.getvalue().encode()
+
+
+class TestFormDataImport:
+    """Test suite for the streaming import endpoint."""
+
+    @pytest.mark.unit
+    def test_import_ndjson_reports_rejected_lines(self, client, sample_form_data):
+        """Test that invalid lines are reported without aborting the import."""
+        records = [dict(sample_form_data, email=f"user{index}@example.com") for index in range(3)]
+        body = to_ndjson(records[:2]) + b"{not json}\n" + to_ndjson([{"first_name": "Only"}]) + to_ndjson(records[2:])
+        
+        response = client.post(
+            "/api/v1/form-data/import", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        
+        assert response.status_code == 200
+        report = response.json()["data"]
+        
+        assert report["accepted"] == 3
+        assert report["rejected"] == 2
+        assert [error["line"] for error in report["errors"]] == [3, 4]
+        assert "last_name" in report["errors"][1]["errors"]
+        assert report["rows_per_second"] > 0
+        assert len(client.get("/api/v1/form-data/").json()["data"]) == 3
+
+    @pytest.mark.unit
+    def test_import_gzipped_ndjson(self, client, sample_form_data):
+        """Test that a gzip-compressed body is decompressed incrementally."""
+        records = [dict(sample_form_data, email=f"user{index}@example.com") for index in range(5)]
+        
+        response = client.post(
+            "/api/v1/form-data/import?format=ndjson",
+            content=gzip.compress(to_ndjson(records)),
+            headers={"Content-Encoding": "gzip"}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["data"]["accepted"] == 5
+
+    @pytest.mark.unit
+    def test_import_csv_with_multiline_cells(self, client, sample_form_data):
+        """Test CSV import with JSON-encoded collections and quoted newlines."""
+        record = dict(sample_form_data, additional_notes="line one\nline two")
+        
+        response = client.post(
+            "/api/v1/form-data/import", content=to_csv([record, record]), headers={"Content-Type": "text/csv"}
+        )
+        
+        assert response.status_code == 200
+        report = response.json()["data"]
+        assert report["accepted"] == 2
+        assert report["rejected"] == 0
+        
+        document = client.get("/api/v1/form-data/").json()["data"][0]
+        assert document["additional_notes"] == "line one\nline two"
+        assert len(document["languages"]) == 2
+
+    @pytest.mark.unit
+    def test_import_rejects_unknown_format(self, client):
+        """Test that bodies without a known format are refused."""
+        response = client.post("/api/v1/form-data/import", content=b"{}", headers={"Content-Type": "text/plain"})
+        assert response.status_code == 415
+
+    @pytest.mark.unit
+    def test_import_rejects_corrupt_gzip(self, client, sample_form_data):
+        """Test that a truncated gzip stream is reported as malformed."""
+        body = gzip.compress(to_ndjson([sample_form_data]))[:-10]
+        response = client.post(
+            "/api/v1/form-data/import?format=ndjson", content=body, headers={"Content-Encoding": "gzip"}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.unit
+    async def test_importer_commits_fixed_size_chunks(self, sample_form_data):
+        """Test that rows are written in chunks of the configured size."""
+        class RecordingService:
+            def __init__(self):
+                self.chunks = []
+
+            async def bulk_create_form_data(self, forms):
+                self.chunks.append(len(forms))
+                return [str(index) for index in range(len(forms))]
+
+        async def body():
+            data = to_ndjson([sample_form_data] * 7)
+            for start in range(0, len(data), 100):
+                yield data[start:start + 100]
+
+        service = RecordingService()
+        report = await FormDataImporter(service, chunk_size=3).run(body(), "ndjson")
+
+        assert service.chunks == [3, 3, 1]
+        assert report["accepted"] == 7
+
+    @pytest.mark.unit
+    async def test_importer_rejects_lines_over_the_length_limit(self, sample_form_data):
+        """Test that an overlong line is rejected by number, and long lines split across chunks still parse."""
+        class Service:
+            async def bulk_create_form_data(self, forms):
+                return [str(index) for index in range(len(forms))]
+
+        record = to_ndjson([sample_form_data])
+        data = record + b'{"first_name": "' + b"x" * 5000 + b'"}\n' + record
+
+        async def body():
+            for start in range(0, len(data), 7):
+                yield data[start:start + 7]
+
+        report = await FormDataImporter(Service(), max_line_length=len(record)).run(body(), "ndjson")
+
+        assert report["accepted"] == 2
+        assert report["errors"] == [{"line": 2, "errors": {"record": f"Line exceeds {len(record)} characters"}}]
+
+    @pytest.mark.unit
+    async def test_failed_chunk_reports_only_the_rows_that_fail(self, sample_form_data):
+        """Test that a chunk failing to write is retried row by row, rejecting just the failing lines."""
+        class FailingService:
+            async def bulk_create_form_data(self, forms):
+                if any(form.first_name == "Broken" for form in forms):
+                    raise RuntimeError("constraint violated")
+                return [str(index) for index in range(len(forms))]
+
+        async def body():
+            yield to_ndjson([sample_form_data, dict(sample_form_data, first_name="Broken"), sample_form_data])
+
+        report = await FormDataImporter(FailingService(), chunk_size=3).run(body(), "ndjson")
+
+        assert report["accepted"] == 2
+        assert report["errors"] == [{"line": 2, "errors": {"record": "Write failed: constraint violated"}}]
+
+
+class TestFormDataExport:
+    """Test suite for the streaming export endpoint."""
+
+    @pytest.mark.unit
+    def test_export_ndjson(self, client, sample_form_data):
+        """Test that every entry is exported as one JSON line."""
+        batch = [dict(sample_form_data, email=f"user{index}@example.com") for index in range(3)]
+        created_ids = client.post("/api/v1/form-data/batch", json=batch).json()["data"]["ids"]
+        
+        response = client.get("/api/v1/form-data/export")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        documents = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(document["id"] for document in documents) == sorted(created_ids)
+        assert all(len(document["languages"]) == 2 for document in documents)
+
+    @pytest.mark.unit
+    def test_export_csv_round_trips_through_import(self, client, sample_form_data):
+        """Test that exported CSV can be imported again."""
+        client.post("/api/v1/form-data/", json=dict(sample_form_data, additional_notes="a,b\n\"c\""))
+        
+        exported = client.get("/api/v1/form-data/export?format=csv")
+        assert exported.status_code == 200
+        assert exported.headers["content-type"].startswith("text/csv")
+        
+        response = client.post("/api/v1/form-data/import?format=csv", content=exported.content)
+        assert response.json()["data"]["accepted"] == 1
+        
+        documents = client.get("/api/v1/form-data/").json()["data"]
+        assert len(documents) == 2
+        assert documents[1]["additional_notes"] == "a,b\n\"c\""
+        assert documents[1]["skills"][0]["name"] == "Python"
+
+    @pytest.mark.unit
+    def test_export_streams_in_batches(self, db_session, sample_form_data, query_counter):
+        """Test that the exporter yields one chunk per batch with batched child loads."""
+        from models.schemas import FormData
+        from services.repositories.form_data_repository import FormDataRepository
+        from services.form_data_export import FormDataExporter
+        
+        FormDataRepository(db_session).bulk_create([FormData(**sample_form_data)] * 5)
+        db_session.expunge_all()
+        query_counter.clear()
+        
+        chunks = list(FormDataExporter(db_session, batch_size=2).ndjson())
+        
+        assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+        assert len(db_session.identity_map) == 0
+        # one keyset SELECT plus one SELECT ... IN per child table per batch
+        assert len(query_counter) == 3 * (1 + 7)
@@ -0,0 +1,341 @@
+import pytest
+from services import FormService
+from services.repositories.form_data_repository import FormDataRepository
+from database.models import CHILD_MODELS
+from services.field_selection import FieldSelection
+from services.child_filters import ChildFilter
+from models.schemas import FormData, FormDataPatch, NEW_CHILD_SCHEMAS
+from models.enums import CountMode
+
+
+class TestFormDataRepository:
+    """Test suite for FormDataRepository data access patterns."""
+
+    @pytest.fixture
+    def service(self, db_session):
+        """Create FormService instance with test database."""
+        return FormService(db_session)
+
+    def _create_forms(self, service, sample_form_data, count):
+        for index in range(count):
+            payload = dict(sample_form_data, email=f"user{index}@example.com")
+            service.create_form_data(FormData(**payload))
+
+    @pytest.mark.unit
+    def test_list_query_count_is_independent_of_result_size(
+        self, db_session, service, sample_form_data, query_counter
+    ):
+        """Test that listing and mapping forms never lazy-loads child collections."""
+        self._create_forms(service, sample_form_data, 1)
+        db_session.expunge_all()
+        query_counter.clear()
+        assert len(service.get_all_form_data()) == 1
+        single_form_queries = len(query_counter)
+
+        self._create_forms(service, sample_form_data, 4)
+        db_session.expunge_all()
+        query_counter.clear()
+        assert len(service.get_all_form_data()) == 5
+
+        assert len(query_counter) == single_form_queries
+        assert single_form_queries == 1 + len(CHILD_MODELS)
+
+    @pytest.mark.unit
+    def test_streamed_page_holds_one_batch_at_a_time(self, db_session, service, sample_form_data):
+        """Test that a streamed page yields bounded, detached batches with no transaction left open between them."""
+        self._create_forms(service, sample_form_data, 5)
+        db_session.expunge_all()
+
+        batches = FormDataRepository(db_session).stream_search(limit=4, batch_size=2, first_name="John")
+        sizes = []
+        for batch in batches:
+            sizes.append(len(batch))
+            assert len(db_session.identity_map) == 0 and not db_session.in_transaction()
+            assert all(len(form.skills) == 1 for form in batch)
+        assert sizes == [2, 2]
+
+        chunks = service.stream_form_data_page_json(3, first_name="John")
+        documents = []
+        try:
+            while True:
+                documents.append(next(chunks))
+        except StopIteration as end:
+            next_cursor = end.value
+        assert b",".join(documents).count(b'"first_name":"John"') == 3
+        assert service.get_form_data_page(3).next_cursor == next_cursor
+
+    @pytest.mark.unit
+    def test_search_and_page_query_counts_are_fixed(
+        self, db_session, service, sample_form_data, query_counter
+    ):
+        """Test that paginated list and search issue a fixed number of queries."""
+        self._create_forms(service, sample_form_data, 6)
+        db_session.expunge_all()
+
+        query_counter.clear()
+        page = service.get_form_data_page(limit=5)
+        assert len(page.items) == 5
+        assert len(query_counter) == 1 + len(CHILD_MODELS)
+
+        db_session.expunge_all()
+        query_counter.clear()
+        results = service.search_form_data(first_name="John")
+        assert len(results) == 6
+        assert len(query_counter) == 1 + len(CHILD_MODELS)
+
+    @pytest.mark.unit
+    def test_get_by_id_loads_children(self, db_session, service, sample_form_data, query_counter):
+        """Test that a single form is read in two round trips: its row, then all its children in one UNION ALL."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        db_session.expunge_all()
+
+        query_counter.clear()
+        result = service.get_form_data(created.id)
+        assert len(result.skills) == 1
+        assert len(result.languages) == 2
+        assert result == created
+        assert len(query_counter) <= 2
+
+    @pytest.mark.unit
+    def test_sparse_selection_skips_unrequested_collections(
+        self, db_session, service, sample_form_data, query_counter
+    ):
+        """Test that a sparse read selects only requested columns and collections."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        db_session.expunge_all()
+
+        query_counter.clear()
+        selection = FieldSelection.parse("first_name,email", "skills")
+        result = service.get_form_data(created.id, selection)
+
+        assert result == {
+            "id": created.id,
+            "first_name": "John",
+            "email": "john.doe@example.com",
+            "skills": [{"id": result["skills"][0]["id"], "name": "Python", "level": "Expert", "category": "Programming"}],
+        }
+        assert len(query_counter) == 2
+        assert "professional_summary" not in query_counter[0]
+
+    @pytest.mark.unit
+    def test_bulk_create_uses_one_insert_per_table_per_chunk(self, db_session, sample_form_data, query_counter):
+        """Test that bulk creation batches parents and children into multi-row inserts."""
+        repository = FormDataRepository(db_session)
+        forms = [FormData(**dict(sample_form_data, email=f"user{index}@example.com")) for index in range(10)]
+
+        query_counter.clear()
+        created_ids = repository.bulk_create(forms, chunk_size=4)
+
+        assert len(created_ids) == 10
+        inserts = [statement for statement in query_counter if statement.startswith("INSERT")]
+        # 3 chunks x (form_data + educations, job_experiences, skills, languages)
+        assert len(inserts) == 3 * 5
+        assert repository.count() == 10
+
+    @pytest.mark.unit
+    def test_substring_search_probes_trigram_index(self, db_session, service, sample_form_data, query_counter):
+        """Test that substring search matches inside values and goes through the trigram index."""
+        self._create_forms(service, sample_form_data, 3)
+        repository = FormDataRepository(db_session)
+
+        query_counter.clear()
+        results = repository.search(email="ER1@EXAMPLE")
+        assert [form.email for form in results] == ["user1@example.com"]
+        assert "form_data_trigram MATCH" in query_counter[0]
+
+        # Too short for a trigram: answered by ILIKE alone.
+        query_counter.clear()
+        assert len(repository.search(email="r2")) == 1
+        assert "form_data_trigram" not in query_counter[0]
+
+    @pytest.mark.unit
+    def test_substring_search_follows_updates(self, db_session, service, sample_form_data):
+        """Test that the trigram index reflects updated names."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        service.update_form_data(created.id, FormData(**dict(sample_form_data, last_name="Smithson")))
+        repository = FormDataRepository(db_session)
+
+        assert repository.search(last_name="doe") == []
+        assert [str(form.id) for form in repository.search(last_name="ithso", first_name="joh")] == [created.id]
+
+    @pytest.mark.unit
+    def test_child_filters_probe_composite_indexes(self, db_session, service, sample_form_data, query_counter):
+        """Test that child filters compile to EXISTS lookups on the (form_data_id, name, qualifier) indexes."""
+        self._create_forms(service, sample_form_data, 2)
+        repository = FormDataRepository(db_session)
+        filters = [ChildFilter.parse("skill", "Python:Expert"), ChildFilter.parse("language", "English")]
+
+        query_counter.clear()
+        assert len(repository.search(child_filters=filters)) == 2
+
+        explain = f"EXPLAIN QUERY PLAN {query_counter[0]}"
+        plan = " ".join(row[-1] for row in db_session.connection().exec_driver_sql(explain, ("python", "expert", "english")))
+        assert "ix_skills_form_data_id_name_level" in plan
+        assert "ix_languages_form_data_id_name_proficiency" in plan
+
+    @pytest.mark.unit
+    def test_delete_is_one_statement_and_cascades(self, db_session, service, sample_form_data, query_counter):
+        """Test that deleting a form issues a single DELETE (plus the counter update) and the database removes its children."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        repository = FormDataRepository(db_session)
+
+        query_counter.clear()
+        deleted = repository.delete(created.id)
+
+        assert str(deleted.id) == created.id
+        assert [statement.split()[:3] for statement in query_counter] == [
+            ["DELETE", "FROM", "form_data"], ["UPDATE", "table_counters", "SET"]
+        ]
+        for model in CHILD_MODELS.values():
+            assert db_session.query(model).count() == 0
+
+    @pytest.mark.unit
+    def test_bulk_delete_by_ids_and_filter_in_chunks(self, db_session, service, sample_form_data, query_counter):
+        """Test that bulk deletes run one set-based DELETE per chunk."""
+        self._create_forms(service, sample_form_data, 5)
+        repository = FormDataRepository(db_session)
+        ids = [str(form.id) for form in repository.search(email="user")]
+
+        query_counter.clear()
+        assert repository.delete_many(ids[:3] + ["not-a-uuid"], chunk_size=2) == 3
+        assert len([statement for statement in query_counter if statement.startswith("DELETE")]) == 2
+
+        query_counter.clear()
+        assert repository.delete_matching(child_filters=[ChildFilter.parse("skill", "Python")], chunk_size=1) == 2
+        assert len([statement for statement in query_counter if statement.startswith("DELETE")]) == 2
+        assert repository.count() == 0
+
+    @pytest.mark.unit
+    def test_concurrent_dedup_submissions_insert_once(self, db_session, sample_form_data, monkeypatch):
+        """Test that a dedup insert racing an identical one loses on the unique dedup_hash and returns its ID."""
+        repository = FormDataRepository(db_session)
+        form_data = FormData(**sample_form_data)
+        first_id, created = repository.create_deduplicated(form_data)
+        assert created
+
+        # The second submission checked for duplicates before the first one committed.
+        lookups = iter([None])
+        monkeypatch.setattr(repository, "find_by_content_hash", lambda hash_value: next(lookups, first_id))
+        assert repository.create_deduplicated(form_data) == (first_id, False)
+        assert repository.count(CountMode.EXACT) == repository.count() == 1
+
+        # Once written again, the form no longer holds the claim.
+        repository.update(str(first_id), FormData(**dict(sample_form_data, city="Springfield")))
+        lookups = iter([None])
+        second_id, created = repository.create_deduplicated(form_data)
+        assert created and second_id != first_id
+
+    @pytest.mark.unit
+    def test_update_is_one_statement_and_reads_only_requested_children(
+        self, db_session, service, sample_form_data, query_counter
+    ):
+        """Test that an update is a single UPDATE ... RETURNING, the version bump and one query for the requested collections."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        db_session.expunge_all()
+
+        query_counter.clear()
+        updated = service.update_form_data(
+            created.id, FormData(**dict(sample_form_data, job="CTO")), FieldSelection.parse(None, "skills")
+        )
+
+        assert [statement.split()[:2] for statement in query_counter] == [
+            ["UPDATE", "form_data"], ["UPDATE", "table_counters"], ["SELECT", "?"]
+        ]
+        assert "RETURNING" in query_counter[0]
+        assert "UNION" not in query_counter[2] and "languages" not in query_counter[2]
+        assert updated["job"] == "CTO"
+        assert updated["skills"][0]["name"] == "Python"
+        assert "languages" not in updated
+        assert updated["updated_at"] > created.updated_at
+
+        query_counter.clear()
+        full = service.update_form_data(created.id, FormData(**dict(sample_form_data, job="CEO")))
+        assert [statement.split()[0] for statement in query_counter] == ["UPDATE", "UPDATE", "SELECT"]
+        assert query_counter[2].count("UNION ALL") == len(CHILD_MODELS) - 1
+        assert full == service.get_form_data(created.id)
+
+    @pytest.mark.unit
+    def test_patch_writes_only_the_changed_child(self, db_session, service, sample_form_data, query_counter):
+        """Test that editing one project among many issues a single UPDATE on projects and none on form_data columns."""
+        project = {
+            "id": "", "title": "Project", "description": "", "technologies": "Python", "link": "",
+            "start_date": "2024-01-01", "end_date": "2024-06-01", "is_ongoing": False
+        }
+        payload = dict(sample_form_data, projects=[dict(project, title=f"Project {index}") for index in range(50)])
+        created = service.create_form_data(FormData(**payload))
+        projects = [item.model_dump() for item in created.projects]
+        projects[7]["description"] = "Rewritten"
+        db_session.expunge_all()
+
+        query_counter.clear()
+        patched = service.patch_form_data(created.id, FormDataPatch(projects=projects), FieldSelection.parse(None, "projects"))
+
+        writes = [statement for statement in query_counter if statement.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+        by_table = {statement.split()[1]: statement for statement in writes}
+        assert len(writes) == 3 and set(by_table) == {"projects", "form_data", "table_counters"}
+        assert "description" in by_table["projects"] and "title" not in by_table["projects"]
+        assert by_table["form_data"].split(" SET ")[1].split(" WHERE ")[0] in (
+            "content_hash=?, updated_at=?", "updated_at=?, content_hash=?"
+        )
+        assert [item["description"] for item in patched["projects"]].count("Rewritten") == 1
+
+    @pytest.mark.unit
+    def test_add_child_writes_without_loading_the_form(self, db_session, service, sample_form_data, query_counter):
+        """Test that appending a child is one parent UPDATE, the version bump and one INSERT, with no reads."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        db_session.expunge_all()
+
+        query_counter.clear()
+        project = NEW_CHILD_SCHEMAS["projects"](title="Site", start_date="2024-01-01", end_date="2024-02-01")
+        added = service.add_child(created.id, "projects", project)
+
+        assert [statement.split()[:2] for statement in query_counter] == [
+            ["UPDATE", "form_data"], ["UPDATE", "table_counters"], ["INSERT", "INTO"]
+        ]
+        assert added.title == "Site"
+        assert service.get_form_data(created.id).updated_at > created.updated_at
+
+    @pytest.mark.unit
+    def test_resent_update_writes_nothing(self, db_session, service, sample_form_data, query_counter):
+        """Test that a PUT of the stored submission matches no row and only reads the current state."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        db_session.expunge_all()
+
+        query_counter.clear()
+        current = service.update_form_data(created.id, FormData(**sample_form_data), FieldSelection.parse(None, ""))
+
+        assert [statement.split()[0] for statement in query_counter] == ["UPDATE", "SELECT"]
+        assert current["updated_at"] == created.updated_at
+
+    @pytest.mark.unit
+    def test_resent_update_is_skipped_after_partial_writes(self, db_session, service, sample_form_data):
+        """Test that after a child write or a scalar PATCH, the second of two identical PUTs writes nothing."""
+        created = service.create_form_data(FormData(**sample_form_data))
+        project = NEW_CHILD_SCHEMAS["projects"](title="Site", start_date="2024-01-01", end_date="2024-02-01")
+        service.add_child(created.id, "projects", project)
+        payload = FormData(**dict(sample_form_data, city="Springfield"))
+        selection = FieldSelection.parse(None, "")
+
+        written = service.update_form_data(created.id, payload, selection)
+        assert service.update_form_data(created.id, payload, selection)["updated_at"] == written["updated_at"]
+
+        service.patch_form_data(created.id, FormDataPatch(city="Shelbyville"), selection)
+        written = service.update_form_data(created.id, payload, selection)
+        assert written["city"] == "Springfield"
+        assert service.update_form_data(created.id, payload, selection)["updated_at"] == written["updated_at"]
+
+    @pytest.mark.unit
+    def test_counter_follows_every_write_path(self, db_session, service, sample_form_data, query_counter):
+        """Test that the maintained count matches count(*) after creates, bulk creates and deletes, and is one lookup."""
+        repository = FormDataRepository(db_session)
+        created = service.create_form_data(FormData(**sample_form_data))
+        ids = repository.bulk_create([FormData(**sample_form_data) for _ in range(4)], chunk_size=3)
+        repository.delete(created.id)
+        repository.delete(created.id)
+        repository.delete_many([str(form_id) for form_id in ids[:2]])
+        repository.delete_matching(first_name="nobody")
+
+        query_counter.clear()
+        assert repository.count() == repository.count(CountMode.EXACT) == 2
+        assert "table_counters" in query_counter[0]
+        assert repository.count(CountMode.ESTIMATE) == 2
@@ -100,6 +100,22 @@ class TestFormService:
         assert len(result) == 2
         assert all(isinstance(item, FormDataResponse) for item in result)
 
+    @pytest.mark.unit
+    def test_get_form_data_page(self, service, sample_pydantic_data):
+        """Test keyset pagination in the service layer."""
+        for index in range(3):
+            sample_pydantic_data.email = f"user{index}@example.com"
+            service.create_form_data(sample_pydantic_data)
+        
+        first_page = service.get_form_data_page(limit=2)
+        assert len(first_page.items) == 2
+        assert first_page.next_cursor is not None
+        
+        second_page = service.get_form_data_page(limit=2, cursor=first_page.next_cursor)
+        assert len(second_page.items) == 1
+        assert second_page.next_cursor is None
+        assert {item.id for item in first_page.items}.isdisjoint(item.id for item in second_page.items)
+
     @pytest.mark.unit
     def test_update_form_data_success(self, service, sample_pydantic_data):
         """Test successful form data update."""
@@ -133,8 +149,10 @@ class TestFormService:
         result = service.delete_form_data(form_id)
         
         assert result is not None
-        assert isinstance(result, FormDataResponse)
-        assert result.id == form_id
+        assert result["id"] == form_id
+        assert result["first_name"] == sample_pydantic_data.first_name
+        # Children are removed by ON DELETE CASCADE and not read back.
+        assert "skills" not in result
         
         get_result = service.get_form_data(form_id)
         assert get_result is None
@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.connection import Base, enable_sqlite_foreign_keys
+from database.migrations import MIGRATIONS, run_migrations
+from models.schemas import FormData
+from services import FormService
+from services.repositories.form_data_repository import FormDataRepository
+
+
+@pytest.fixture
+def migration_engine():
+    """A private in-memory database, separate from the shared test engine."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    event.listen(engine, "connect", enable_sqlite_foreign_keys)
+    yield engine
+    engine.dispose()
+
+
+def model_index_names():
+    return {index.name for table in Base.metadata.sorted_tables for index in table.indexes}
+
+
+def database_index_names(engine):
+    # The SQLite inspector skips expression indexes, so read the catalog directly.
+    with engine.connect() as connection:
+        return set(connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+
+
+class TestMigrations:
+    """Test suite for the versioned migration runner."""
+
+    @pytest.mark.unit
+    def test_fresh_database_applies_every_migration_once(self, migration_engine):
+        """Test that a new database gets the full schema and a second run is a no-op."""
+        assert run_migrations(migration_engine) == [migration.version for migration in MIGRATIONS]
+        assert run_migrations(migration_engine) == []
+
+        assert model_index_names() <= database_index_names(migration_engine)
+        for child in ("educations", "projects", "references"):
+            assert f"ix_{child}_form_data_id" in database_index_names(migration_engine)
+
+    @pytest.mark.unit
+    def test_upgrades_database_created_before_search_indexes_and_hashes(self, migration_engine, sample_form_data):
+        """Test that an existing database gains the new column, indexes and search tables with its rows indexed."""
+        Base.metadata.create_all(migration_engine)
+        session = sessionmaker(bind=migration_engine)()
+        created = FormService(session).create_form_data(FormData(**sample_form_data))
+        session.close()
+
+        with migration_engine.begin() as connection:
+            for trigger in ("fts_insert", "fts_delete", "fts_update", "trigram_insert", "trigram_delete", "trigram_update"):
+                connection.exec_driver_sql(f"DROP TRIGGER form_data_{trigger}")
+            connection.exec_driver_sql("DROP TABLE form_data_fts")
+            connection.exec_driver_sql("DROP TABLE form_data_trigram")
+            for name in model_index_names():
+                connection.exec_driver_sql(f"DROP INDEX {name}")
+            connection.exec_driver_sql("ALTER TABLE form_data DROP COLUMN search_document")
+            connection.exec_driver_sql("ALTER TABLE form_data DROP COLUMN content_hash")
+            connection.exec_driver_sql("DROP TABLE table_counters")
+
+        run_migrations(migration_engine)
+
+        assert model_index_names() <= database_index_names(migration_engine)
+        session = sessionmaker(bind=migration_engine)()
+        repository = FormDataRepository(session)
+        assert [str(form.id) for form in repository.search(q="python")] == [created.id]
+        assert [str(form.id) for form in repository.search(email="doe@exam")] == [created.id]
+        assert repository.count() == 1
+        session.close()
+
+    @pytest.mark.unit
+    def test_renames_row_count_and_seeds_version_counter(self, migration_engine, sample_form_data):
+        """Test that a table_counters table from migration 9 gets the value column and a version row."""
+        run_migrations(migration_engine)
+        session = sessionmaker(bind=migration_engine)()
+        FormService(session).create_form_data(FormData(**sample_form_data))
+        session.close()
+        with migration_engine.begin() as connection:
+            connection.exec_driver_sql("ALTER TABLE table_counters RENAME COLUMN value TO row_count")
+            connection.exec_driver_sql("DELETE FROM table_counters WHERE name = 'form_data_version'")
+            connection.exec_driver_sql("DELETE FROM schema_migrations WHERE version = 10")
+
+        assert run_migrations(migration_engine) == [10]
+
+        session = sessionmaker(bind=migration_engine)()
+        repository = FormDataRepository(session)
+        assert (repository.count(), repository.get_version()) == (1, 0)
+        FormService(session).create_form_data(FormData(**sample_form_data))
+        assert (repository.count(), repository.get_version()) == (2, 1)
+        session.close()
+
+    @pytest.mark.unit
+    def test_recreates_child_foreign_keys_with_cascade(self, migration_engine, sample_form_data):
+        """Test that a child table created without ON DELETE CASCADE is rebuilt with it."""
+        Base.metadata.create_all(migration_engine)
+        with migration_engine.begin() as connection:
+            connection.exec_driver_sql("DROP TABLE skills")
+            connection.exec_driver_sql(
+                "CREATE TABLE skills (id CHAR(32) PRIMARY KEY, form_data_id CHAR(32) NOT NULL REFERENCES form_data (id), "
+                "name VARCHAR(255) NOT NULL, level VARCHAR(50), category VARCHAR(255) NOT NULL)"
+            )
+        session = sessionmaker(bind=migration_engine)()
+        created = FormService(session).create_form_data(FormData(**sample_form_data))
+        session.close()
+
+        run_migrations(migration_engine)
+
+        session = sessionmaker(bind=migration_engine)()
+        assert len(FormService(session).get_form_data(created.id).skills) == 1
+        assert FormService(session).delete_form_data(created.id) is not None
+        session.close()
+        with migration_engine.connect() as connection:
+            assert connection.exec_driver_sql("SELECT count(*) FROM skills").scalar() == 0
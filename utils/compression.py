@@ -0,0 +1,246 @@
+"""
+Negotiated response compression: zstd, brotli or gzip, whichever the client accepts
+and this process supports (gzip always; brotli with the `brotli` package, zstd with
+`zstandard`), in that order of preference.
+
+JSON, NDJSON and CSV bodies of at least COMPRESSION_MIN_SIZE bytes are compressed.
+Whole bodies are compressed in one call; streamed ones (large pages, exports) through
+an incremental compressor, chunk by chunk, sync-flushed after every chunk so each
+one reaches the client as soon as it is produced. Compressed bodies of responses with a strong
+ETag are kept in the compressed cache under that tag, so repeated hits on cached
+documents and pages are not recompressed. Since the coding changes the bytes but not the
+content, ETags become weak whenever a coding was negotiated; If-None-Match comparison
+is weak, so the tags still validate.
+"""
+import gzip
+import os
+import zlib
+from typing import Callable, Dict, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from services.document_cache import DocumentCache, get_compressed_cache
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+COMPRESSIBLE_MEDIA_TYPES = {"application/json", "application/x-ndjson", "text/csv"}
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, brotli, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, zstandard, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class Codec:
+    """
+    One content coding: a one-shot compress() and incremental compressors, whose
+    compress() buffers, flush() emits everything buffered so far and finish() ends the stream.
+    """
+
+    def __init__(self, name: str, compress: Callable[[bytes], bytes], compressor: Callable[[], object]):
+        self.name = name
+        self.compress = compress
+        self.compressor = compressor
+
+
+def _available_codecs() -> Dict[str, Codec]:
+    """Supported codings, most preferred first."""
+    codecs: Dict[str, Codec] = {}
+    try:
+        import zstandard
+    except ImportError:
+        pass
+    else:
+        codecs["zstd"] = Codec(
+            "zstd",
+            lambda data: zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compress(data),
+            lambda: _ZstdCompressor(zstandard, COMPRESSION_ZSTD_LEVEL)
+        )
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        codecs["br"] = Codec(
+            "br",
+            lambda data: brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY),
+            lambda: _BrotliCompressor(brotli, COMPRESSION_BROTLI_QUALITY)
+        )
+    codecs["gzip"] = Codec(
+        "gzip",
+        lambda data: gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0),
+        lambda: _GzipCompressor(COMPRESSION_GZIP_LEVEL)
+    )
+    return codecs
+
+
+CODECS = _available_codecs()
+
+
+def negotiate_encoding(accept_encoding: Optional[str], codecs: Dict[str, Codec] = CODECS) -> Optional[str]:
+    """
+    The coding to use for an Accept-Encoding header: the supported coding with the
+    highest q-value, ties going to the server's preference; None for identity.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        weight = 1.0
+        parameter, _, value = parameters.partition("=")
+        if parameter.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                continue
+        weights[coding.strip().lower()] = weight
+    candidates: List[str] = [
+        name for name in codecs if weights.get(name, weights.get("*", 0.0)) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda name: weights.get(name, weights.get("*", 0.0)))
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing response bodies in the negotiated coding."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 cache: Callable[[], DocumentCache] = get_compressed_cache):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        responder = _CompressingResponder(send, encoding and CODECS[encoding], self.minimum_size, self.cache)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Holds back the response start until the first body message shows whether to compress."""
+
+    def __init__(self, send: Send, codec: Optional[Codec], minimum_size: int, cache: Callable[[], DocumentCache]):
+        self._send = send
+        self._codec = codec
+        self._minimum_size = minimum_size
+        self._cache = cache
+        self._start: Optional[Message] = None
+        self._compressor = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if self._passthrough:
+            await self._send(message)
+            return
+        if message["type"] != "http.response.body":
+            # Not a body the middleware can rewrite (e.g. a file send): forward as is.
+            self._passthrough = True
+            if self._compressor is None:
+                await self._send(self._start)
+            await self._send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._compressor is not None:
+            await self._send_compressed(body, more_body)
+            return
+
+        headers = MutableHeaders(raw=self._start["headers"])
+        status = self._start["status"]
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        compressible = (
+            status not in (204, 304) and media_type in COMPRESSIBLE_MEDIA_TYPES and "content-encoding" not in headers
+        )
+        if compressible or status == 304:
+            headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if self._codec is not None and etag and not etag.startswith("W/") and (compressible or status == 304):
+            # Weak whatever the size, so the tag of a 304 agrees with that of the 200 it stands for.
+            headers["ETag"] = f"W/{etag}"
+        if self._codec is None or not compressible or (not more_body and len(body) < self._minimum_size):
+            self._passthrough = True
+            await self._send(self._start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self._codec.name
+        if more_body:
+            if "content-length" in headers:
+                del headers["content-length"]
+            self._compressor = self._codec.compressor()
+            await self._send(self._start)
+            await self._send_compressed(body, more_body)
+            return
+        strong_etag = etag if status == 200 and etag and not etag.startswith("W/") else None
+        compressed = self._compress(body, strong_etag)
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        """One chunk of a streamed body, flushed so the client can decode it right away."""
+        if not body and more_body:
+            return
+        data = self._compressor.compress(body)
+        data += self._compressor.flush() if more_body else self._compressor.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _compress(self, body: bytes, etag: Optional[str]) -> bytes:
+        """The compressed body, from the compressed cache when a strong ETag identifies it."""
+        if etag is None:
+            return self._codec.compress(body)
+        cache = self._cache()
+        key = f"{self._codec.name}:{etag}"
+        compressed = cache.get(key)
+        if compressed is None:
+            generation = cache.generation()
+            compressed = self._codec.compress(body)
+            cache.set(key, compressed, generation)
+        return compressed
@@ -0,0 +1,58 @@
+"""
+Strong ETags for conditional GETs.
+A document's tag is derived from its id and updated_at, and a collection's (list and
+search pages) from the form_data version counter that every write bumps, each combined
+with a digest of the request's parameters, since every representation needs its own tag.
+A tag must never be newer than the body it is sent with: it is computed from the body's
+own row, or read before the body, so a concurrent write can only make a client refetch.
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+
+
+class TaggedBody(NamedTuple):
+    """A serialized response body and its ETag, packed together into one cache entry."""
+    etag: str
+    body: bytes
+
+    def pack(self) -> bytes:
+        return self.etag.encode("ascii") + b"\n" + self.body
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "TaggedBody":
+        etag, _, body = data.partition(b"\n")
+        return cls(etag.decode("ascii"), body)
+
+
+def parameters_digest(**parameters: Any) -> str:
+    """Digest of request parameters; selection and filter objects contribute their attributes."""
+    canonical = json.dumps(parameters, sort_keys=True, default=vars, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def document_etag(form_id: str, updated_at: Optional[str], representation: Optional[str] = None) -> str:
+    """Tag of one form, from its id and ISO updated_at; `representation` distinguishes sparse selections."""
+    tag = hashlib.sha256(f"{form_id}|{updated_at}|{representation}".encode("utf-8")).hexdigest()[:32]
+    return f'"{tag}"'
+
+
+def collection_etag(version: int, representation: str) -> str:
+    """Tag of a list or search page: the collection version plus a digest of the query."""
+    return f'"v{version}-{representation[:16]}"'
+
+
+def timestamp(value: Optional[datetime]) -> Optional[str]:
+    """updated_at as the mapper renders it, so tags from rows and from documents agree."""
+    return value.isoformat() if value else None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110): `*` or any listed tag matches."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
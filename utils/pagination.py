@@ -0,0 +1,49 @@
+"""
+Opaque keyset cursors for paginated list and search endpoints.
+A cursor encodes the (created_at, id) of the last row of a page, preceded
+by the relevance rank for ranked full-text searches.
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional, Tuple, Union
+from uuid import UUID
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 5000
+# Pages with a larger limit are streamed document by document instead of built in memory.
+STREAM_PAGE_THRESHOLD = int(os.getenv("STREAM_PAGE_THRESHOLD", "500"))
+
+# (created_at, id), or (rank, created_at, id) for ranked searches - in SQL sort order.
+Keyset = Union[Tuple[datetime, UUID], Tuple[float, datetime, UUID]]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client supplies a cursor that cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, form_id: UUID, rank: Optional[float] = None) -> str:
+    """Encode a keyset position as an opaque, URL-safe string."""
+    values = [created_at.isoformat(), form_id.hex]
+    if rank is not None:
+        values.append(rank)
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Keyset]:
+    """Decode a cursor produced by encode_cursor; None means the first page."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, form_id, *rank = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        keyset = (datetime.fromisoformat(created_at), UUID(form_id))
+        if not rank:
+            return keyset
+        if len(rank) > 1 or not isinstance(rank[0], (int, float)):
+            raise ValueError("Malformed rank")
+        return (float(rank[0]),) + keyset
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
@@ -1,28 +1,107 @@
-from typing import Optional, List, Union, Dict
-from fastapi.responses import JSONResponse
-from models.response_schemas import FormDataResponse, CreateResponse, StorageInfoResponse
+from typing import TYPE_CHECKING, AsyncIterator, Optional, List, Union, Dict, Any
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+from models.response_schemas import (
+    FormDataDocument, FormDataPage, CreateResponse, BatchCreateResponse, BulkDeleteResponse,
+    ImportReportResponse, StorageInfoResponse
+)
+
+if TYPE_CHECKING:
+    from services.async_form_service import ChunkStream
 
 NOT_FOUND_MESSAGE = "Not found"
+INVALID_CURSOR_MESSAGE = "Invalid pagination cursor"
+INVALID_FIELDS_MESSAGE = "Invalid field selection"
+INVALID_FILTER_MESSAGE = "Invalid search filter"
+
+def _etag_headers(etag: Optional[str]) -> Optional[Dict[str, str]]:
+    return {"ETag": etag} if etag is not None else None
 
-def success_response(data: Optional[Union[FormDataResponse, List[FormDataResponse]]] = None, message: str = ""):
+def _json_response(payload: Dict[str, Any], status_code: int = 200, etag: Optional[str] = None) -> Response:
+    """
+    Serialize an envelope straight to JSON bytes with pydantic-core. Response models
+    inside it (full documents, children, report models) are written by their compiled
+    serializers in the same pass, instead of model_dump() to dicts and json.dumps again.
+    """
+    return Response(content=to_json(payload), status_code=status_code, media_type="application/json",
+                    headers=_etag_headers(etag))
+
+def success_response(data: Optional[Union[FormDataDocument, List[FormDataDocument]]] = None, message: str = "",
+                     etag: Optional[str] = None):
     payload = {"success": True, "message": message}
     if data is not None:
-        if isinstance(data, list):
-            payload["data"] = [item.model_dump() for item in data]
-        else:
-            payload["data"] = data.model_dump()
-    return JSONResponse(status_code=200, content=payload)
+        payload["data"] = data
+    return _json_response(payload, etag=etag)
+
+def _serialized_envelope(members_json: bytes, message: str, etag: Optional[str] = None) -> Response:
+    """Success envelope around already serialized JSON object members, embedded as is."""
+    head = to_json({"success": True, "message": message})
+    content = head[:-1] + b"," + members_json + b"}"
+    return Response(content=content, status_code=200, media_type="application/json", headers=_etag_headers(etag))
+
+def serialized_success_response(data_json: bytes, message: str = "", etag: Optional[str] = None):
+    """success_response for data that is already serialized JSON."""
+    return _serialized_envelope(b'"data":' + data_json, message, etag)
+
+def serialized_paginated_response(page_json: bytes, message: str = "", etag: Optional[str] = None):
+    """paginated_response for a FormDataPage already serialized by alias."""
+    return _serialized_envelope(page_json[1:-1], message, etag)
+
+def paginated_response(page: FormDataPage, message: str = "", etag: Optional[str] = None):
+    payload = {
+        "success": True,
+        "message": message,
+        "data": page.items,
+        "next_cursor": page.next_cursor
+    }
+    return _json_response(payload, etag=etag)
+
+def streaming_paginated_response(chunks: "ChunkStream", message: str = "", etag: Optional[str] = None):
+    """
+    paginated_response written incrementally: the envelope head at once, then each chunk
+    of comma-separated documents as it is produced, then the next cursor that `chunks`
+    ends with. Memory use is bounded by one chunk, whatever the page size.
+    """
+    async def body() -> AsyncIterator[bytes]:
+        yield to_json({"success": True, "message": message})[:-1] + b',"data":['
+        separator = b""
+        async for chunk in chunks:
+            if chunk:
+                yield separator + chunk
+                separator = b","
+        yield b'],"next_cursor":' + to_json(chunks.value) + b"}"
+    
+    return StreamingResponse(body(), media_type="application/json", headers=_etag_headers(etag))
+
+def not_modified_response(etag: str):
+    """304 for a conditional GET whose If-None-Match matched; no body, just the current tag."""
+    return Response(status_code=304, headers={"ETag": etag})
+
+def created_response(form_id: str, message: str = "Form data created", status_code: int = 201):
+    payload = {"success": True, "message": message, "data": CreateResponse(id=form_id)}
+    return _json_response(payload, status_code)
+
+def child_created_response(child: BaseModel, message: str = "Entry added"):
+    payload = {"success": True, "message": message, "data": child}
+    return _json_response(payload, 201)
+
+def batch_created_response(form_ids: List[str], message: str = "Form data batch created"):
+    payload = {"success": True, "message": message, "data": BatchCreateResponse(ids=form_ids)}
+    return _json_response(payload, 201)
+
+def bulk_deleted_response(deleted: int, message: str = "Bulk delete successful"):
+    payload = {"success": True, "message": message, "data": BulkDeleteResponse(deleted=deleted)}
+    return _json_response(payload, 200)
 
-def created_response(form_id: str, message: str = "Form data created"):
-    create_data = CreateResponse(id=form_id)
-    payload = {"success": True, "message": message, "data": create_data.model_dump()}
-    return JSONResponse(status_code=201, content=payload)
+def import_report_response(report: Dict[str, Any], message: str = "Import finished"):
+    payload = {"success": True, "message": message, "data": ImportReportResponse(**report)}
+    return _json_response(payload, 200)
 
 def storage_info_response(storage_data: Dict[str, str | int], message: str = "Storage info fetched"):
-    storage_model = StorageInfoResponse(**storage_data)
-    payload = {"success": True, "message": message, "data": storage_model.model_dump()}
-    return JSONResponse(status_code=200, content=payload)
+    payload = {"success": True, "message": message, "data": StorageInfoResponse(**storage_data)}
+    return _json_response(payload, 200)
 
 def error_response(errors: Dict[str, str], message: str, status_code: int = 400):
     payload = {"success": False, "message": message, "errors": errors}
-    return JSONResponse(status_code=status_code, content=payload)
+    return _json_response(payload, status_code)